@@ -0,0 +1,321 @@
+"""
+A local stand-in for the Semantic Scholar Graph API, used to benchmark ScholTrack without network access.
+
+The server answers the endpoints used by `CitationExplorerAPI`:
+
+    GET  /graph/v1/paper/{paper_id}/citations   (offset/limit paging, 9,999 offset cap, publicationDateOrYear)
+    GET  /graph/v1/paper/{paper_id}
+    POST /graph/v1/paper/batch
+
+plus `GET /__stats__`, which returns the request counters of the server without counting itself.
+
+Papers are either generated synthetically or loaded from a recorded fixture file, i.e. a JSON object
+mapping each seed paper ID to the list of its citing papers as returned by the real API. Latency and
+429 responses can be injected to exercise the retry and rate limiting code.
+
+Run it standalone and point the CLI at it with --api-url:
+
+    python benchmarks/mock_server.py --citers 10000 --port 8000
+    scholtrack --api-url http://127.0.0.1:8000/graph/v1/paper -p <seed id> -o out.csv
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import date
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Optional, Dict, Any
+from urllib.parse import urlparse, parse_qs
+
+MAX_OFFSET = 10000
+VENUES = ["CVPR", "ICCV", "ECCV", "NeurIPS", "SIGGRAPH", "ArXiv", ""]
+FIELDS_OF_STUDY = [["Computer Science"], ["Computer Science", "Mathematics"], ["Physics"], None]
+WORDS = ["neural", "radiance", "fields", "gaussian", "splatting", "avatar", "diffusion", "view", "synthesis",
+         "dynamic", "scene", "reconstruction", "real-time", "rendering", "human", "mesh", "video", "3d"]
+
+
+def _paper_id(name: str) -> str:
+    return hashlib.sha1(name.encode("utf-8")).hexdigest()
+
+
+def generate_dataset(n_citers: int, n_seeds: Optional[int] = None, max_seeds_per_citer: int = 3,
+                     seed: int = 0) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Generate a synthetic citation dataset.
+
+    Args:
+        n_citers (int): Number of unique citing papers.
+        n_seeds (Optional[int]): Number of seed papers. By default, enough seeds are created to stay
+            below the offset cap of the citations endpoint.
+        max_seeds_per_citer (int): Each citing paper cites between 1 and this many seed papers.
+        seed (int): Seed of the random generator, so that runs are reproducible.
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: The citing papers of each seed paper.
+    """
+    rng = random.Random(seed)
+    average_seeds = (1 + max_seeds_per_citer) / 2
+    n_seeds = n_seeds or max(5, int(n_citers * average_seeds / 9000) + 1)
+    seed_ids = [_paper_id(f"seed-{i}") for i in range(n_seeds)]
+    dataset = {seed_id: [] for seed_id in seed_ids}
+
+    for i in range(n_citers):
+        year = rng.randint(2018, 2025)
+        arxiv_id = f"{rng.randint(18, 24)}{rng.randint(1, 12):02d}.{rng.randint(0, 99999):05d}"
+        paper = {
+            "paperId": _paper_id(f"citer-{i}"),
+            "title": " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 10))).capitalize(),
+            "authors": [{"authorId": str(rng.randint(1, 5000)), "name": f"Author {rng.randint(1, 5000)}"}
+                        for _ in range(rng.randint(1, 8))],
+            "abstract": " ".join(rng.choice(WORDS) for _ in range(rng.randint(60, 200))),
+            "citationCount": int(rng.paretovariate(1.2)) - 1,
+            "year": year,
+            "publicationDate": date(year, rng.randint(1, 12), rng.randint(1, 28)).isoformat() if rng.random() < 0.9 else None,
+            "referenceCount": rng.randint(10, 80),
+            "influentialCitationCount": rng.randint(0, 10),
+            "venue": rng.choice(VENUES),
+            "fieldsOfStudy": rng.choice(FIELDS_OF_STUDY),
+            "url": f"https://www.semanticscholar.org/paper/{_paper_id(f'citer-{i}')}",
+            "externalIds": {"ArXiv": arxiv_id, "CorpusId": i} if rng.random() < 0.7 else {"DOI": f"10.1000/{i}", "CorpusId": i},
+        }
+        for seed_id in rng.sample(seed_ids, rng.randint(1, min(max_seeds_per_citer, n_seeds))):
+            dataset[seed_id].append(paper)
+    return dataset
+
+
+class MockSemanticScholarServer:
+    """
+    A threaded HTTP server serving citation pages from an in-memory dataset.
+    """
+
+    def __init__(self, dataset: Dict[str, List[Dict[str, Any]]], latency: float = 0.0, error_rate: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0, seed: int = 0):
+        """
+        Initializes the server. Call `start` to serve requests.
+
+        Args:
+            dataset (Dict[str, List[Dict[str, Any]]]): The citing papers of each seed paper.
+            latency (float): Delay added to every response, in seconds.
+            error_rate (float): Fraction of requests answered with 429 Too Many Requests.
+            host (str): Host to bind to.
+            port (int): Port to bind to; 0 picks a free port.
+            seed (int): Seed of the random generator deciding which requests fail.
+        """
+        self.dataset = dataset
+        self.papers = {paper["paperId"]: paper for citers in dataset.values() for paper in citers}
+        for seed_id, citers in dataset.items():
+            self.papers.setdefault(seed_id, {"paperId": seed_id, "title": f"Seed {seed_id[:8]}",
+                                             "citationCount": len(citers), "year": 2018})
+        self.latency = latency
+        self.error_rate = error_rate
+        self.stats = {"requests": 0, "errors": 0, "bytes_sent": 0}
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @classmethod
+    def from_fixture(cls, path: str, **kwargs: Any) -> "MockSemanticScholarServer":
+        """
+        Create a server from a recorded fixture file mapping seed paper IDs to their citing papers.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), **kwargs)
+
+    @property
+    def base_url(self) -> str:
+        """
+        The paper endpoint URL to pass to `CitationExplorerAPI(base_url=...)`.
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/graph/v1/paper"
+
+    def start(self) -> "MockSemanticScholarServer":
+        """
+        Start serving in a background thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop the server.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_stats(self) -> None:
+        """
+        Reset the request counters.
+        """
+        with self._lock:
+            self.stats = {"requests": 0, "errors": 0, "bytes_sent": 0}
+
+    @staticmethod
+    def _project(paper: Dict[str, Any], fields: Optional[str]) -> Dict[str, Any]:
+        if not fields:
+            return {"paperId": paper["paperId"], "title": paper.get("title")}
+        result = {"paperId": paper["paperId"]}
+        for field in fields.split(","):
+            if field != "paperId":
+                result[field] = paper.get(field)
+        return result
+
+    @staticmethod
+    def _in_range(paper: Dict[str, Any], date_range: str) -> bool:
+        # Like the real API, papers with a year but no publication date only match whole-year bounds
+        start, _, end = date_range.partition(":")
+        year = paper.get("year")
+        if year is None:
+            return False
+        published = paper.get("publicationDate")
+        for bound, is_start in ((start, True), (end, False)):
+            if not bound:
+                continue
+            if len(bound) == 4:
+                if (year < int(bound)) if is_start else (year > int(bound)):
+                    return False
+            elif published is None or ((published < bound) if is_start else (published > bound)):
+                return False
+        return True
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: Any) -> None:
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                with server._lock:
+                    server.stats["bytes_sent"] += len(payload)
+
+            def _admit(self) -> bool:
+                if server.latency:
+                    time.sleep(server.latency)
+                with server._lock:
+                    server.stats["requests"] += 1
+                    fail = server._rng.random() < server.error_rate
+                    if fail:
+                        server.stats["errors"] += 1
+                if fail:
+                    self._send(429, {"message": "Too Many Requests"})
+                return not fail
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/__stats__":
+                    with server._lock:
+                        stats = dict(server.stats)
+                    self._send(200, stats)
+                    return
+                if not self._admit():
+                    return
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                parts = url.path.rstrip("/").split("/")
+
+                if parts[-1] == "citations":
+                    citers = server.dataset.get(parts[-2])
+                    if citers is None:
+                        self._send(404, {"error": "Paper not found"})
+                        return
+                    offset, limit = int(query.get("offset", 0)), int(query.get("limit", 100))
+                    if offset + limit > MAX_OFFSET or limit > 1000:
+                        self._send(400, {"error": "offset + limit must be < 10000 and limit <= 1000"})
+                        return
+                    if "publicationDateOrYear" in query:
+                        citers = [paper for paper in citers if server._in_range(paper, query["publicationDateOrYear"])]
+                    page = citers[offset:offset + limit]
+                    body = {"offset": offset,
+                            "data": [{"citingPaper": server._project(paper, query.get("fields"))} for paper in page]}
+                    if offset + limit < len(citers):
+                        body["next"] = offset + limit
+                    self._send(200, body)
+                    return
+
+                paper = server.papers.get(parts[-1])
+                if paper is None:
+                    self._send(404, {"error": "Paper not found"})
+                else:
+                    self._send(200, server._project(paper, query.get("fields")))
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if not self._admit():
+                    return
+                fields = parse_qs(urlparse(self.path).query).get("fields", [None])[0]
+                ids = body.get("ids", [])
+                if len(ids) > 500:
+                    self._send(400, {"error": "At most 500 IDs per request"})
+                    return
+                self._send(200, [server._project(server.papers[paper_id], fields) if paper_id in server.papers else None
+                                 for paper_id in ids])
+
+        return Handler
+
+
+def serve_in_process(conn, n_citers: int, n_seeds: Optional[int] = None, latency: float = 0.0,
+                     error_rate: float = 0.0, seed: int = 0, fixture: Optional[str] = None) -> None:
+    """
+    Entry point of a server running in a child process, so that it neither competes with the benchmarked
+    client for the GIL nor shows up in its memory measurements.
+
+    The base URL and the seed paper IDs are sent back over `conn`; the server stops when `conn` receives
+    any message or is closed.
+    """
+    if fixture:
+        server = MockSemanticScholarServer.from_fixture(fixture, latency=latency, error_rate=error_rate, seed=seed)
+    else:
+        server = MockSemanticScholarServer(generate_dataset(n_citers, n_seeds=n_seeds, seed=seed),
+                                           latency=latency, error_rate=error_rate, seed=seed)
+    server.start()
+    conn.send((server.base_url, list(server.dataset)))
+    try:
+        conn.recv()
+    except EOFError:
+        pass
+    server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a mock Semantic Scholar API for offline benchmarks and tests')
+    parser.add_argument('--citers', type=int, default=10000, help='Number of synthetic citing papers (default: 10000)')
+    parser.add_argument('--seeds', type=int, help='Number of synthetic seed papers')
+    parser.add_argument('--fixture', help='JSON file mapping seed paper IDs to their recorded citing papers')
+    parser.add_argument('--latency', type=float, default=0.0, help='Delay added to every response, in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on (default: 8000)')
+    args = parser.parse_args()
+
+    if args.fixture:
+        server = MockSemanticScholarServer.from_fixture(args.fixture, latency=args.latency, error_rate=args.error_rate, port=args.port)
+    else:
+        dataset = generate_dataset(args.citers, n_seeds=args.seeds)
+        server = MockSemanticScholarServer(dataset, latency=args.latency, error_rate=args.error_rate, port=args.port)
+
+    print(f"Serving {len(server.dataset)} seed papers at {server.base_url}")
+    print("Seed paper IDs:")
+    for seed_id in server.dataset:
+        print(f"  {seed_id}")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""
+Offline benchmarks of the ScholTrack pipeline against the mock Semantic Scholar server.
+
+Every size runs the following stages and reports their wall time, number of HTTP requests and peak
+Python memory (traced with tracemalloc, which slows the run down; pass --no-memory for clean timings):
+
+    fetch   `get_citations_for_papers` end to end: ID-only citation pages, dedup, batch hydration
+    dedup   `get_citations_for_papers` over pre-fetched full citation pages (no HTTP)
+    filter  the same with `cites_at_least_n=2`
+    export  `CitationExporter.export` to csv, json, txt and sqlite
+    merge   `Deduplicator.deduplicate` over the normalized citations, as run with --dedup
+
+Results are written as JSON, so that runs can be compared over time:
+
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 100000 -o results.json
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 --compare results.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import List, Optional, Dict, Any, Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from scholtrack.api import CitationExplorerAPI
+from scholtrack.dedup import Deduplicator
+from scholtrack.exporter import CitationExporter
+from scholtrack.records import PaperRecord
+from scholtrack.transport import HttpTransport
+
+from mock_server import serve_in_process
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+EXPORT_TYPES = ["csv", "json", "txt", "sqlite"]
+
+
+class PrefetchedCitationAPI(CitationExplorerAPI):
+    """
+    A client answering `get_citations` from citation pages fetched beforehand, to time the in-memory
+    dedup and filter stages without any HTTP.
+    """
+
+    def __init__(self, citations_by_paper: Dict[str, List[Dict[str, Any]]], **kwargs: Any):
+        super().__init__(**kwargs)
+        self.citations_by_paper = citations_by_paper
+
+    def get_citations(self, paper_id: str, limit: int = 100, fields: Optional[str] = None,
+                      min_year: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self.citations_by_paper.get(paper_id, [])
+
+
+class MockServerProcess:
+    """
+    The mock server running in a child process.
+    """
+
+    def __init__(self, n_citers: int, **kwargs: Any):
+        self._conn, child_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=serve_in_process, args=(child_conn, n_citers), kwargs=kwargs,
+                                                daemon=True)
+        self._process.start()
+        self.base_url, self.seed_ids = self._conn.recv()
+        self._stats_url = self.base_url.split("/graph/")[0] + "/__stats__"
+
+    def requests_served(self) -> int:
+        return requests.get(self._stats_url, timeout=10).json()["requests"]
+
+    def stop(self) -> None:
+        self._conn.send("stop")
+        self._process.join(timeout=10)
+
+
+def measure(stage: Callable[[], Any], server: Optional[MockServerProcess] = None,
+            trace_memory: bool = True) -> Dict[str, Any]:
+    """
+    Run a stage and measure its wall time, the number of requests the mock server received and its peak
+    Python memory.
+
+    Args:
+        stage (Callable[[], Any]): The stage to run.
+        server (Optional[MockServerProcess]): The server to count requests on, if the stage sends any.
+        trace_memory (bool): Whether to trace the peak memory with tracemalloc.
+
+    Returns:
+        Dict[str, Any]: The measurements, plus the `result` of the stage.
+    """
+    requests_before = server.requests_served() if server else 0
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = stage()
+    wall_time = time.perf_counter() - start
+    peak_memory = None
+    if trace_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    requests_sent = server.requests_served() - requests_before if server else 0
+    return {
+        "wall_time_s": round(wall_time, 4),
+        "requests": requests_sent,
+        "peak_memory_mb": round(peak_memory / 2 ** 20, 2) if peak_memory is not None else None,
+        "result": result,
+    }
+
+
+def run_size(n_citers: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Run all stages for a synthetic dataset of `n_citers` unique citing papers.
+    """
+    server = MockServerProcess(n_citers, n_seeds=args.seeds, latency=args.latency, error_rate=args.error_rate,
+                               seed=args.seed)
+    try:
+        transport = HttpTransport(rate=0, backoff=args.backoff, pool_size=max(16, args.workers))
+        api = CitationExplorerAPI(max_workers=args.workers, base_url=server.base_url, transport=transport)
+        seed_ids = server.seed_ids
+        stages = {}
+
+        fetch = measure(lambda: api.get_citations_for_papers(seed_ids), server, not args.no_memory)
+        citations = fetch.pop("result")
+        fetch["citations"] = len(citations)
+        fetch["retries"] = transport.summary()["retries"]
+        stages["fetch"] = fetch
+
+        # Full citation pages of every seed, as fetched with --no-batch
+        pages = {paper_id: api.get_citations(paper_id, limit=1000) for paper_id in seed_ids}
+        offline_api = PrefetchedCitationAPI(pages, max_workers=1, transport=transport)
+        for name, cites_at_least_n in (("dedup", 0), ("filter", 2)):
+            stage = measure(lambda: offline_api.get_citations_for_papers(
+                seed_ids, cites_at_least_n=cites_at_least_n, hydrate=False), trace_memory=not args.no_memory)
+            stage["citations"] = len(stage.pop("result"))
+            stages[name] = stage
+        del pages, offline_api
+    finally:
+        server.stop()
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        sinks = [(output_type, os.path.join(output_dir, f"citations.{output_type}")) for output_type in EXPORT_TYPES]
+        export = measure(lambda: CitationExporter.export(citations, sinks), trace_memory=not args.no_memory)
+        export.pop("result")
+        export["citations"] = len(citations)
+        export["bytes_written"] = sum(os.path.getsize(filename) for _, filename in sinks)
+        stages["export"] = export
+
+    records = PaperRecord.from_citations(citations)
+    merge = measure(lambda: Deduplicator().deduplicate(records, seed_ids), trace_memory=not args.no_memory)
+    merge["citations"] = len(merge.pop("result"))
+    stages["merge"] = merge
+
+    return {"citers": n_citers, "seeds": len(seed_ids), "stages": stages}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: List[Dict[str, Any]], baseline: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Print the results as a table, with the wall time relative to a baseline run if one is given.
+    """
+    baseline_stages = {
+        (run["citers"], stage): values
+        for run in (baseline or {}).get("runs", []) for stage, values in run["stages"].items()
+    }
+    print(f"{'citers':>8} {'stage':<8} {'wall (s)':>10} {'requests':>9} {'peak (MB)':>10} {'citations':>10}"
+          + (f" {'vs baseline':>12}" if baseline else ""))
+    for run in results:
+        for stage, values in run["stages"].items():
+            peak = values["peak_memory_mb"]
+            line = (f"{run['citers']:>8} {stage:<8} {values['wall_time_s']:>10.3f} {values['requests']:>9} "
+                    f"{peak if peak is not None else '-':>10} {values['citations']:>10}")
+            previous = baseline_stages.get((run["citers"], stage))
+            if baseline and previous and previous["wall_time_s"]:
+                line += f" {values['wall_time_s'] / previous['wall_time_s']:>11.2f}x"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ScholTrack against a local mock Semantic Scholar API')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help=f'Numbers of unique citing papers to benchmark (default: {DEFAULT_SIZES})')
+    parser.add_argument('--seeds', type=int, help='Number of seed papers (default: enough to stay below the 9,999 citation cap per seed)')
+    parser.add_argument('-w', '--workers', type=int, default=4, help='Number of seed papers fetched concurrently (default: 4)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Delay added to every mock server response, in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 429 by the mock server')
+    parser.add_argument('--backoff', type=float, default=0.05, help='Base delay of the retry backoff, in seconds (default: 0.05)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic dataset')
+    parser.add_argument('--no-memory', action='store_true', help='Do not trace peak memory, for timings without the tracemalloc overhead')
+    parser.add_argument('-o', '--output', help='JSON file to save the results to')
+    parser.add_argument('--compare', help='JSON results of a previous run to compare the wall times against')
+    args = parser.parse_args()
+
+    runs = []
+    for n_citers in args.sizes:
+        print(f"Benchmarking {n_citers} citing papers...")
+        runs.append(run_size(n_citers, args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print()
+    print_results(runs, baseline)
+
+    if args.output:
+        report = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+            "runs": runs,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Startup-time benchmark of the ScholTrack command-line interface.
+
+Times fresh interpreters running `scholtrack --help` and importing `scholtrack.cli`, and lists the
+slowest imports reported by `python -X importtime`, so that heavy imports creeping back into the
+argument parsing path are easy to spot:
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 20 -o startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import List, Dict, Any
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = {
+    "python": [sys.executable, "-c", "pass"],
+    "import": [sys.executable, "-c", "import scholtrack.cli"],
+    "help": [sys.executable, "-m", "scholtrack.cli", "--help"],
+}
+
+# Time-to-help target, in milliseconds
+HELP_TARGET_MS = 100
+
+
+def time_command(command: List[str], runs: int) -> Dict[str, float]:
+    """
+    Run a command several times in a fresh interpreter and measure its wall time.
+
+    Args:
+        command (List[str]): The command to run.
+        runs (int): Number of timed runs, after one untimed warm-up run.
+
+    Returns:
+        Dict[str, float]: The minimum, median and maximum wall time in milliseconds.
+    """
+    subprocess.run(command, cwd=REPO_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=REPO_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {"min_ms": round(times[0], 1), "median_ms": round(times[len(times) // 2], 1), "max_ms": round(times[-1], 1)}
+
+
+def slowest_imports(top: int) -> List[Dict[str, Any]]:
+    """
+    Get the top-level imports of `scholtrack.cli` with the largest cumulative time, as reported by -X importtime.
+    """
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import scholtrack.cli"], cwd=REPO_DIR,
+                            stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True, check=True).stderr
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.strip() == "site" and not name[1:].startswith(" "):
+            # Everything so far was imported by the interpreter startup, not by scholtrack.cli
+            imports = []
+            continue
+        imports.append({"module": name.strip(), "cumulative_ms": int(cumulative) / 1000, "depth": len(name) - len(name.lstrip())})
+    return sorted(imports, key=lambda entry: entry["cumulative_ms"], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the startup time of the ScholTrack command-line interface')
+    parser.add_argument('--runs', type=int, default=10, help='Number of timed runs per command (default: 10)')
+    parser.add_argument('--top', type=int, default=10, help='Number of slowest imports to list (default: 10)')
+    parser.add_argument('-o', '--output', help='JSON file to save the results to')
+    args = parser.parse_args()
+
+    results = {name: time_command(command, args.runs) for name, command in COMMANDS.items()}
+    imports = slowest_imports(args.top)
+
+    print(f"{'command':<8} {'min (ms)':>10} {'median (ms)':>12} {'max (ms)':>10}")
+    for name, values in results.items():
+        print(f"{name:<8} {values['min_ms']:>10.1f} {values['median_ms']:>12.1f} {values['max_ms']:>10.1f}")
+    print(f"\nSlowest imports of scholtrack.cli (cumulative):")
+    for entry in imports:
+        print(f"{entry['cumulative_ms']:>8.1f} ms  {'  ' * (entry['depth'] - 1)}{entry['module']}")
+
+    help_ms = results["help"]["median_ms"]
+    print(f"\nTime to help: {help_ms:.1f} ms ({'within' if help_ms <= HELP_TARGET_MS else 'above'} the {HELP_TARGET_MS} ms target)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "runs": args.runs, "commands": results, "imports": imports}, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
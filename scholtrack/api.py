@@ -1,5 +1,18 @@
-import requests
-from typing import List, Optional, Dict, Any
+import calendar
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import date, timedelta
+from typing import List, Optional, Dict, Any, Iterable, Tuple, Iterator
+
+from scholtrack.cache import ResponseCache
+from scholtrack.ids import parse_paper_ids
+from scholtrack.journal import FetchJournal
+from scholtrack.metrics import MetricsHook
+from scholtrack.overlap import OverlapIndex
+from scholtrack.state import SeedStateStore
+from scholtrack.store import PaperStore
+from scholtrack.transport import HttpTransport
 
 class CitationExplorerAPI:
     """
@@ -7,103 +20,769 @@ class CitationExplorerAPI:
     """
 
     BASE_URL = "https://api.semanticscholar.org/graph/v1/paper"
-    
-    def __init__(self, api_key: Optional[str] = None):
+    CITATION_FIELDS = ("title,authors,abstract,citationCount,year,referenceCount,"
+                       "influentialCitationCount,venue,fieldsOfStudy,url,externalIds")
+    # Minimal field set used when only the citing paper IDs are needed
+    CITATION_ID_FIELDS = "paperId"
+    # Maximum number of IDs accepted by the /paper/batch endpoint in a single call
+    BATCH_SIZE = 500
+    # Number of cache entries the papers fetched through the batch endpoint are spread over
+    PAPER_CACHE_SHARDS = 64
+    # The citations endpoint only pages through the first 9,999 citations of a query
+    MAX_CITATIONS = 9999
+    # First publication year queried when splitting the citations of a paper whose year is unknown
+    PARTITION_START_YEAR = 1900
+
+    def __init__(self, api_key: Optional[str] = None, max_workers: int = 1, base_url: Optional[str] = None,
+                 cache: Optional[ResponseCache] = None, transport: Optional[HttpTransport] = None,
+                 metrics: Optional[MetricsHook] = None, store: Optional[PaperStore] = None,
+                 journal: Optional[FetchJournal] = None):
         """
         Initializes the CitationExplorerAPI client.
 
         Args:
             api_key (Optional[str]): Your Semantic Scholar API key, if available.
+            max_workers (int): Number of seed papers to fetch concurrently (1 fetches them one by one).
+            base_url (Optional[str]): Override for the paper endpoint, e.g. to point the client at a local stub server.
+            cache (Optional[ResponseCache]): On-disk cache for API responses. Responses are not cached if omitted.
+            transport (Optional[HttpTransport]): HTTP transport used for all requests. A transport with the
+                default rate limit for `api_key` is created if omitted.
+            metrics (Optional[MetricsHook]): Hook receiving citation pages, cache lookups, finished seed papers and
+                stage durations. Request timings are reported by the hook of the transport.
+            store (Optional[PaperStore]): Local store of papers and citation edges. Complete citation lists and
+                papers found in the store are not fetched again, and everything fetched is written to it.
+            journal (Optional[FetchJournal]): Journal of the seed papers fetched completely by `get_citations`. Seed
+                papers found in it are not fetched again, and every completed one is appended to it.
         """
-        self.headers = {"x-api-key": api_key} if api_key else {}
+        self.max_workers = max(1, max_workers)
+        self.cache = cache
+        self.transport = transport or HttpTransport(api_key=api_key)
+        self.metrics = metrics or MetricsHook()
+        self.store = store
+        self.journal = journal
+        self.incomplete_seeds = {}  # Paper ID -> reason, for papers whose citations could not all be fetched
+        if base_url:
+            self.BASE_URL = base_url.rstrip("/")
 
-    def get_citations(self, paper_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+    def get_citations(self, paper_id: str, limit: int = 100, fields: Optional[str] = None,
+                      min_year: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Retrieve the citations of a given paper by its Semantic Scholar paper ID.
 
         Args:
             paper_id (str): The ID of the paper to retrieve citations for.
             limit (int): The maximum number of citations to retrieve per request (max allowed per API call).
+            fields (Optional[str]): Comma-separated list of fields to retrieve for each citing paper.
+                Defaults to `CITATION_FIELDS`.
+            min_year (Optional[int]): Only retrieve citing papers published in or after this year.
 
         Returns:
-            List[Dict[str, Any]]: A list of citations for the paper.
+            List[Dict[str, Any]]: A list of citations for the paper. It is partial if the paper is listed in
+            `incomplete_seeds` afterwards.
+        """
+        fields = fields or self.CITATION_FIELDS
+        if self.journal is not None:
+            citations = self.journal.get(paper_id, fields, min_year)
+            if citations is not None:
+                return citations
+
+        citations = list(self.iter_citations(paper_id, limit=limit, fields=fields, min_year=min_year))
+        if self.journal is not None and paper_id not in self.incomplete_seeds:
+            self.journal.append(paper_id, fields, citations, min_year=min_year)
+        return citations
+
+    def iter_citations(self, paper_id: str, limit: int = 100, fields: Optional[str] = None,
+                       min_year: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the citations of a given paper, fetching one page at a time.
+
+        The API stops paging after `MAX_CITATIONS` citations. Papers with more citations are fetched
+        again in publication date slices small enough to stay under this limit (see
+        `_iter_partitioned_citations`), and the citations not seen yet are yielded after the first ones.
+
+        With a `store`, a fresh complete citation list is served from it, and fetched citations are written to it.
+
+        A `min_year` is sent to the API as a `publicationDateOrYear` range, so that older citing papers are
+        not downloaded at all. Citing papers without a publication year are left out as well. Such partial
+        citation lists are not written to the store.
+
+        Args:
+            paper_id (str): The ID of the paper to retrieve citations for.
+            limit (int): The maximum number of citations to retrieve per request (max allowed per API call).
+            fields (Optional[str]): Comma-separated list of fields to retrieve for each citing paper.
+                Defaults to `CITATION_FIELDS`.
+            min_year (Optional[int]): Only retrieve citing papers published in or after this year.
+
+        Yields:
+            Dict[str, Any]: The citations of the paper, as soon as their page is fetched. If a request fails,
+            the citations stop early and the paper is recorded in `incomplete_seeds`.
         """
-        citations = []
         offset = 0
-        max_citations = 9999  # The limit imposed by Semantic Scholar without an API key.
+        max_citations = self.MAX_CITATIONS
+        fields = fields or self.CITATION_FIELDS
+        date_range = f"{min_year}:" if min_year is not None else None
+        seen_ids = set()
 
+        if self.store is not None:
+            stored = self.store.get_citations(paper_id, fields)
+            if stored is not None and min_year is not None:
+                stored = self._filter_stored_by_year(stored, min_year)
+            if stored is not None:
+                yield from stored
+                return
+
+        started = time.time()
+        complete = False
         while offset < max_citations:
-            params = {
-                "fields": "title,authors,abstract,citationCount,year,referenceCount,"
-                          "influentialCitationCount,venue,fieldsOfStudy,url,externalIds",
-                "limit": min(limit, max_citations - offset),  
-                "offset": offset,
-            }
-
-            response = requests.get(f"{self.BASE_URL}/{paper_id}/citations", headers=self.headers, params=params)
-            if response.status_code != 200:
-                print(f"Error: {response.status_code} - {response.text}")
+            data = self._get_citation_page(paper_id, offset, min(limit, max_citations - offset), fields,
+                                           date_range=date_range)
+            if data is None:
+                self._mark_incomplete(paper_id, f"the request for citations from offset {offset} failed")
                 break
 
-            data = response.json()
             new_citations = data.get("data", [])
             if not new_citations:
+                complete = True
+                break
+            seen_ids.update(citation["citingPaper"]["paperId"] for citation in new_citations
+                            if citation.get("citingPaper", {}).get("paperId"))
+            if date_range is None:
+                self._store_citations(paper_id, new_citations, position=offset)
+            yield from new_citations
+
+            # The API omits `next` on the last page, which saves a request for an empty page
+            if "next" not in data:
+                complete = True
                 break
-            citations.extend(new_citations)
 
             offset += limit
 
             # Handle the case where we hit the 10,000 citation limit.
             if offset >= max_citations:
-                print(f"WARNING: Paper ID {paper_id} has more than {max_citations} citations. Only the first {max_citations} will be fetched!")
+                print(f"Paper ID {paper_id} has more than {max_citations} citations. Fetching the rest by publication date.")
+                complete = yield from self._iter_partitioned_citations(paper_id, limit, fields, seen_ids,
+                                                                       min_year=min_year)
+                if not complete:
+                    self._mark_incomplete(paper_id, "some publication date slices could not be fetched completely")
                 break
 
-        return citations
+        if complete and date_range is None and self.store is not None:
+            self.store.mark_complete(paper_id, started)
+
+    def _mark_incomplete(self, paper_id: str, reason: str) -> None:
+        self.incomplete_seeds.setdefault(paper_id, reason)
+
+    def mark_missing_details(self, cited_seeds: Dict[str, Iterable[str]]) -> None:
+        """
+        Record the seed papers of citing papers whose details could not be fetched in `incomplete_seeds`.
+
+        Args:
+            cited_seeds (Dict[str, Iterable[str]]): The seed papers cited by each citing paper without details.
+        """
+        counts = {}
+        for seed_ids in cited_seeds.values():
+            for seed_id in seed_ids:
+                counts[seed_id] = counts.get(seed_id, 0) + 1
+        for seed_id, count in counts.items():
+            self._mark_incomplete(seed_id, f"the details of {count} of its citing papers could not be fetched")
+
+    def _store_citations(self, paper_id: str, citations: List[Dict[str, Any]], position: Optional[int] = None) -> None:
+        if self.store is not None:
+            self.store.add_citations(paper_id, citations, position=position)
+
+    def _filter_stored_by_year(self, citations: List[Dict[str, Any]], min_year: int) -> Optional[List[Dict[str, Any]]]:
+        # The stored citations published in or after `min_year`, or None if the year of some citing paper is not stored
+        citing_ids = [citation["citingPaper"]["paperId"] for citation in citations]
+        papers = self.store.get_papers(citing_ids, "year")
+        if len(papers) < len(set(citing_ids)):
+            return None
+        return [
+            citation for citation, citing_id in zip(citations, citing_ids)
+            if (papers[citing_id].get("year") or 0) >= min_year
+        ]
+
+    def _iter_partitioned_citations(self, paper_id: str, limit: int, fields: str, seen_ids: set,
+                                    min_year: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all citations of a paper with more than `MAX_CITATIONS` citations, by splitting them
+        into publication date slices that each stay under the limit.
+
+        The slices start as whole years from the paper's own publication year until this year. A slice
+        that still reaches the limit is split in halves, a single year into months and a month into halves
+        again. Slices are fetched concurrently and yielded newest first, so the output does not depend on
+        the order in which they complete. Citing papers without a publication year cannot be selected by
+        date, so only those among the first `MAX_CITATIONS` citations are found; the same holds for papers
+        with a year but no exact date, once their year has to be split into months.
+
+        Such unreachable papers are never dropped silently: the number of citations found is compared with
+        the citation count of the paper, and the paper is recorded in `incomplete_seeds` with the number of
+        citations missing. If the count cannot be compared because of a `min_year`, a paper whose years had
+        to be split into months is recorded as incomplete as well.
+
+        Args:
+            paper_id (str): The ID of the paper to retrieve citations for.
+            limit (int): The maximum number of citations to retrieve per request.
+            fields (str): Comma-separated list of fields to retrieve for each citing paper.
+            seen_ids (set): IDs of the citing papers already yielded, which are skipped. It is updated in place.
+            min_year (Optional[int]): Only retrieve citing papers published in or after this year.
+
+        Yields:
+            Dict[str, Any]: The citations of the paper that are not in `seen_ids`.
+
+        Returns:
+            bool: Whether all citations of the paper were fetched.
+        """
+        paper = self.get_paper(paper_id, fields="year,citationCount") or {}
+        first_year = paper.get("year") or self.PARTITION_START_YEAR
+        this_year = date.today().year
+        slices = [
+            (None, date(first_year - 1, 12, 31)),
+            (date(first_year, 1, 1), date(this_year, 12, 31)),
+            (date(this_year + 1, 1, 1), None),
+        ]
+        if min_year is not None:
+            # Slices are clipped to `min_year`, so that older citing papers are not requested at all
+            slices = [
+                (max(start, date(min_year, 1, 1)) if start else date(min_year, 1, 1), end)
+                for start, end in slices if end is None or end.year >= min_year
+            ]
+
+        incomplete_slices = []
+        split_years = set()  # Years split into months, which loses their papers without an exact date
+
+        def fetch_slice(date_slice: Tuple[Optional[date], Optional[date]]) -> Tuple[List[Dict[str, Any]], List[Tuple[date, date]]]:
+            # Returns either the citations of the slice, or the smaller slices to fetch instead
+            date_range = self._format_date_range(*date_slice)
+            citations = []
+            offset = 0
+            while offset < self.MAX_CITATIONS:
+                data = self._get_citation_page(paper_id, offset, min(limit, self.MAX_CITATIONS - offset), fields,
+                                               date_range=date_range)
+                if data is None:
+                    incomplete_slices.append(date_range)
+                    break
+                page = data.get("data", [])
+                citations.extend(page)
+                if not page or "next" not in data:
+                    break
+
+                if offset == 0:
+                    # Probe the last reachable citation before paging through a slice that may be too large
+                    probe = self._get_citation_page(paper_id, self.MAX_CITATIONS - 1, 1, self.CITATION_ID_FIELDS,
+                                                    date_range=date_range)
+                    if probe is not None and probe.get("data"):
+                        smaller_slices = self._split_date_range(*date_slice)
+                        if smaller_slices:
+                            start, end = date_slice
+                            if start.year == end.year and (start.month, start.day, end.month, end.day) == (1, 1, 12, 31):
+                                split_years.add(start.year)
+                            return [], smaller_slices
+                        print(f"WARNING: Paper ID {paper_id} has more than {self.MAX_CITATIONS} citations published "
+                              f"in {date_range}. Only the first {self.MAX_CITATIONS} of them will be fetched!")
+                        incomplete_slices.append(date_range)
+                offset += limit
+            return citations, []
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {executor.submit(fetch_slice, date_slice): date_slice for date_slice in slices}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    date_slice = pending.pop(future)
+                    citations, smaller_slices = future.result()
+                    if smaller_slices:
+                        pending.update({executor.submit(fetch_slice, smaller): smaller for smaller in smaller_slices})
+                    else:
+                        results[date_slice] = citations
+
+        # Slices never overlap, so ordering them by start date gives a deterministic output
+        for date_slice in sorted(results, key=lambda date_slice: date_slice[0] or date.min, reverse=True):
+            new_citations = []
+            for citation in results[date_slice]:
+                citing_paper_id = citation.get("citingPaper", {}).get("paperId")
+                if citing_paper_id not in seen_ids:
+                    seen_ids.add(citing_paper_id)
+                    new_citations.append(citation)
+            if min_year is None:
+                self._store_citations(paper_id, new_citations, position=len(seen_ids) - len(new_citations))
+            yield from new_citations
+
+        citation_count = paper.get("citationCount")
+        years = ", ".join(str(year) for year in sorted(split_years))
+        if min_year is None and citation_count is not None and len(seen_ids) < citation_count:
+            unreachable = f" or with a year but no exact date in {years}" if split_years else ""
+            self._mark_incomplete(paper_id, f"{citation_count - len(seen_ids)} of its {citation_count} citations could not "
+                                            f"be reached by publication date (citing papers without a year{unreachable})")
+        elif min_year is not None and split_years:
+            self._mark_incomplete(paper_id, f"citing papers with a year but no exact date in {years} cannot be fetched "
+                                            f"once these years are split into months; an unknown number of them is missing")
+        return not incomplete_slices and paper_id not in self.incomplete_seeds
+
+    @staticmethod
+    def _format_date_range(start: Optional[date], end: Optional[date]) -> str:
+        """
+        Format a date slice for the `publicationDateOrYear` parameter, using years for whole-year bounds.
+
+        Papers with a publication year but no exact date only match year bounds, so whole years are never
+        written as dates.
+        """
+        whole_years = (start is None or (start.month, start.day) == (1, 1)) and \
+                      (end is None or (end.month, end.day) == (12, 31))
+        if whole_years:
+            return f"{start.year if start else ''}:{end.year if end else ''}"
+        return f"{start.isoformat() if start else ''}:{end.isoformat() if end else ''}"
+
+    @staticmethod
+    def _split_date_range(start: Optional[date], end: Optional[date]) -> List[Tuple[date, date]]:
+        """
+        Split a date slice into smaller slices: several years in halves, a single year into months, and
+        a range of days in halves. Open-ended slices and single days cannot be split.
+        """
+        if start is None or end is None or start >= end:
+            return []
+        if start.year < end.year:
+            middle = (start.year + end.year) // 2
+            return [(start, date(middle, 12, 31)), (date(middle + 1, 1, 1), end)]
+        if start.month < end.month:
+            return [
+                (max(start, date(start.year, month, 1)),
+                 min(end, date(start.year, month, calendar.monthrange(start.year, month)[1])))
+                for month in range(start.month, end.month + 1)
+            ]
+        middle = start + (end - start) // 2
+        return [(start, middle), (middle + timedelta(days=1), end)]
+
+    def get_new_citations(self, paper_id: str, state_store: SeedStateStore, limit: int = 100,
+                          fields: Optional[str] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Retrieve only the citations of a paper that were not seen in the previous run.
+
+        The paper's citation count is checked first, and nothing else is fetched if it did not change.
+        Otherwise citation pages are read until a page contains an already known citing paper, since
+        Semantic Scholar lists the most recently added citations first. The new citations are merged into
+        the stored state. On the first run for a paper, all of its citations are fetched and reported as new.
+        If the previous run stored other fields, e.g. only the IDs of a hydrated run, all citations are fetched
+        again with the requested fields, and only those missing from the stored state are reported as new.
+
+        If the citations cannot all be fetched, the paper is recorded in `incomplete_seeds` and its stored state
+        is left unchanged, so that the next run compares the citation count again and fetches the missing ones.
+
+        Args:
+            paper_id (str): The ID of the paper to retrieve citations for.
+            state_store (SeedStateStore): Store holding the citations seen in previous runs.
+            limit (int): The maximum number of citations to retrieve per request.
+            fields (Optional[str]): Comma-separated list of fields to retrieve for each citing paper.
+                Defaults to `CITATION_FIELDS`.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: All known citations of the paper, and the new ones.
+        """
+        fields = fields or self.CITATION_FIELDS
+        paper = self.get_paper(paper_id, fields="citationCount")
+        citation_count = paper.get("citationCount") if paper else None
+
+        state = state_store.load(paper_id)
+        if state is None or state.get("fields") != fields:
+            citations = self.get_citations(paper_id, limit=limit, fields=fields)
+            if paper_id not in self.incomplete_seeds:
+                state_store.save(paper_id, citation_count, citations, fields)
+            if state is None:
+                return citations, citations
+            # The known citations lack the requested fields, so they were fetched again, but are not new
+            known_ids = SeedStateStore.citing_ids(state)
+            return citations, [citation for citation in citations
+                               if citation.get("citingPaper", {}).get("paperId") not in known_ids]
+
+        if citation_count is not None and citation_count == state.get("citation_count"):
+            return state["citations"], []
+
+        known_ids = SeedStateStore.citing_ids(state)
+        expected_new = None
+        if citation_count is not None and state.get("citation_count") is not None:
+            expected_new = citation_count - state["citation_count"]
+
+        new_citations = []
+        offset = 0
+        reached_known = False
+        while not reached_known:
+            data = self._get_citation_page(paper_id, offset, limit, fields, use_cache=False)
+            if data is None:
+                self._mark_incomplete(paper_id, f"the request for new citations from offset {offset} failed")
+                break
+            page = data.get("data", [])
+            if not page:
+                break
+
+            for citation in page:
+                citing_paper_id = citation.get("citingPaper", {}).get("paperId")
+                if citing_paper_id in known_ids:
+                    reached_known = True
+                elif citing_paper_id:
+                    new_citations.append(citation)
+                    known_ids.add(citing_paper_id)
+
+            if expected_new is not None and len(new_citations) >= expected_new:
+                break
+            offset += limit
+
+        self._store_citations(paper_id, new_citations)
+        citations = new_citations + state["citations"]
+        # Saving a partial state would make the next run stop paging at the new citations found so far
+        if paper_id not in self.incomplete_seeds:
+            state_store.save(paper_id, citation_count, citations, fields)
+        return citations, new_citations
+
+    def get_paper(self, paper_id: str, fields: str = "title,citationCount") -> Optional[Dict[str, Any]]:
+        """
+        Retrieve the details of a single paper.
+
+        Args:
+            paper_id (str): The ID of the paper.
+            fields (str): Comma-separated list of fields to retrieve.
+
+        Returns:
+            Optional[Dict[str, Any]]: The paper details, or None if the request failed.
+        """
+        response = self.transport.get(f"{self.BASE_URL}/{paper_id}", params={"fields": fields})
+        if response.status_code != 200:
+            print(f"Error: {response.status_code} - {response.text}")
+            return None
+        paper = response.json()
+        if self.store is not None:
+            self.store.add_papers([paper])
+        return paper
+
+    def _paper_cache_key(self, paper_id: str, fields: str) -> str:
+        # The key of the cache entry holding the paper, one of `PAPER_CACHE_SHARDS` entries per field set
+        shard = int(hashlib.sha1(paper_id.encode("utf-8")).hexdigest()[:8], 16) % self.PAPER_CACHE_SHARDS
+        return ResponseCache.make_key("papers", self.BASE_URL, fields, shard)
+
+    def get_papers_batch(self, paper_ids: List[str], fields: Optional[str] = None) -> List[Optional[Dict[str, Any]]]:
+        """
+        Retrieve the details of many papers at once through the /paper/batch endpoint.
+
+        IDs are sent in chunks of up to `BATCH_SIZE`, and chunks are fetched concurrently when more than
+        one worker is configured. Papers found in the store or in the cache are not requested again. The
+        cache holds every paper on its own, with its fetch time, grouped into `PAPER_CACHE_SHARDS` entries
+        by a hash of its ID, so that adding one paper to a collection does not invalidate the others.
+
+        Args:
+            paper_ids (List[str]): The IDs of the papers.
+            fields (Optional[str]): Comma-separated list of fields to retrieve. Defaults to `CITATION_FIELDS`.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: The paper details in the order of `paper_ids`, with None for
+            papers that are unknown or could not be fetched.
+        """
+        fields = fields or self.CITATION_FIELDS
+        papers = self.store.get_papers(paper_ids, fields) if self.store is not None else {}
+        missing_ids = [paper_id for paper_id in dict.fromkeys(paper_ids) if paper_id not in papers]
+
+        if self.cache is not None and missing_ids:
+            shards = {}
+            for paper_id in missing_ids:
+                shards.setdefault(self._paper_cache_key(paper_id, fields), []).append(paper_id)
+            now = time.time()
+            cached = []
+            for key, shard_ids in shards.items():
+                entries = self.cache.get(key) or {}
+                for paper_id in shard_ids:
+                    entry = entries.get(paper_id)
+                    hit = entry is not None and now - entry["fetched"] <= self.cache.ttl
+                    self.metrics.on_cache(hit)
+                    if hit:
+                        papers[paper_id] = entry["paper"]
+                        cached.append(entry["paper"])
+            if self.store is not None and cached:
+                self.store.add_papers(cached)
+            missing_ids = [paper_id for paper_id in missing_ids if paper_id not in papers]
+
+        def fetch(chunk: List[str]) -> Optional[List[Optional[Dict[str, Any]]]]:
+            response = self.transport.post(f"{self.BASE_URL}/batch", params={"fields": fields}, json={"ids": chunk})
+            if response.status_code != 200:
+                print(f"Error: {response.status_code} - {response.text}")
+                return None
+            return response.json()
+
+        chunks = [missing_ids[i:i + self.BATCH_SIZE] for i in range(0, len(missing_ids), self.BATCH_SIZE)]
+        fetched = {}
+        failed = 0
+        workers = min(self.max_workers, len(chunks)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for chunk, results in zip(chunks, executor.map(fetch, chunks)):
+                if results is None:
+                    failed += len(chunk)
+                    continue
+                found = {paper_id: paper for paper_id, paper in zip(chunk, results) if paper is not None}
+                fetched.update(found)
+                if self.store is not None and found:
+                    self.store.add_papers(found.values())
+        papers.update(fetched)
+        if failed:
+            print(f"Warning: The details of {failed} papers could not be fetched; they are listed by ID only.")
+
+        if self.cache is not None and fetched:
+            shards = {}
+            for paper_id in fetched:
+                shards.setdefault(self._paper_cache_key(paper_id, fields), []).append(paper_id)
+            now = time.time()
+            for key, shard_ids in shards.items():
+                # Re-read the entry, which another run may have extended meanwhile, and drop its expired papers
+                entries = {paper_id: entry for paper_id, entry in (self.cache.get(key) or {}).items()
+                           if now - entry["fetched"] <= self.cache.ttl}
+                entries.update((paper_id, {"fetched": now, "paper": fetched[paper_id]}) for paper_id in shard_ids)
+                self.cache.set(key, entries)
+
+        return [papers.get(paper_id) for paper_id in paper_ids]
+
+    def _get_citation_page(self, paper_id: str, offset: int, limit: int, fields: str,
+                           use_cache: bool = True, date_range: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a single page of citations, serving it from the cache when possible.
+
+        Args:
+            paper_id (str): The ID of the paper to retrieve citations for.
+            offset (int): The offset of the first citation in the page.
+            limit (int): The number of citations in the page.
+            fields (str): Comma-separated list of fields to retrieve for each citing paper.
+            use_cache (bool): Whether the page may be served from the cache. Fresh pages are cached either way.
+            date_range (Optional[str]): Restrict the citations to this `publicationDateOrYear` range, e.g. "2020:2021".
 
+        Returns:
+            Optional[Dict[str, Any]]: The decoded response, or None if the request failed.
+        """
+        cache_key = None
+        if self.cache is not None:
+            key_parts = ("citations", self.BASE_URL, paper_id, offset, limit, fields)
+            key_parts += (date_range,) if date_range else ()
+            cache_key = ResponseCache.make_key(*key_parts)
+            if use_cache:
+                data = self.cache.get(cache_key)
+                self.metrics.on_cache(data is not None)
+                if data is not None:
+                    self.metrics.on_page(paper_id, True)
+                    return data
+
+        params = {
+            "fields": fields,
+            "limit": limit,
+            "offset": offset,
+        }
+        if date_range:
+            params["publicationDateOrYear"] = date_range
+        response = self.transport.get(f"{self.BASE_URL}/{paper_id}/citations", params=params)
+        if response.status_code != 200:
+            print(f"Error: {response.status_code} - {response.text}")
+            return None
 
-    def get_citations_for_papers(self, paper_ids: List[str], cites_at_least_n: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+        self.metrics.on_page(paper_id, False)
+        data = response.json()
+        if cache_key is not None:
+            self.cache.set(cache_key, data)
+        return data
+
+    def get_citations_for_papers(self, paper_ids: List[str], cites_at_least_n: int = 0, limit: int = 1000,
+                                 max_workers: Optional[int] = None, state_store: Optional[SeedStateStore] = None,
+                                 hydrate: bool = True, cites_all: Optional[List[str]] = None,
+                                 cites_none: Optional[List[str]] = None,
+                                 min_year: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Retrieve papers that cite at least `cites_at_least_n` papers from the provided list of paper IDs,
         ensuring that each citation is unique.
 
+        Seed papers are fetched concurrently when more than one worker is configured. Results are
+        still merged in the order of `paper_ids`, so the output is identical to a sequential run.
+
+        If a `state_store` is given, only citations added since the previous run are fetched (see
+        `get_new_citations`). The overlap is still counted over all known citations, but only citing
+        papers that gained a new citation to the list are returned.
+
+        With `hydrate` enabled, the citation pages only carry citing paper IDs. The details of the
+        papers that pass the filter are then fetched once per unique paper through `get_papers_batch`,
+        instead of once for every seed paper they cite.
+
+        The seed papers cited by every citing paper are tracked in an `OverlapIndex`, which also answers
+        the `cites_all` and `cites_none` queries. Every returned citation lists the IDs of the input papers
+        it cites under `citedSeeds`.
+
+        A `min_year` is pushed into the citation requests (see `iter_citations`), which also restricts the
+        overlap to citing papers from that year on. It is ignored with a `state_store`, whose incremental
+        fetching needs the complete citation lists; filter the results with a `CitationIndex` instead.
+
         Args:
             paper_ids (List[str]): List of paper IDs to check citations for.
             cites_at_least_n (int): Minimum number of papers from the list that a citing paper must reference.
             limit (int): The maximum number of citations to retrieve per request.
+            max_workers (Optional[int]): Number of seed papers to fetch concurrently. Defaults to the client setting.
+            state_store (Optional[SeedStateStore]): Store of previously seen citations, enabling incremental fetching.
+            hydrate (bool): Whether to fetch citing paper details in bulk after filtering, rather than with every citation page.
+            cites_all (Optional[List[str]]): Papers from the list that a citing paper must all reference.
+            cites_none (Optional[List[str]]): Papers from the list that a citing paper must not reference.
+            min_year (Optional[int]): Only retrieve citing papers published in or after this year.
 
         Returns:
             List[Dict[str, Any]]: A list of unique papers that cite at least `cites_at_least_n` papers from the input list.
+
+        Raises:
+            KeyError: If `cites_all` or `cites_none` contains a paper that is not in the list.
         """
-        citation_count = {}
-        all_citations = []
-        unique_citation_ids = set()
+        overlap = OverlapIndex(paper_ids)
+        # Validate the queries before fetching anything
+        overlap.mask(cites_all or ())
+        overlap.mask(cites_none or ())
+        all_citations = {}
+        changed_ids = set()
 
-        # Gather citations for each paper in the input list
-        for paper_id in paper_ids:
-            citations = self.get_citations(paper_id, limit=limit)
+        workers = min(max_workers or self.max_workers, len(paper_ids)) or 1
+        fields = self.CITATION_ID_FIELDS if hydrate else self.CITATION_FIELDS
 
-            # Track how many times each citing paper references papers in the input list
-            for citation in citations:
-                citing_paper_id = citation.get("citingPaper", {}).get("paperId")
-                if citing_paper_id:
-                    citation_count[citing_paper_id] = citation_count.get(citing_paper_id, 0) + 1
-                    # Ensure we track only unique citations
-                    if citing_paper_id not in unique_citation_ids:
-                        all_citations.append(citation)
-                        unique_citation_ids.add(citing_paper_id)
-
-        # Filter to include only papers that cite at least `cites_at_least_n` papers from the list
-        filtered_citations = [
-            citation for citation in all_citations
-            if citation_count.get(citation.get("citingPaper", {}).get("paperId"), 0) >= cites_at_least_n
+        def fetch(paper_id: str) -> List[Dict[str, Any]]:
+            if state_store is None:
+                citations = self.get_citations(paper_id, limit=limit, fields=fields, min_year=min_year)
+            else:
+                citations, new_citations = self.get_new_citations(paper_id, state_store, limit=limit, fields=fields)
+                changed_ids.update(citation.get("citingPaper", {}).get("paperId") for citation in new_citations)
+            self.metrics.on_seed_done(paper_id, len(citations))
+            return citations
+
+        fetch_start = time.perf_counter()
+        dedup_time = 0.0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # `map` yields results in input order, which keeps the dedup deterministic
+            for paper_id, citations in zip(paper_ids, executor.map(fetch, paper_ids)):
+                dedup_start = time.perf_counter()
+
+                # Track which papers in the input list each citing paper references, keeping unique citations
+                for citation in citations:
+                    citing_paper_id = citation.get("citingPaper", {}).get("paperId")
+                    if citing_paper_id and overlap.add(paper_id, citing_paper_id):
+                        all_citations[citing_paper_id] = citation
+                dedup_time += time.perf_counter() - dedup_start
+
+        # The dedup runs while later seed papers are still being fetched; report the two separately
+        self.metrics.on_stage("fetch", time.perf_counter() - fetch_start - dedup_time)
+        self.metrics.on_stage("dedup", dedup_time)
+
+        with self.metrics.stage("filter"):
+            # Filter to include only papers that cite at least `cites_at_least_n` papers from the list
+            selected_ids = overlap.select(at_least=cites_at_least_n, all_of=cites_all, none_of=cites_none)
+            if state_store is not None:
+                selected_ids = [citing_paper_id for citing_paper_id in selected_ids if citing_paper_id in changed_ids]
+            filtered_citations = [all_citations[citing_paper_id] for citing_paper_id in selected_ids]
+
+        if hydrate and filtered_citations:
+            with self.metrics.stage("hydrate"):
+                citing_paper_ids = [citation["citingPaper"]["paperId"] for citation in filtered_citations]
+                papers = self.get_papers_batch(citing_paper_ids)
+                self.mark_missing_details({citing_paper_id: overlap.cited_seeds(citing_paper_id)
+                                           for citing_paper_id, paper in zip(citing_paper_ids, papers) if paper is None})
+                filtered_citations = [
+                    {"citingPaper": paper} if paper is not None else citation
+                    for citation, paper in zip(filtered_citations, papers)
+                ]
+
+        return [
+            {"citingPaper": citation["citingPaper"], "citedSeeds": overlap.cited_seeds(citing_paper_id)}
+            for citing_paper_id, citation in zip(selected_ids, filtered_citations)
         ]
 
-        return filtered_citations
+    def iter_citations_for_papers(self, paper_ids: List[str], cites_at_least_n: int = 0, limit: int = 1000,
+                                  max_workers: Optional[int] = None, hydrate: bool = True,
+                                  cites_all: Optional[List[str]] = None,
+                                  cites_none: Optional[List[str]] = None,
+                                  min_year: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the unique papers citing the provided list of paper IDs, without holding all of them in memory.
+
+        Citing papers are yielded in the same order as `get_citations_for_papers` returns them. With a
+        single worker they are yielded page by page; with several workers, seed papers are fetched
+        concurrently and yielded one seed paper at a time. When `hydrate` is enabled, details are
+        fetched through the batch endpoint for every `BATCH_SIZE` new citing papers.
+
+        As a citing paper is yielded before the later seed papers are fetched, the seed papers it cites are
+        not known, and it has no `citedSeeds`. Its `seedId` is the seed paper it was first found through.
+        Use `get_citations_for_papers` for the cited seed papers.
+
+        Note that `cites_at_least_n > 1`, `cites_all` and `cites_none` require the citations of every seed
+        paper before the first result is known. These cases are a buffered stage that delegates to
+        `get_citations_for_papers`.
+
+        Args:
+            paper_ids (List[str]): List of paper IDs to check citations for.
+            cites_at_least_n (int): Minimum number of papers from the list that a citing paper must reference.
+            limit (int): The maximum number of citations to retrieve per request.
+            max_workers (Optional[int]): Number of seed papers to fetch concurrently. Defaults to the client setting.
+            hydrate (bool): Whether to fetch citing paper details in bulk rather than with every citation page.
+            cites_all (Optional[List[str]]): Papers from the list that a citing paper must all reference.
+            cites_none (Optional[List[str]]): Papers from the list that a citing paper must not reference.
+            min_year (Optional[int]): Only retrieve citing papers published in or after this year.
+
+        Yields:
+            Dict[str, Any]: Unique citations of the papers in the input list.
+        """
+        if cites_at_least_n > 1 or cites_all or cites_none:
+            yield from self.get_citations_for_papers(paper_ids, cites_at_least_n=cites_at_least_n, limit=limit,
+                                                     max_workers=max_workers, hydrate=hydrate,
+                                                     cites_all=cites_all, cites_none=cites_none, min_year=min_year)
+            return
+
+        workers = min(max_workers or self.max_workers, len(paper_ids)) or 1
+        fields = self.CITATION_ID_FIELDS if hydrate else self.CITATION_FIELDS
+        unique_citation_ids = set()
+        pending = []
+
+        def hydrated(citations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            papers = self.get_papers_batch([citation["citingPaper"]["paperId"] for citation in citations])
+            self.mark_missing_details({citation["citingPaper"]["paperId"]: [citation["seedId"]]
+                                       for citation, paper in zip(citations, papers) if paper is None})
+            return [
+                {"citingPaper": paper, "seedId": citation["seedId"]} if paper is not None else citation
+                for citation, paper in zip(citations, papers)
+            ]
+
+        def fetch(paper_id: str) -> List[Dict[str, Any]]:
+            citations = self.get_citations(paper_id, limit=limit, fields=fields, min_year=min_year)
+            self.metrics.on_seed_done(paper_id, len(citations))
+            return citations
+
+        def seed_citations() -> Iterator[Tuple[str, Dict[str, Any]]]:
+            if workers == 1:
+                for paper_id in paper_ids:
+                    count = 0
+                    for citation in self.iter_citations(paper_id, limit=limit, fields=fields, min_year=min_year):
+                        count += 1
+                        yield paper_id, citation
+                    self.metrics.on_seed_done(paper_id, count)
+                return
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for paper_id, citations in zip(paper_ids, executor.map(fetch, paper_ids)):
+                    for citation in citations:
+                        yield paper_id, citation
+
+        for seed_id, citation in seed_citations():
+            citing_paper_id = citation.get("citingPaper", {}).get("paperId")
+            if not citing_paper_id or citing_paper_id in unique_citation_ids:
+                continue
+            unique_citation_ids.add(citing_paper_id)
+            citation = {"citingPaper": citation["citingPaper"], "seedId": seed_id}
+
+            if not hydrate:
+                yield citation
+                continue
+            pending.append(citation)
+            if len(pending) >= self.BATCH_SIZE:
+                yield from hydrated(pending)
+                pending = []
+
+        if pending:
+            yield from hydrated(pending)
 
     @staticmethod
     def parse_paper_ids_from_file(filename: str) -> List[str]:
         """
-        Parse a file to extract paper IDs, ignoring any comments.
+        Parse a file to extract paper IDs, ignoring any comments. Lines that are not paper IDs are skipped
+        with a warning (see `scholtrack.ids.parse_paper_ids`, which the command-line interface uses as well).
 
         Args:
             filename (str): The path to the file containing paper IDs and comments.
@@ -111,13 +790,5 @@ class CitationExplorerAPI:
         Returns:
             List[str]: A list of extracted paper IDs.
         """
-        paper_ids = []
         with open(filename, 'r', encoding='utf-8') as file:
-            for line in file:
-                line = line.strip()
-                if line and not line.startswith("#"):
-                    # Split by '#' and take the first part (the paper ID)
-                    paper_id = line.split("#")[0].strip()
-                    if paper_id:
-                        paper_ids.append(paper_id)
-        return paper_ids
+            return parse_paper_ids(file, source=filename)
@@ -0,0 +1,225 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any, Tuple
+
+from scholtrack.api import CitationExplorerAPI
+from scholtrack.dedup import Deduplicator
+from scholtrack.exporter import CitationExporter
+from scholtrack.overlap import OverlapIndex
+from scholtrack.query import CitationIndex
+from scholtrack.records import PaperRecord
+
+
+def load_manifest(filename: str) -> Dict[str, Any]:
+    """
+    Load a batch manifest from a TOML file, or from a JSON file with the same structure.
+
+    TOML is parsed with `tomllib` (Python 3.11+) or, on older versions, with the `tomli` package.
+
+    Args:
+        filename (str): The path of the manifest.
+
+    Returns:
+        Dict[str, Any]: The parsed manifest.
+
+    Raises:
+        ImportError: If the manifest is TOML and no TOML parser is available.
+    """
+    if filename.endswith(".json"):
+        with open(filename, "r", encoding="utf-8") as f:
+            return json.load(f)
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise ImportError("TOML manifests require Python 3.11 or tomli. Install it with: pip install tomli, "
+                              "or write the manifest as JSON")
+    with open(filename, "rb") as f:
+        return tomllib.load(f)
+
+
+class BatchJob:
+    """
+    One collection of a batch run: its seed papers, overlap filter, sort order and outputs.
+    """
+
+    def __init__(self, name: str, paper_ids: List[str], sinks: List[Tuple[str, Optional[str]]],
+                 cites_at_least_n: int = 0, cites_all: Optional[List[str]] = None,
+                 cites_none: Optional[List[str]] = None, sort_by: str = "citations", show_abstract: bool = False,
+                 filters: Optional[Dict[str, Any]] = None, dedup: bool = False):
+        """
+        Initializes a job.
+
+        Args:
+            name (str): The name of the collection, used in messages.
+            paper_ids (List[str]): The IDs of the seed papers.
+            sinks (List[Tuple[str, Optional[str]]]): Pairs of output type and file name to export to.
+            cites_at_least_n (int): Minimum number of seed papers that a citing paper must reference.
+            cites_all (Optional[List[str]]): Seed papers that a citing paper must all reference.
+            cites_none (Optional[List[str]]): Seed papers that a citing paper must not reference.
+            sort_by (str): The field by which to sort the exported citations.
+            show_abstract (bool): Whether to include abstracts in the txt and stdout outputs.
+            filters (Optional[Dict[str, Any]]): Criteria of `CitationIndex.select` that the citing papers must match.
+            dedup (bool): Whether to merge duplicate citing papers before applying the overlap filter.
+        """
+        self.name = name
+        self.paper_ids = paper_ids
+        self.sinks = sinks
+        self.cites_at_least_n = cites_at_least_n
+        self.cites_all = cites_all
+        self.cites_none = cites_none
+        self.sort_by = sort_by
+        self.show_abstract = show_abstract
+        self.filters = filters or {}
+        self.dedup = dedup
+
+
+class BatchRunner:
+    """
+    Runs several collections at once, fetching every seed paper only once.
+
+    The citations of the union of all seed papers are fetched concurrently in a single pass. Each
+    collection then gets its own overlap index over its seed papers, so that its filter sees exactly
+    the citations a separate run would. The citing papers selected by any collection are hydrated
+    together through the batch endpoint, and the collections are exported in parallel.
+    """
+
+    def __init__(self, api: CitationExplorerAPI, max_workers: Optional[int] = None, export_workers: int = 4,
+                 hydrate: bool = True, limit: int = 1000):
+        """
+        Initializes the runner.
+
+        Args:
+            api (CitationExplorerAPI): The client used to fetch citations.
+            max_workers (Optional[int]): Number of seed papers fetched concurrently. Defaults to the client setting.
+            export_workers (int): Number of collections filtered and exported concurrently.
+            hydrate (bool): Whether to fetch citing paper details in bulk after filtering, rather than with every citation page.
+            limit (int): The maximum number of citations to retrieve per request.
+        """
+        self.api = api
+        self.max_workers = max_workers or api.max_workers
+        self.export_workers = export_workers
+        self.hydrate = hydrate
+        self.limit = limit
+
+    def fetch(self, paper_ids: List[str], min_year: Optional[int] = None) -> Tuple[Dict[str, List[str]], Dict[str, Dict[str, Any]]]:
+        """
+        Fetch the citations of every seed paper once.
+
+        Args:
+            paper_ids (List[str]): The IDs of the seed papers, possibly with duplicates.
+            min_year (Optional[int]): Only fetch citing papers published in or after this year.
+
+        Returns:
+            Tuple[Dict[str, List[str]], Dict[str, Dict[str, Any]]]: The IDs of the papers citing every seed
+            paper, in the order the API listed them, and the first citation seen of every citing paper.
+        """
+        seed_ids = list(dict.fromkeys(paper_ids))
+        fields = self.api.CITATION_ID_FIELDS if self.hydrate else self.api.CITATION_FIELDS
+        workers = min(self.max_workers, len(seed_ids)) or 1
+        metrics = self.api.metrics
+
+        def fetch_seed(paper_id: str) -> List[Dict[str, Any]]:
+            citations = self.api.get_citations(paper_id, limit=self.limit, fields=fields, min_year=min_year)
+            metrics.on_seed_done(paper_id, len(citations))
+            return citations
+
+        citing_ids = {}
+        citations_by_id = {}
+        with metrics.stage("fetch"), ThreadPoolExecutor(max_workers=workers) as executor:
+            for paper_id, citations in zip(seed_ids, executor.map(fetch_seed, seed_ids)):
+                ids = []
+                for citation in citations:
+                    citing_paper_id = citation.get("citingPaper", {}).get("paperId")
+                    if citing_paper_id:
+                        ids.append(citing_paper_id)
+                        citations_by_id.setdefault(citing_paper_id, citation)
+                citing_ids[paper_id] = ids
+        return citing_ids, citations_by_id
+
+    @staticmethod
+    def select(job: BatchJob, citing_ids: Dict[str, List[str]]) -> Tuple[List[str], OverlapIndex]:
+        """
+        Select the citing papers of a job, in the order a separate run would return them. Jobs merging
+        duplicates select all citing papers, as their overlap filter applies to the merged papers.
+
+        Args:
+            job (BatchJob): The job.
+            citing_ids (Dict[str, List[str]]): The IDs of the papers citing every seed paper, as returned by `fetch`.
+
+        Returns:
+            Tuple[List[str], OverlapIndex]: The selected citing paper IDs and the overlap index of the job.
+        """
+        overlap = OverlapIndex(job.paper_ids)
+        for seed_id in overlap.seed_ids:
+            for citing_paper_id in citing_ids[seed_id]:
+                overlap.add(seed_id, citing_paper_id)
+        if job.dedup:
+            return list(overlap.paper_ids), overlap
+        selected_ids = overlap.select(at_least=job.cites_at_least_n, all_of=job.cites_all, none_of=job.cites_none)
+        return selected_ids, overlap
+
+    def run(self, jobs: List[BatchJob]) -> Dict[str, int]:
+        """
+        Fetch the citations of all jobs in a single pass, then filter and export every job.
+
+        Args:
+            jobs (List[BatchJob]): The jobs to run.
+
+        Returns:
+            Dict[str, int]: The number of exported citations of every job, by name.
+        """
+        metrics = self.api.metrics
+        # The fetch is shared, so a minimum year is only pushed into the requests if every job has one
+        min_years = [job.filters.get("min_year") for job in jobs]
+        min_year = min(min_years) if None not in min_years else None
+        citing_ids, citations_by_id = self.fetch([paper_id for job in jobs for paper_id in job.paper_ids],
+                                                 min_year=min_year)
+
+        with metrics.stage("filter"):
+            selections = [self.select(job, citing_ids) for job in jobs]
+
+        # Hydrate the papers selected by any job once
+        if self.hydrate:
+            with metrics.stage("hydrate"):
+                selected_ids = list(dict.fromkeys(paper_id for ids, _ in selections for paper_id in ids))
+                missing_ids = set()
+                for paper_id, paper in zip(selected_ids, self.api.get_papers_batch(selected_ids)):
+                    if paper is not None:
+                        citations_by_id[paper_id] = {"citingPaper": paper}
+                    else:
+                        missing_ids.add(paper_id)
+                cited_seeds = {}
+                for seed_id, ids in citing_ids.items():
+                    for paper_id in missing_ids.intersection(ids):
+                        cited_seeds.setdefault(paper_id, []).append(seed_id)
+                self.api.mark_missing_details(cited_seeds)
+
+        def export(job: BatchJob, selection: Tuple[List[str], OverlapIndex]) -> int:
+            selected_ids, overlap = selection
+            start = time.perf_counter()
+            records = PaperRecord.from_citations(
+                {"citingPaper": citations_by_id[paper_id]["citingPaper"], "citedSeeds": overlap.cited_seeds(paper_id)}
+                for paper_id in selected_ids
+            )
+            metrics.on_stage("normalize", time.perf_counter() - start)
+            if job.dedup:
+                with metrics.stage("merge"):
+                    records = Deduplicator().deduplicate(records, seed_ids=overlap.seed_ids)
+                    records = OverlapIndex.filter(records, overlap.seed_ids, at_least=job.cites_at_least_n,
+                                                  all_of=job.cites_all, none_of=job.cites_none)
+            if job.filters:
+                with metrics.stage("query"):
+                    records = CitationIndex.filter(records, **job.filters)
+            CitationExporter.export(records, job.sinks, sort_by=job.sort_by, show_abstract=job.show_abstract,
+                                    metrics=metrics)
+            return len(records)
+
+        metrics.close()
+        workers = min(self.export_workers, len(jobs)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            counts = list(executor.map(export, jobs, selections))
+        return {job.name: count for job, count in zip(jobs, counts)}
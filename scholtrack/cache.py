@@ -0,0 +1,159 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Optional
+
+
+class ResponseCache:
+    """
+    A persistent on-disk cache for Semantic Scholar API responses.
+
+    Each response is stored as a gzip-compressed JSON file named after the hash of its key. Entries
+    expire after `ttl` seconds, and the least recently used entries are evicted once the cache grows
+    beyond `max_size_mb`.
+    """
+
+    def __init__(self, cache_dir: str, ttl: float = 12 * 3600, max_size_mb: float = 512):
+        """
+        Initializes the response cache.
+
+        Args:
+            cache_dir (str): Directory where cached responses are stored. Created if it does not exist.
+            ttl (float): Time to live of a cached response, in seconds.
+            max_size_mb (float): Maximum total size of the cache directory, in megabytes.
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = sum(os.path.getsize(path) for path in self._iter_files())
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Build a cache key from the parts identifying a request, e.g. API base URL, paper ID, offset, limit
+        and fields. The base URL keeps responses of a mock server or fixture apart from those of the real API.
+
+        Returns:
+            str: A hex digest uniquely identifying the request.
+        """
+        return hashlib.sha1(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json.gz")
+
+    def _iter_files(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json.gz"):
+                    yield os.path.join(root, name)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): The cache key, as returned by `make_key`.
+
+        Returns:
+            Optional[Any]: The cached response, or None if it is missing or expired.
+        """
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if time.time() - entry.get("created", 0) > self.ttl:
+            self._remove(path)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Touch the file so that eviction removes the least recently used entries first
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return entry.get("data")
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a response in the cache, evicting old entries if the size cap is exceeded.
+
+        Args:
+            key (str): The cache key, as returned by `make_key`.
+            value (Any): The JSON-serializable response to store.
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump({"created": time.time(), "data": value}, f)
+
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._size += os.path.getsize(path) - old_size
+            over_limit = self._size > self.max_size
+        if over_limit:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove expired entries, then the least recently used ones until the cache is below 90% of its size cap.
+        """
+        with self._lock:
+            entries = []
+            for path in self._iter_files():
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            entries.sort()
+
+            now = time.time()
+            size = sum(entry[1] for entry in entries)
+            target = int(self.max_size * 0.9)
+            for mtime, file_size, path in entries:
+                if size <= target and now - mtime <= self.ttl:
+                    break
+                try:
+                    os.remove(path)
+                    size -= file_size
+                except OSError:
+                    pass
+            self._size = size
+
+    def clear(self) -> None:
+        """
+        Remove all entries from the cache.
+        """
+        with self._lock:
+            for path in list(self._iter_files()):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._size = 0
+
+    def _remove(self, path: str) -> None:
+        try:
+            file_size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            self._size -= file_size
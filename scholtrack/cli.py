@@ -1,23 +1,14 @@
 import argparse
+import json
 import os
-import sys
-import time
-from pathlib import Path
-from threading import Thread, Event
-from scholtrack.api import CitationExplorerAPI
-from scholtrack.exporter import CitationExporter
 import re
-import pkg_resources
-
-def rolling_indicator(stop_event):
-    """A simple rolling progress indicator to show the process is ongoing."""
-    while not stop_event.is_set():
-        for symbol in "|/-\\":
-            if stop_event.is_set():
-                break
-            sys.stdout.write(f"\rProcessing... {symbol}")
-            sys.stdout.flush()
-            time.sleep(0.2)
+import sys
+from importlib.resources import files
+
+from scholtrack.ids import parse_paper_ids
+
+# The API client, the exporter, the HTTP stack (requests) and the progress bar (tqdm) are imported in the
+# functions that use them, so that parsing arguments and --help stay fast.
 
 def print_header():
     """Print a structured header with app information."""
@@ -44,6 +35,20 @@ BLUE_COLOR = '\033[94m'
 PURPLE_COLOR = '\033[95m'
 DEFAULT_COLOR = '\033[0m'  # Reset color to default
 
+# Default location of the on-disk response cache
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'scholtrack')
+
+# Default location of the per-seed state used by --since-last-run
+DEFAULT_STATE_DIR = os.path.join(os.environ.get('XDG_STATE_HOME', os.path.expanduser('~/.local/state')), 'scholtrack')
+
+# Default location of the local paper store used by --store and the query command
+DEFAULT_STORE_PATH = os.path.join(os.environ.get('XDG_DATA_HOME', os.path.expanduser('~/.local/share')), 'scholtrack', 'papers.sqlite')
+
+# Same as CitationExporter.OUTPUT_TYPES and the HttpTransport rates, without importing them (checked by tests/test_cli.py)
+OUTPUT_TYPES = ("stdout", "csv", "json", "jsonl", "txt", "parquet", "arrow", "sqlite")
+KEYED_RATE = 1.0
+UNKEYED_RATE = 5.0
+
 def extract_paper_id(url: str) -> str:
     """
     Extract the paper ID from a Semantic Scholar URL.
@@ -62,76 +67,120 @@ def extract_paper_id(url: str) -> str:
         return ""
 
 
-def load_collection_file(collection_name):
+def pair_outputs(output_types, outputs):
     """
-    Load a collection of paper IDs from a file, ignoring comments after '#'.
+    Pair each output type given with -t with its output file given with -o, in command-line order.
 
     Args:
-        collection_name (str): The name of the collection (without the .txt extension).
+        output_types (List[str]): The output types. The stdout type takes no output file.
+        outputs (List[str]): The output file names.
 
     Returns:
-        List[str]: A list of paper IDs.
+        List[Tuple[str, Optional[str]]]: The (output type, file name) pairs.
+
+    Raises:
+        ValueError: If the number of output files does not match the output types.
     """
-    try:
-        # Load the file using pkg_resources to ensure it's accessible within the package
-        collection_file = pkg_resources.resource_filename('scholtrack', f'collections/{collection_name}.txt')
+    remaining = list(outputs)
+    sinks = []
+    for output_type in output_types:
+        if output_type == 'stdout':
+            sinks.append((output_type, None))
+        elif remaining:
+            sinks.append((output_type, remaining.pop(0)))
+        else:
+            raise ValueError(f"You must specify an output file name with --output (-o) when using output type {output_type}.")
+    if remaining:
+        raise ValueError(f"Got more output files than output types: {', '.join(remaining)}.")
+    return sinks
 
-        paper_ids = []
-        with open(collection_file, 'r') as f:
-            for line in f:
-                # Remove comments after '#' and strip leading/trailing whitespaces
-                line = line.split('#')[0].strip()
 
-                # Validate that the line contains a paper ID (should match Semantic Scholar ID format)
-                if re.match(r'^[a-f0-9]{40}$', line):
-                    paper_ids.append(line)
+def load_collection_file(collection_name):
+    """
+    Load a collection of paper IDs shipped with the package, ignoring comments after '#'.
 
-        if not paper_ids:
-            print(f"Warning: No valid paper IDs found in {collection_name}.txt.")
-        return paper_ids
+    Args:
+        collection_name (str): The name of the collection (without the .txt extension).
 
+    Returns:
+        Optional[List[str]]: A list of paper IDs, or None if the collection does not exist.
+    """
+    collection_file = files('scholtrack').joinpath('collections', f'{collection_name}.txt')
+    try:
+        paper_ids = parse_paper_ids(collection_file.read_text(encoding='utf-8').splitlines(), source=f'{collection_name}.txt')
     except FileNotFoundError:
         print(f"Error: Collection file {collection_name}.txt not found.")
-        return []
-    
-def main():
-    print_header()
-
-    parser = argparse.ArgumentParser(
-        description='ScholTrack Command-Line Interface: Fetch Citations for Papers via Semantic Scholar API',
-        epilog='''Usage examples:
-
-        1. Fetch citations for multiple paper IDs and export to CSV:
-            scholtrack -p 2cc1d857e86d5152ba7fe6a8355c2a0150cc280a 428b663772dba998f5dc6a24488fff1858a0899f -o my_citations.csv -t csv
+        return None
 
-        2. Fetch and display citations for Paper IDs from a file, sorted by year:
-            scholtrack -f nerf.txt -s year -t stdout
-
-        3. Fetch citations for papers in the "nerf" collection, but only display those citing at least 2 papers from the list:
-            scholtrack -c nerf -n 2 -t stdout
+    if not paper_ids:
+        print(f"Warning: No valid paper IDs found in {collection_name}.txt.")
+    return paper_ids
 
-        4. Fetch and display citations from URLs, exporting results to CSV:
-            scholtrack --urls https://www.semanticscholar.org/paper/.../11665dbecb17ef4d3d71b75b8666ce0e61bd43fa -o my_citations.csv -t csv
-        ''',
-        formatter_class=argparse.RawTextHelpFormatter
-    )
 
+def add_input_arguments(parser):
+    """
+    Add the arguments selecting the seed papers to a parser.
+    """
     parser.add_argument('-p', '--paper-ids', nargs='+', help='List of paper IDs to get citations for')
     parser.add_argument('-u', '--urls', nargs='+', help='List of Semantic Scholar URLs to get paper IDs from')
     parser.add_argument('-f', '--file', help='Path to the text file with paper IDs and optional comments')
     parser.add_argument('-c', '--collection', help='Name of the collection (automatically looks in collections/ folder in the repository)')
+
+
+def add_selection_arguments(parser):
+    """
+    Add the arguments filtering, sorting and exporting the citing papers to a parser.
+    """
     parser.add_argument('-n', '--cites-at-least-n', type=int, default=0, help='Minimum number of papers a citing paper must reference from the provided list')
-    parser.add_argument('-t', '--output-type', choices=['stdout', 'csv', 'json', 'txt'], default='csv', help='Specify the output format: stdout, csv, json, or txt')
-    parser.add_argument('-o', '--output', help='Output file name for csv, json, or txt formats')
-    parser.add_argument('-s', '--sort-by', choices=['citations', 'arxiv', 'year'], default='citations', help='Specify the field by which to sort the citations')
+    parser.add_argument('-t', '--output-type', action='append', choices=list(OUTPUT_TYPES),
+                        help='Specify the output format: stdout, csv (default), json, jsonl (JSON Lines), txt, parquet, arrow, or sqlite.\n'
+                             'Repeat together with -o to write several outputs in one run, e.g. -t csv -o a.csv -t json -o a.json.\n'
+                             'Parquet and Arrow require pyarrow (pip install scholtrack[arrow])')
+    parser.add_argument('-o', '--output', action='append', help='Output file name for all formats except stdout; give one per -t')
+    parser.add_argument('--cites-all', nargs='+', metavar='PAPER_ID', help='Only keep papers citing all of these papers from the provided list')
+    parser.add_argument('--cites-none', nargs='+', metavar='PAPER_ID', help='Drop papers citing any of these papers from the provided list')
+    parser.add_argument('--min-year', type=int, help='Only keep papers published in or after this year (also restricts the API requests)')
+    parser.add_argument('--min-citations', type=int, help='Only keep papers with at least this many citations')
+    parser.add_argument('--venue', nargs='+', help='Only keep papers from any of these venues, matched by words ignoring case, e.g. CVPR')
+    parser.add_argument('--field', nargs='+', help='Only keep papers with any of these fields of study, e.g. "Computer Science"')
+    parser.add_argument('--keyword', nargs='+', help='Only keep papers with all of these keywords in their title or abstract; end a keyword with * to match word prefixes')
+    parser.add_argument('--dedup', action='store_true', help='Merge citing papers listed more than once, e.g. an arXiv preprint and its published version, matched by DOI, arXiv ID or similar title.\n'
+                                                             'The overlap filters (-n, --cites-all, --cites-none) then see the cited papers of all merged entries')
+    parser.add_argument('-s', '--sort-by', choices=['citations', 'arxiv', 'year', 'overlap'], default='citations', help='Specify the field by which to sort the citations (overlap: number of papers cited from the provided list)')
     parser.add_argument('--show-abstract', action='store_true', help='Show the abstract field when saving or displaying results')
     parser.add_argument('-q', '--quiet', action='store_true', help='Omit displaying first N citations in the command line')
-    parser.add_argument('-k', '--api-key', help='Semantic Scholar API Key (optional)')
     parser.add_argument('-l', '--display-limit', type=int, default=5, help='Maximum number of found papers to show in terminal')
 
-    args = parser.parse_args()
 
-    # Collect paper IDs from input arguments
+def add_fetch_arguments(parser):
+    """
+    Add the arguments configuring the API client, its cache and the local paper store to a parser.
+    """
+    parser.add_argument('-k', '--api-key', help='Semantic Scholar API Key (optional)')
+    parser.add_argument('-w', '--workers', type=int, default=4, help='Number of seed papers to fetch concurrently (use 1 to fetch them one by one)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help=f'Directory for the on-disk API response cache (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--cache-ttl', type=float, default=12, help='Hours before a cached API response expires (default: 12)')
+    parser.add_argument('--cache-size', type=float, default=512, help='Maximum size of the response cache in MB; least recently used entries are evicted first (default: 512)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the on-disk response cache')
+    parser.add_argument('--rate-limit', type=float, help=f'Maximum API requests per second (default: {KEYED_RATE} with an API key, {UNKEYED_RATE} without; 0 disables throttling)')
+    parser.add_argument('--api-url', help='Base URL of the paper endpoint of the Semantic Scholar API, e.g. a local mock server for testing')
+    parser.add_argument('--no-batch', action='store_true', help='Fetch citing paper details with every citation page instead of in bulk through the batch endpoint')
+    parser.add_argument('--stats', nargs='?', const='table', choices=['table', 'json'], help='Print request, cache and stage timing statistics at the end of the run, as a table (default) or as JSON')
+    parser.add_argument('--store', nargs='?', const=DEFAULT_STORE_PATH, metavar='PATH', help=f'Keep fetched papers and citations in a local SQLite store shared by all runs, and only fetch the seed papers missing from it (default path: {DEFAULT_STORE_PATH})')
+    parser.add_argument('--store-max-age', type=float, default=24, help='Hours before the citations of a seed paper in the --store are fetched again (default: 24)')
+    parser.add_argument('--journal', metavar='PATH', help=f'Journal file where the citations of every completed seed paper are saved as they are fetched\n(default: a file per list of seed papers in {os.path.join(DEFAULT_STATE_DIR, "journals")}, removed once a run finishes)')
+    parser.add_argument('--resume', action='store_true', help='Resume a crashed or interrupted run from its journal, only fetching the seed papers missing from it')
+    parser.add_argument('--journal-max-age', type=float, default=24, help='Hours after which the seed papers of an interrupted run are fetched again, and its journal is started over without --resume (default: 24)')
+    parser.add_argument('--no-journal', action='store_true', help='Do not keep a journal of the completed seed papers')
+
+
+def collect_paper_ids(args):
+    """
+    Collect the seed paper IDs given with --urls, --collection, --file and --paper-ids.
+
+    Returns:
+        Optional[List[str]]: The paper IDs, or None if the collection does not exist.
+    """
     paper_ids = []
 
     # Fetch paper IDs from URLs
@@ -145,75 +194,601 @@ def main():
 
     # Fetch paper IDs from collections
     if args.collection:
-        try:
-            collection_file = pkg_resources.resource_filename('scholtrack', f'collections/{args.collection}.txt')
-            paper_ids.extend(CitationExplorerAPI.parse_paper_ids_from_file(collection_file))
-        except FileNotFoundError:
-            print(f"Error: Collection file {args.collection}.txt not found.")
-            return
+        collection_ids = load_collection_file(args.collection)
+        if collection_ids is None:
+            return None
+        paper_ids.extend(collection_ids)
 
     # Fetch paper IDs from file
     if args.file:
-        paper_ids.extend(CitationExplorerAPI.parse_paper_ids_from_file(args.file))
+        with open(args.file, 'r', encoding='utf-8') as f:
+            paper_ids.extend(parse_paper_ids(f, source=args.file))
 
     # Fetch paper IDs from command-line input
     if args.paper_ids:
         paper_ids.extend(args.paper_ids)
 
+    return paper_ids
+
+
+def query_filters(args):
+    """
+    Get the criteria given with --min-year, --min-citations, --venue, --field and --keyword.
+
+    Returns:
+        Dict[str, Any]: The keyword arguments of `CitationIndex.select` that were given.
+    """
+    criteria = {
+        'min_year': args.min_year,
+        'min_citations': args.min_citations,
+        'venues': args.venue,
+        'fields': args.field,
+        'keywords': args.keyword,
+    }
+    return {name: value for name, value in criteria.items() if value is not None}
+
+
+def apply_query_filters(args, citations, metrics=None):
+    """
+    Filter the normalized citations with the criteria given on the command line, if any.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+        citations (List[PaperRecord]): The citations to filter.
+        metrics (Optional[MetricsHook]): Hook receiving the duration of the query stage.
+
+    Returns:
+        List[PaperRecord]: The matching citations, in the same order.
+    """
+    criteria = query_filters(args)
+    if not criteria:
+        return citations
+
+    from scholtrack.metrics import MetricsHook
+    from scholtrack.query import CitationIndex
+
+    with (metrics or MetricsHook()).stage("query"):
+        return CitationIndex.filter(citations, **criteria)
+
+
+def overlap_arguments(args):
+    """
+    Get the overlap filters to apply while fetching. With --dedup they are applied after merging duplicates instead.
+
+    Returns:
+        Dict[str, Any]: The cites_at_least_n, cites_all and cites_none keyword arguments of the fetch.
+    """
+    if args.dedup:
+        return {'cites_at_least_n': 0, 'cites_all': None, 'cites_none': None}
+    return {'cites_at_least_n': args.cites_at_least_n, 'cites_all': args.cites_all, 'cites_none': args.cites_none}
+
+
+def apply_dedup(args, citations, paper_ids, metrics=None):
+    """
+    Merge duplicate citing papers if --dedup is given, then apply the overlap filters to the merged papers.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+        citations (List[PaperRecord]): The normalized citations, fetched without overlap filters.
+        paper_ids (List[str]): The IDs of the seed papers.
+        metrics (Optional[MetricsHook]): Hook receiving the duration of the merge stage.
+
+    Returns:
+        List[PaperRecord]: The merged citations matching the overlap filters.
+    """
+    if not args.dedup:
+        return citations
+
+    from scholtrack.dedup import Deduplicator
+    from scholtrack.metrics import MetricsHook
+    from scholtrack.overlap import OverlapIndex
+
+    with (metrics or MetricsHook()).stage("merge"):
+        count = len(citations)
+        citations = Deduplicator().deduplicate(citations, seed_ids=paper_ids)
+        print(f"Merged {count - len(citations)} duplicate citing papers.")
+        if args.cites_at_least_n > 1 or args.cites_all or args.cites_none:
+            citations = OverlapIndex.filter(citations, paper_ids, at_least=args.cites_at_least_n,
+                                            all_of=args.cites_all, none_of=args.cites_none)
+    return citations
+
+
+def check_overlap_arguments(parser, args, paper_ids):
+    """
+    Ensure that --cites-all and --cites-none only name papers from the provided list.
+    """
+    unknown_ids = [paper_id for paper_id in (args.cites_all or []) + (args.cites_none or []) if paper_id not in paper_ids]
+    if unknown_ids:
+        parser.error(f"--cites-all and --cites-none only accept papers from the provided list, got: {', '.join(unknown_ids)}")
+
+
+def main():
+    print_header()
+
+    if sys.argv[1:2] == ['query']:
+        query(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ['batch']:
+        batch(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(
+        description='ScholTrack Command-Line Interface: Fetch Citations for Papers via Semantic Scholar API',
+        epilog='''Usage examples:
+
+        1. Fetch citations for multiple paper IDs and export to CSV:
+            scholtrack -p 2cc1d857e86d5152ba7fe6a8355c2a0150cc280a 428b663772dba998f5dc6a24488fff1858a0899f -o my_citations.csv -t csv
+
+        2. Fetch and display citations for Paper IDs from a file, sorted by year:
+            scholtrack -f nerf.txt -s year -t stdout
+
+        3. Fetch citations for papers in the "nerf" collection, but only display those citing at least 2 papers from the list:
+            scholtrack -c nerf -n 2 -t stdout
+
+        4. Fetch and display citations from URLs, exporting results to CSV:
+            scholtrack --urls https://www.semanticscholar.org/paper/.../11665dbecb17ef4d3d71b75b8666ce0e61bd43fa -o my_citations.csv -t csv
+
+        5. Fetch citations for the "nvs" collection once and save them to both CSV and JSON:
+            scholtrack -c nvs -t csv -o nvs.csv -t json -o nvs.json
+
+        Other commands (run them with --help for their options):
+            scholtrack query    Find citing papers in the local paper store filled with --store, without network access
+            scholtrack batch    Run the collections of a manifest file, fetching the papers they share only once
+        ''',
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+
+    add_input_arguments(parser)
+    add_selection_arguments(parser)
+    add_fetch_arguments(parser)
+    parser.add_argument('--stream', action='store_true', help='Write citations to the csv, jsonl, or txt output as they are fetched, in fetch order instead of sorted.\nKeeps memory flat for very large collections (-n above 1 still buffers all citations)')
+    parser.add_argument('--hops', type=int, default=1, help='Number of citation hops to follow, e.g. 2 also collects the papers citing the citing papers (default: 1)')
+    parser.add_argument('--hop-min-citations', type=int, nargs='+', default=[0], help='Minimum citation count of papers kept and expanded with --hops; give one value per hop to vary it')
+    parser.add_argument('--hop-min-year', type=int, nargs='+', help='Minimum publication year of papers kept and expanded with --hops; give one value per hop to vary it')
+    parser.add_argument('--max-requests', type=int, help='Maximum number of API requests spent on a --hops crawl')
+    parser.add_argument('--checkpoint', help='File where a --hops crawl saves its progress; an interrupted crawl resumes from it')
+    parser.add_argument('--since-last-run', action='store_true', help='Only fetch and report citing papers that are new since the previous --since-last-run run')
+    parser.add_argument('--profile', metavar='FILE', help='Profile the run with cProfile and save the statistics to FILE (view them with python -m pstats FILE)')
+    parser.add_argument('--state-dir', default=DEFAULT_STATE_DIR, help=f'Directory where --since-last-run keeps the citations seen so far (default: {DEFAULT_STATE_DIR})')
+
+    args = parser.parse_args()
+
+    # Collect paper IDs from input arguments
+    paper_ids = collect_paper_ids(args)
+    if paper_ids is None:
+        return
+
     # Check if paper IDs were collected
     if not paper_ids:
         parser.error("No input provided. Use --urls, --collection, --file, or --paper-ids.")
 
-    # Ensure an output file name if the output type is not stdout
-    if args.output_type != 'stdout' and not args.output:
-        print(f"Error: You must specify an output file name with --output (-o) when using output type {args.output_type}.")
+    # Ensure an output file name for every output type except stdout
+    try:
+        sinks = pair_outputs(args.output_type or ['csv'], args.output or [])
+    except ValueError as e:
+        print(f"Error: {e}")
         return
 
+    if args.stream and (len(sinks) != 1 or sinks[0][0] not in ('csv', 'jsonl', 'txt')):
+        parser.error("--stream only supports a single csv, jsonl, or txt output.")
+    if args.stream and args.since_last_run:
+        parser.error("--stream cannot be combined with --since-last-run.")
+    if args.stream and args.dedup:
+        parser.error("--stream cannot be combined with --dedup, which needs all citations before merging them.")
+    if args.hops > 1 and (args.stream or args.since_last_run or args.cites_at_least_n > 1 or args.cites_all or args.cites_none):
+        parser.error("--hops cannot be combined with --stream, --since-last-run, -n, --cites-all, or --cites-none.")
+    if args.hops > 1 and query_filters(args):
+        parser.error("--hops cannot be combined with --min-year, --min-citations, --venue, --field, or --keyword; use --hop-min-year and --hop-min-citations.")
+    if args.resume and (args.stream or args.hops > 1 or args.since_last_run or args.no_journal):
+        parser.error("--resume cannot be combined with --stream, --hops (use --checkpoint), --since-last-run, or --no-journal.")
+    if args.stream and set(query_filters(args)) - {'min_year'}:
+        parser.error("--stream only supports --min-year among the --min-citations, --venue, --field, and --keyword filters.")
+    check_overlap_arguments(parser, args, paper_ids)
+
     print("\nScholTrack is about to start fetching citations for the provided papers.")
     print("\nNote: This process may take several minutes for large lists or papers with many citations.")
 
-    # Start the rolling indicator in a separate thread
-    stop_event = Event()
-    indicator_thread = Thread(target=rolling_indicator, args=(stop_event,))
-    indicator_thread.start()
+    from scholtrack.metrics import RunMetrics, ProgressHook, CompositeHook
+
+    # Only plain runs keep a journal: --hops has its own --checkpoint, and --since-last-run its own per-seed state
+    args.journal_file = journal_path(args, paper_ids) if not (args.stream or args.hops > 1 or args.since_last_run) else None
+    check_journal(parser, args, args.journal_file)
+
+    # Show the progress of the fetch and collect the statistics of the run
+    run_metrics = RunMetrics()
+    progress = ProgressHook(total=len(paper_ids) if args.hops <= 1 else None,
+                            description="Fetching citations" if args.hops <= 1 else "Crawling citations")
+    metrics = CompositeHook([run_metrics, progress])
 
     try:
-        # Initialize API client
-        api_client = CitationExplorerAPI(api_key=args.api_key)
-
-        # Fetch citations
-        citations = api_client.get_citations_for_papers(paper_ids, cites_at_least_n=args.cites_at_least_n)
-
-        # Stop rolling indicator
-        stop_event.set()
-        indicator_thread.join()
-
-        # Handle output
-        if args.output_type == 'csv':
-            CitationExporter.save_to_csv(citations, filename=args.output, sort_by=args.sort_by)
-        elif args.output_type == 'json':
-            CitationExporter.save_to_json(citations, filename=args.output)
-        elif args.output_type == 'txt':
-            CitationExporter.save_to_txt(citations, filename=args.output, sort_by=args.sort_by, show_abstract=args.show_abstract)
-        elif args.output_type == 'stdout':
-            CitationExporter.display_citations(citations, sort_by=args.sort_by, limit=args.display_limit, show_abstract=args.show_abstract)
-
-        # Display additional results in the terminal if quiet mode is not enabled
-        if not args.quiet:
-            CitationExporter.display_citations(citations, sort_by=args.sort_by, limit=args.display_limit, show_abstract=args.show_abstract)
-            sort_explanation = {
-                'citations': 'citation count',
-                'arxiv': 'arXiv date of appearance',
-                'year': 'year of publication'
-            }
-            print(f"\nAll done, found {GREEN_COLOR}{len(citations)} citations{DEFAULT_COLOR}. Showing {PURPLE_COLOR}top {args.display_limit} results based on {sort_explanation[args.sort_by]}{DEFAULT_COLOR}.")
-            if args.output:
-                print(f"The full results are saved in {BLUE_COLOR}{args.output}{DEFAULT_COLOR}.")
-                
+        if args.profile:
+            import cProfile
+            profiler = cProfile.Profile()
+            try:
+                profiler.runcall(run, args, paper_ids, sinks, metrics)
+            finally:
+                profiler.dump_stats(args.profile)
+                print(f"Profile saved in {BLUE_COLOR}{args.profile}{DEFAULT_COLOR}.")
+        else:
+            run(args, paper_ids, sinks, metrics)
     except Exception as e:
-        stop_event.set()
-        indicator_thread.join()
+        metrics.close()
         print(f"Error occurred: {e}")
+        if args.journal_file and os.path.exists(args.journal_file):
+            print(f"The seed papers fetched so far are saved in {BLUE_COLOR}{args.journal_file}{DEFAULT_COLOR}. "
+                  f"Rerun the same command with --resume to continue from there.")
+
+    print_stats(args, run_metrics)
+
+
+def journal_path(args, paper_ids):
+    """
+    Get the path of the journal of a run: the --journal file, or a file named after the set of seed papers.
+
+    Returns:
+        Optional[str]: The path, or None if journaling is disabled with --no-journal.
+    """
+    if args.no_journal:
+        return None
+    if args.journal:
+        return args.journal
+    import hashlib
+    digest = hashlib.sha1('\n'.join(sorted(set(paper_ids))).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(DEFAULT_STATE_DIR, 'journals', f'{digest}.jsonl')
+
+
+def check_journal(parser, args, journal_file):
+    """
+    Refuse to start over the fresh journal of a crashed or interrupted run unless --resume is given, so that it
+    is never emptied by a rerun that forgot the flag. Finished runs remove their journal, and stale journals
+    older than --journal-max-age are started over.
+    """
+    from scholtrack.journal import FetchJournal
+
+    if journal_file and not args.resume and FetchJournal.exists(journal_file, max_age=args.journal_max_age * 3600):
+        parser.error(f"The journal {journal_file} of an interrupted run with the same papers exists. "
+                     f"Rerun with --resume to continue from it, or remove it to start over.")
+
+
+def report_incomplete_seeds(api_client):
+    """
+    Print the papers whose citations could not all be fetched, so that partial results are never silent.
+
+    Args:
+        api_client (CitationExplorerAPI): The client of the run.
+    """
+    if not api_client.incomplete_seeds:
+        return
+    print(f"\n{RED_COLOR}Warning: The citations of {len(api_client.incomplete_seeds)} papers could not be fetched completely, "
+          f"so the results are partial:{DEFAULT_COLOR}")
+    for paper_id, reason in api_client.incomplete_seeds.items():
+        print(f"  {paper_id}: {reason}")
+    if api_client.journal is not None:
+        print(f"They are listed in {BLUE_COLOR}{api_client.journal.report_path}{DEFAULT_COLOR}.")
+
+
+def close_journal(api_client):
+    """
+    Remove the journal of a finished run, complete or not, saving its incomplete seed papers next to it.
+    """
+    if api_client.journal is not None:
+        api_client.journal.finish(api_client.incomplete_seeds)
+
+
+def build_api_client(args, metrics, journal_file=None):
+    """
+    Build the API client with its response cache, HTTP transport, paper store and journal, as configured
+    by the arguments added with `add_fetch_arguments`.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+        metrics (MetricsHook): Hook receiving the progress and statistics of the run.
+        journal_file (Optional[str]): Path of the journal of completed seed papers, if the run keeps one.
+
+    Returns:
+        CitationExplorerAPI: The API client.
+    """
+    from scholtrack.api import CitationExplorerAPI
+    from scholtrack.cache import ResponseCache
+    from scholtrack.journal import FetchJournal
+    from scholtrack.store import PaperStore
+    from scholtrack.transport import HttpTransport
+
+    cache = None if args.no_cache else ResponseCache(args.cache_dir, ttl=args.cache_ttl * 3600, max_size_mb=args.cache_size)
+    transport = HttpTransport(api_key=args.api_key, rate=args.rate_limit, pool_size=max(16, args.workers), metrics=metrics)
+    store = PaperStore(args.store, max_age=args.store_max_age * 3600) if args.store else None
+    journal = FetchJournal(journal_file, resume=args.resume, max_age=args.journal_max_age * 3600) if journal_file else None
+    if journal is not None and len(journal):
+        print(f"Resuming from {BLUE_COLOR}{journal_file}{DEFAULT_COLOR}: {len(journal)} seed papers are already fetched.")
+    return CitationExplorerAPI(api_key=args.api_key, max_workers=args.workers, base_url=args.api_url,
+                               cache=cache, transport=transport, metrics=metrics, store=store, journal=journal)
+
+
+def print_stats(args, run_metrics):
+    """
+    Print the statistics of the run in the format requested with --stats, if any.
+    """
+    if args.stats == 'json':
+        print(json.dumps(run_metrics.summary(), indent=2))
+    elif args.stats:
+        print(f"\nRun statistics:\n{run_metrics.format_table()}")
+
+
+def run(args, paper_ids, sinks, metrics):
+    """
+    Fetch the citations of the seed papers and export them, as configured by the command-line arguments.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+        paper_ids (List[str]): The IDs of the seed papers.
+        sinks (List[Tuple[str, Optional[str]]]): The (output type, file name) pairs to export to.
+        metrics (MetricsHook): Hook receiving the progress and statistics of the run.
+    """
+    from scholtrack.exporter import CitationExporter
+    from scholtrack.records import PaperRecord
+
+    output_files = [filename for _, filename in sinks if filename]
+
+    # Initialize API client
+    api_client = build_api_client(args, metrics, args.journal_file)
+    transport = api_client.transport
+
+    if args.stream:
+        citations = api_client.iter_citations_for_papers(paper_ids, cites_at_least_n=args.cites_at_least_n,
+                                                         hydrate=not args.no_batch, cites_all=args.cites_all,
+                                                         cites_none=args.cites_none, min_year=args.min_year)
+        stream_writers = {
+            'csv': CitationExporter.stream_to_csv,
+            'jsonl': CitationExporter.stream_to_jsonl,
+            'txt': lambda items, filename: CitationExporter.stream_to_txt(items, filename=filename, show_abstract=args.show_abstract),
+        }
+        output_type, output_file = sinks[0]
+        with metrics.stage("stream"):
+            count = stream_writers[output_type](citations, filename=output_file)
+
+        metrics.close()
+        print(f"\nAll done, found {GREEN_COLOR}{count} citations{DEFAULT_COLOR}. The results are saved in {BLUE_COLOR}{output_file}{DEFAULT_COLOR}.")
+        report_incomplete_seeds(api_client)
+        return
+
+    # Fetch citations
+    if args.hops > 1:
+        from scholtrack.crawler import CitationCrawler
+        crawler = CitationCrawler(api_client, max_hops=args.hops, max_requests=args.max_requests,
+                                  min_citation_count=args.hop_min_citations, min_year=args.hop_min_year,
+                                  checkpoint_path=args.checkpoint)
+        citations = crawler.crawl(paper_ids)
+    else:
+        from scholtrack.state import SeedStateStore
+        state_store = SeedStateStore(args.state_dir) if args.since_last_run else None
+        citations = api_client.get_citations_for_papers(paper_ids, state_store=state_store, hydrate=not args.no_batch,
+                                                        min_year=args.min_year, **overlap_arguments(args))
+
+    # Normalize the citations once, so that the exporters do not re-parse them
+    with metrics.stage("normalize"):
+        citations = PaperRecord.from_citations(citations)
+    citations = apply_dedup(args, citations, paper_ids, metrics)
+    citations = apply_query_filters(args, citations, metrics)
+
+    # Close the progress display
+    metrics.close()
+
+    # Handle output, displaying the top results in the terminal too if quiet mode is not enabled.
+    # All outputs share a single sort.
+    if not args.quiet and ('stdout', None) not in sinks:
+        sinks.append(('stdout', None))
+    CitationExporter.export(citations, sinks, sort_by=args.sort_by, display_limit=args.display_limit,
+                            show_abstract=args.show_abstract, metrics=metrics)
+
+    if not args.quiet:
+        sort_explanation = {
+            'citations': 'citation count',
+            'arxiv': 'arXiv date of appearance',
+            'year': 'year of publication',
+            'overlap': 'number of cited papers from the list'
+        }
+        found = f"{len(citations)} new citations" if args.since_last_run else f"{len(citations)} citations"
+        print(f"\nAll done, found {GREEN_COLOR}{found}{DEFAULT_COLOR}. Showing {PURPLE_COLOR}top {args.display_limit} results based on {sort_explanation[args.sort_by]}{DEFAULT_COLOR}.")
+        if output_files:
+            print(f"The full results are saved in {BLUE_COLOR}{', '.join(output_files)}{DEFAULT_COLOR}.")
+        summary = transport.summary()
+        print(f"API requests: {summary['requests']} (retries: {summary['retries']}, "
+              f"rate-limited responses: {summary['rate_limited']}, throttled for {summary['throttle_wait']:.1f}s).")
+    report_incomplete_seeds(api_client)
+    close_journal(api_client)
+
+def query(argv):
+    """
+    Run the query command, which answers citation queries from the local paper store without network access.
+
+    Args:
+        argv (List[str]): The command-line arguments following "query".
+    """
+    parser = argparse.ArgumentParser(
+        prog='scholtrack query',
+        description='Find papers citing the given papers in the local paper store filled by earlier runs with --store, without network access',
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    add_input_arguments(parser)
+    add_selection_arguments(parser)
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH, metavar='PATH', help=f'Path of the local paper store (default: {DEFAULT_STORE_PATH})')
+    args = parser.parse_args(argv)
+
+    paper_ids = collect_paper_ids(args)
+    if paper_ids is None:
+        return
+    if not paper_ids:
+        parser.error("No input provided. Use --urls, --collection, --file, or --paper-ids.")
+    check_overlap_arguments(parser, args, paper_ids)
+    if not os.path.exists(args.store):
+        parser.error(f"The paper store {args.store} does not exist. Fetch citations with --store first.")
+
+    try:
+        sinks = pair_outputs(args.output_type or ['stdout'], args.output or [])
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
+    from scholtrack.exporter import CitationExporter
+    from scholtrack.records import PaperRecord
+    from scholtrack.store import PaperStore
+
+    store = PaperStore(args.store)
+    citations = PaperRecord.from_citations(store.query_citations(paper_ids, **overlap_arguments(args)))
+    store.close()
+    citations = apply_dedup(args, citations, paper_ids)
+    citations = apply_query_filters(args, citations)
+
+    if not args.quiet and ('stdout', None) not in sinks:
+        sinks.append(('stdout', None))
+    CitationExporter.export(citations, sinks, sort_by=args.sort_by, display_limit=args.display_limit,
+                            show_abstract=args.show_abstract)
+
+    output_files = [filename for _, filename in sinks if filename]
+    print(f"\nFound {GREEN_COLOR}{len(citations)} citations{DEFAULT_COLOR} in {BLUE_COLOR}{args.store}{DEFAULT_COLOR}.")
+    if output_files:
+        print(f"The results are saved in {BLUE_COLOR}{', '.join(output_files)}{DEFAULT_COLOR}.")
+
+
+def load_batch_jobs(parser, manifest_file):
+    """
+    Load the collections of a batch manifest as jobs.
+
+    Every `[collections.<name>]` table of the manifest takes the input, filter, sort and output options of
+    the main command, with the option names as keys, e.g. `collection = "nvs"`, `cites-at-least-n = 2`,
+    `output-type = ["csv", "json"]` and `output = ["nvs.csv", "nvs.json"]`. Relative file names are
+    resolved against the directory of the manifest.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser of the batch command, used to report errors.
+        manifest_file (str): The path of the TOML (or JSON) manifest.
+
+    Returns:
+        Optional[List[BatchJob]]: The jobs, or None if a collection does not exist.
+    """
+    from scholtrack.batch import BatchJob, load_manifest
+
+    try:
+        manifest = load_manifest(manifest_file)
+    except (OSError, ValueError, ImportError) as e:
+        parser.error(f"Cannot read the manifest {manifest_file}: {e}")
+    collections = manifest.get('collections')
+    if not isinstance(collections, dict) or not collections:
+        parser.error(f"The manifest {manifest_file} has no [collections.<name>] tables.")
+    base_dir = os.path.dirname(os.path.abspath(manifest_file))
+
+    jobs = []
+    for name, options in collections.items():
+        # Parse every collection with the options of the main command, so that they are validated the same way
+        job_parser = argparse.ArgumentParser(prog=f'{manifest_file} [collections.{name}]', add_help=False)
+        add_input_arguments(job_parser)
+        add_selection_arguments(job_parser)
+        argv = []
+        for key, value in options.items():
+            flag = '--' + key.replace('_', '-')
+            if isinstance(value, bool):
+                argv += [flag] if value else []
+            elif isinstance(value, list) and flag in ('--output-type', '--output'):
+                # Options given once per value on the command line
+                for item in value:
+                    argv += [flag, str(item)]
+            elif isinstance(value, list):
+                argv += [flag] + [str(item) for item in value]
+            else:
+                argv += [flag, str(value)]
+        args = job_parser.parse_args(argv)
+
+        if args.file:
+            args.file = os.path.join(base_dir, args.file)
+        paper_ids = collect_paper_ids(args)
+        if paper_ids is None:
+            return None
+        if not paper_ids:
+            job_parser.error("No input provided. Use urls, collection, file, or paper-ids.")
+        check_overlap_arguments(job_parser, args, paper_ids)
+        if 'stdout' in (args.output_type or []):
+            job_parser.error("Batch runs do not support the stdout output type.")
+        try:
+            # A single csv output is named after the collection by default
+            sinks = pair_outputs(args.output_type or ['csv'], args.output or ([] if args.output_type else [f'{name}.csv']))
+        except ValueError as e:
+            job_parser.error(str(e))
+        sinks = [(output_type, os.path.join(base_dir, filename)) for output_type, filename in sinks]
+
+        jobs.append(BatchJob(name, paper_ids, sinks, cites_at_least_n=args.cites_at_least_n,
+                             cites_all=args.cites_all, cites_none=args.cites_none, sort_by=args.sort_by,
+                             show_abstract=args.show_abstract, filters=query_filters(args), dedup=args.dedup))
+    return jobs
+
+
+def batch(argv):
+    """
+    Run the batch command, which fetches the citations of many collections at once, every seed paper only once.
+
+    Args:
+        argv (List[str]): The command-line arguments following "batch".
+    """
+    parser = argparse.ArgumentParser(
+        prog='scholtrack batch',
+        description='Fetch citations for all collections of a manifest in one run. Seed papers shared by several\n'
+                    'collections are fetched once, then every collection is filtered, sorted and exported on its own',
+        epilog='''Example manifest (TOML):
+
+        [collections.nvs]
+        collection = "nvs"
+        output-type = ["csv", "json"]
+        output = ["nvs.csv", "nvs.json"]
+
+        [collections.gaussians]
+        file = "gaussians.txt"
+        cites-at-least-n = 2
+        sort-by = "year"
+        ''',
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('manifest', help='TOML file with one [collections.<name>] table per collection (a JSON file with the same structure also works)')
+    add_fetch_arguments(parser)
+    parser.add_argument('-j', '--jobs', type=int, default=4, help='Number of collections to export concurrently (default: 4)')
+    args = parser.parse_args(argv)
+
+    jobs = load_batch_jobs(parser, args.manifest)
+    if jobs is None:
+        return
+
+    from scholtrack.batch import BatchRunner
+    from scholtrack.metrics import RunMetrics, ProgressHook, CompositeHook
+
+    seed_count = len({paper_id for job in jobs for paper_id in job.paper_ids})
+    total_count = sum(len(set(job.paper_ids)) for job in jobs)
+    print(f"\nScholTrack is about to fetch citations for {seed_count} unique papers of {len(jobs)} collections "
+          f"({total_count - seed_count} papers shared between collections are fetched only once).")
+
+    run_metrics = RunMetrics()
+    metrics = CompositeHook([run_metrics, ProgressHook(total=seed_count)])
+    journal_file = journal_path(args, [paper_id for job in jobs for paper_id in job.paper_ids])
+    check_journal(parser, args, journal_file)
+    try:
+        api_client = build_api_client(args, metrics, journal_file)
+        counts = BatchRunner(api_client, export_workers=args.jobs, hydrate=not args.no_batch).run(jobs)
+    except Exception as e:
+        metrics.close()
+        print(f"Error occurred: {e}")
+        if journal_file and os.path.exists(journal_file):
+            print(f"The seed papers fetched so far are saved in {BLUE_COLOR}{journal_file}{DEFAULT_COLOR}. "
+                  f"Rerun the same command with --resume to continue from there.")
+    else:
+        print("\nAll done.")
+        for job in jobs:
+            output_files = ', '.join(filename for _, filename in job.sinks)
+            print(f"  {job.name}: {GREEN_COLOR}{counts[job.name]} citations{DEFAULT_COLOR} saved in {BLUE_COLOR}{output_files}{DEFAULT_COLOR}.")
+        summary = api_client.transport.summary()
+        print(f"API requests: {summary['requests']} (retries: {summary['retries']}, "
+              f"rate-limited responses: {summary['rate_limited']}, throttled for {summary['throttle_wait']:.1f}s).")
+        report_incomplete_seeds(api_client)
+        close_journal(api_client)
+
+    print_stats(args, run_metrics)
+
 
 if __name__ == '__main__':
     main()
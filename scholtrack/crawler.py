@@ -0,0 +1,243 @@
+import heapq
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any, Sequence, Tuple, Union
+
+from scholtrack.api import CitationExplorerAPI
+from scholtrack.transport import RequestBudgetExceeded
+
+
+class CitationCrawler:
+    """
+    A crawler expanding a set of seed papers over several hops of citations, i.e. citers of citers.
+
+    Papers are expanded from a priority frontier, most cited first, until the hop limit or the global
+    request budget is reached. The budget is enforced by the transport on every request, so a heavily
+    cited paper cannot overrun it; a paper whose expansion was cut short goes back to the frontier.
+
+    A paper is kept if it passes the filters of the hop at which it is reached, and it is expanded once
+    per hop improvement: if it is reached again over a shorter path after being queued, it is queued
+    again at the shorter hop, and its own citers are then reached at the shorter hop as well. A paper
+    rejected by the filters of one hop is considered again if it is reached at another hop. The crawl
+    state can be saved to a checkpoint file after every round, so that an interrupted crawl can resume
+    where it stopped.
+    """
+
+    # Fields fetched while crawling; the details of the found papers are hydrated at the end
+    CRAWL_FIELDS = "paperId,year,citationCount"
+
+    def __init__(self, api: CitationExplorerAPI, max_hops: int = 2, max_requests: Optional[int] = None,
+                 min_citation_count: Union[int, Sequence[int]] = 0,
+                 min_year: Union[Optional[int], Sequence[Optional[int]]] = None,
+                 max_workers: Optional[int] = None, checkpoint_path: Optional[str] = None, limit: int = 1000):
+        """
+        Initializes the crawler.
+
+        Args:
+            api (CitationExplorerAPI): The client used to fetch citations.
+            max_hops (int): Number of citation hops to follow from the seed papers.
+            max_requests (Optional[int]): Global budget of API requests for the crawl. Unlimited if omitted.
+            min_citation_count (Union[int, Sequence[int]]): Minimum citation count of a citing paper to be kept
+                and expanded further. A sequence gives one threshold per hop, starting with hop 1.
+            min_year (Union[Optional[int], Sequence[Optional[int]]]): Minimum publication year of a citing paper,
+                either for all hops or one per hop.
+            max_workers (Optional[int]): Number of papers expanded concurrently. Defaults to the client setting.
+            checkpoint_path (Optional[str]): File where the crawl state is saved after every round. An existing
+                checkpoint is resumed.
+            limit (int): The maximum number of citations to retrieve per request.
+        """
+        self.api = api
+        self.max_hops = max_hops
+        self.max_requests = max_requests
+        self.min_citation_count = min_citation_count
+        self.min_year = min_year
+        self.max_workers = max_workers or api.max_workers
+        self.checkpoint_path = checkpoint_path
+        self.limit = limit
+
+        self.frontier = []  # Heap of (-citation count, sequence number, paper ID, hop)
+        self.visited = {}  # Compact key of every paper discovered so far -> bitset of the hops it was reached at
+        self.expanded = {}  # Compact key of every paper queued for expansion -> shortest hop it was queued at
+        self.found = {}  # Citing paper ID -> {"hop", "year", "citationCount"}
+        self.requests_used = 0
+        self._sequence = 0
+
+    @staticmethod
+    def _key(paper_id: str) -> Union[bytes, str]:
+        # Semantic Scholar IDs are 40 hex characters; their 20-byte form halves the size of the visited set
+        try:
+            return bytes.fromhex(paper_id)
+        except ValueError:
+            return paper_id
+
+    @staticmethod
+    def _threshold(value: Any, hop: int) -> Any:
+        if isinstance(value, (list, tuple)):
+            return value[min(hop, len(value)) - 1] if value else None
+        return value
+
+    def _passes_filters(self, paper: Dict[str, Any], hop: int) -> bool:
+        min_citation_count = self._threshold(self.min_citation_count, hop) or 0
+        min_year = self._threshold(self.min_year, hop)
+        if (paper.get("citationCount") or 0) < min_citation_count:
+            return False
+        if min_year is not None and (paper.get("year") or 0) < min_year:
+            return False
+        return True
+
+    def _push(self, paper_id: str, hop: int, citation_count: float) -> None:
+        key = self._key(paper_id)
+        if self.expanded.get(key, hop + 1) <= hop:
+            return
+        self.expanded[key] = hop
+        heapq.heappush(self.frontier, (-citation_count, self._sequence, paper_id, hop))
+        self._sequence += 1
+
+    def _expand(self, entry: Tuple[float, int, str, int]) -> Tuple[List[Dict[str, Any]], bool]:
+        # The citations of a frontier entry, and whether they are complete or were cut short by the budget
+        citations = []
+        try:
+            for citation in self.api.iter_citations(entry[2], limit=self.limit, fields=self.CRAWL_FIELDS):
+                citations.append(citation)
+        except RequestBudgetExceeded:
+            return citations, False
+        return citations, True
+
+    def _requests_sent(self) -> int:
+        return self.api.transport.summary()["requests"]
+
+    def crawl(self, paper_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Crawl the citations of the seed papers up to `max_hops` hops away.
+
+        Args:
+            paper_ids (List[str]): The IDs of the seed papers.
+
+        Returns:
+            List[Dict[str, Any]]: The citing papers found, as citations with a `citingPaper` entry and the
+            `hop` at which the paper was first reached, in discovery order.
+        """
+        if not self.load_checkpoint():
+            for paper_id in paper_ids:
+                self._push(paper_id, 0, float("inf"))
+
+        transport = self.api.transport
+        if self.max_requests is not None:
+            transport.request_limit = self._requests_sent() + max(0, self.max_requests - self.requests_used)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor, self.api.metrics.stage("fetch"):
+                while self.frontier:
+                    if self.max_requests is not None and self.requests_used >= self.max_requests:
+                        break
+
+                    batch = []
+                    while self.frontier and len(batch) < self.max_workers:
+                        entry = heapq.heappop(self.frontier)
+                        # Entries superseded by the same paper queued again at a shorter hop are skipped
+                        if self.expanded.get(self._key(entry[2])) == entry[3]:
+                            batch.append(entry)
+                    sent_before = self._requests_sent()
+                    results = list(executor.map(self._expand, batch))
+
+                    for entry, (citations, complete) in zip(batch, results):
+                        self._add_citations(citations, entry[3] + 1)
+                        if complete:
+                            self.api.metrics.on_seed_done(entry[2], len(citations))
+                        else:
+                            # Expanded again from its cached pages when the crawl resumes with a new budget
+                            heapq.heappush(self.frontier, entry)
+
+                    self.requests_used += self._requests_sent() - sent_before
+                    self.save_checkpoint()
+        finally:
+            transport.request_limit = None
+
+        pending = sum(1 for entry in self.frontier if self.expanded.get(self._key(entry[2])) == entry[3])
+        if pending:
+            print(f"WARNING: The crawl stopped after reaching its budget of {self.max_requests} requests. "
+                  f"{pending} papers were not expanded.")
+
+        with self.api.metrics.stage("hydrate"):
+            return self._hydrated_results()
+
+    def _add_citations(self, citations: List[Dict[str, Any]], hop: int) -> None:
+        for citation in citations:
+            paper = citation.get("citingPaper", {})
+            citing_paper_id = paper.get("paperId")
+            if not citing_paper_id:
+                continue
+
+            # Every paper is checked once per hop it is reached at, as the filters may differ between hops
+            key = self._key(citing_paper_id)
+            hops = self.visited.get(key, 0)
+            if hops >> hop & 1:
+                continue
+            self.visited[key] = hops | 1 << hop
+
+            known = self.found.get(citing_paper_id)
+            if known is not None and known["hop"] <= hop:
+                continue
+            if not self._passes_filters(paper, hop):
+                continue
+            if known is not None:
+                known["hop"] = hop
+            else:
+                self.found[citing_paper_id] = {
+                    "hop": hop, "year": paper.get("year"), "citationCount": paper.get("citationCount"),
+                }
+
+            if hop < self.max_hops:
+                self._push(citing_paper_id, hop, paper.get("citationCount") or 0)
+
+    def _hydrated_results(self) -> List[Dict[str, Any]]:
+        paper_ids = list(self.found)
+        papers = self.api.get_papers_batch(paper_ids)
+        return [
+            {"citingPaper": paper or {"paperId": paper_id}, "hop": self.found[paper_id]["hop"]}
+            for paper_id, paper in zip(paper_ids, papers)
+        ]
+
+    def save_checkpoint(self) -> None:
+        """
+        Save the crawl state to the checkpoint file, if one is configured.
+        """
+        if not self.checkpoint_path:
+            return
+
+        def encode(key: Union[bytes, str]) -> str:
+            return key.hex() if isinstance(key, bytes) else key
+
+        state = {
+            "frontier": self.frontier,
+            "visited": {encode(key): hops for key, hops in self.visited.items()},
+            "expanded": {encode(key): hop for key, hop in self.expanded.items()},
+            "found": self.found,
+            "requests_used": self.requests_used,
+            "sequence": self._sequence,
+        }
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def load_checkpoint(self) -> bool:
+        """
+        Restore the crawl state from the checkpoint file, if one is configured and exists.
+
+        Returns:
+            bool: Whether a checkpoint was loaded.
+        """
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return False
+
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        self.frontier = [tuple(entry) for entry in state["frontier"]]
+        heapq.heapify(self.frontier)
+        self.visited = {self._key(paper_id): hops for paper_id, hops in state["visited"].items()}
+        self.expanded = {self._key(paper_id): hop for paper_id, hop in state["expanded"].items()}
+        self.found = state["found"]
+        self.requests_used = state["requests_used"]
+        self._sequence = state["sequence"]
+        return True
@@ -0,0 +1,254 @@
+import hashlib
+import re
+import struct
+import unicodedata
+from typing import List, Optional, Iterable, Set, Tuple
+
+from scholtrack.query import tokenize
+from scholtrack.records import PaperRecord
+
+_ARXIV_VERSION = re.compile(r"v\d+$")
+_ARXIV_DOI_PREFIX = "10.48550/arxiv."
+
+
+def normalize_title(title: Optional[str]) -> List[str]:
+    """
+    Split a title into lowercase ASCII words, dropping accents and punctuation.
+    """
+    if not title:
+        return []
+    return tokenize(unicodedata.normalize("NFKD", title).encode("ascii", "ignore").decode("ascii"))
+
+
+def identifier_keys(record: PaperRecord) -> List[str]:
+    """
+    Get the keys identifying the work of a paper across Semantic Scholar entries: its DOI and its arXiv ID
+    without version. arXiv DOIs are mapped to the arXiv ID, so that they match preprints listed by ID.
+    """
+    keys = []
+    doi = record.external_ids.get("DOI")
+    if doi:
+        doi = doi.strip().lower()
+        if doi.startswith(_ARXIV_DOI_PREFIX):
+            keys.append("arxiv:" + _ARXIV_VERSION.sub("", doi[len(_ARXIV_DOI_PREFIX):]))
+        else:
+            keys.append("doi:" + doi)
+    if record.arxiv_id:
+        keys.append("arxiv:" + _ARXIV_VERSION.sub("", record.arxiv_id.strip().lower()))
+    return keys
+
+
+class _DisjointSet:
+    """
+    Union-find over positions 0..n-1. The root of a set is always its smallest position.
+    """
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> bool:
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i == root_j:
+            return False
+        if root_j < root_i:
+            root_i, root_j = root_j, root_i
+        self.parent[root_j] = root_i
+        return True
+
+
+class Deduplicator:
+    """
+    Merges citing papers that are separate Semantic Scholar entries of the same work, e.g. an arXiv
+    preprint and its published version.
+
+    Papers sharing a DOI or an arXiv ID are merged first. Papers with similar titles are then found with
+    MinHash signatures over their title words and locality-sensitive hashing: the signatures are cut into
+    bands, and only papers sharing a band are compared, instead of all pairs. Candidates are merged if the
+    Jaccard similarity of their title words reaches `title_threshold`, their years are at most
+    `max_year_gap` apart and, if both list authors, they share an author surname.
+
+    The hash values of every distinct title word are computed once, with a single SHAKE-128 digest
+    providing all `NUM_HASHES` values, and a signature is the column-wise minimum over the words of a title.
+    """
+
+    NUM_HASHES = 32
+    BAND_SIZE = 4
+    # Titles with fewer words are only merged by identifier, as short titles like "Editorial" are ambiguous
+    MIN_TITLE_WORDS = 3
+    # Bands shared by more papers are too generic to tell anything and are skipped
+    MAX_BUCKET_SIZE = 50
+
+    def __init__(self, title_threshold: float = 0.8, max_year_gap: int = 2):
+        """
+        Initializes the deduplicator.
+
+        Args:
+            title_threshold (float): Minimum Jaccard similarity of the title words of two papers to merge them.
+            max_year_gap (int): Maximum difference between the publication years of two papers to merge them by title.
+        """
+        self.title_threshold = title_threshold
+        self.max_year_gap = max_year_gap
+        self._word_hashes = {}
+        self._unpack = struct.Struct(f"<{self.NUM_HASHES}I").unpack
+
+    def _hashes(self, word: str) -> Tuple[int, ...]:
+        hashes = self._word_hashes.get(word)
+        if hashes is None:
+            hashes = self._unpack(hashlib.shake_128(word.encode("utf-8")).digest(4 * self.NUM_HASHES))
+            self._word_hashes[word] = hashes
+        return hashes
+
+    def signature(self, words: Iterable[str]) -> Tuple[int, ...]:
+        """
+        Compute the MinHash signature of a set of words.
+        """
+        vectors = [self._hashes(word) for word in words]
+        if len(vectors) == 1:
+            return vectors[0]
+        return tuple(map(min, *vectors))
+
+    @staticmethod
+    def _surnames(record: PaperRecord) -> Set[str]:
+        words = (normalize_title(name) for _, name in record.authors)
+        return {name_words[-1] for name_words in words if name_words}
+
+    def _similar(self, first: PaperRecord, second: PaperRecord, first_words: Set[str], second_words: Set[str]) -> bool:
+        if first.year is not None and second.year is not None and abs(first.year - second.year) > self.max_year_gap:
+            return False
+        if len(first_words & second_words) < self.title_threshold * len(first_words | second_words):
+            return False
+        first_names, second_names = self._surnames(first), self._surnames(second)
+        return not (first_names and second_names) or bool(first_names & second_names)
+
+    def find_groups(self, records: List[PaperRecord]) -> List[List[int]]:
+        """
+        Find the groups of papers that are the same work.
+
+        Args:
+            records (List[PaperRecord]): The papers.
+
+        Returns:
+            List[List[int]]: The positions of the papers of every group with more than one paper, in order.
+        """
+        groups = _DisjointSet(len(records))
+
+        # Shared identifiers
+        first_with_key = {}
+        for i, record in enumerate(records):
+            for key in identifier_keys(record):
+                j = first_with_key.setdefault(key, i)
+                if j != i:
+                    groups.union(j, i)
+
+        # Similar titles, blocked by MinHash bands
+        title_words = [set(normalize_title(record.title)) for record in records]
+        buckets = {}
+        for i, words in enumerate(title_words):
+            if len(words) < self.MIN_TITLE_WORDS:
+                continue
+            # (band number, band) pairs, cut from the signature in C
+            for band in enumerate(zip(*[iter(self.signature(words))] * self.BAND_SIZE)):
+                buckets.setdefault(band, []).append(i)
+        for members in buckets.values():
+            if len(members) < 2 or len(members) > self.MAX_BUCKET_SIZE:
+                continue
+            for k, i in enumerate(members):
+                for j in members[:k]:
+                    if groups.find(i) != groups.find(j) and \
+                            self._similar(records[j], records[i], title_words[j], title_words[i]):
+                        groups.union(j, i)
+
+        members_by_root = {}
+        for i in range(len(records)):
+            members_by_root.setdefault(groups.find(i), []).append(i)
+        return [members for members in members_by_root.values() if len(members) > 1]
+
+    @staticmethod
+    def _is_published(record: PaperRecord) -> bool:
+        """
+        Whether a paper looks like a published version: it has a venue other than arXiv, or a DOI other than an arXiv DOI.
+        """
+        doi = (record.external_ids.get("DOI") or "").strip().lower()
+        return bool(record.venue and "arxiv" not in record.venue.lower()) or bool(doi and not doi.startswith(_ARXIV_DOI_PREFIX))
+
+    @staticmethod
+    def merge_group(records: List[PaperRecord], seed_ids: Optional[List[str]] = None) -> PaperRecord:
+        """
+        Merge the entries of one work into a single paper.
+
+        The published version, or else the most cited entry, provides the ID and the details; details it
+        lacks are taken from the other entries. The cited seed papers are united, the citation count is the
+        largest one, and the IDs of the merged entries are listed under `duplicateIds` in the `extra` fields.
+
+        Args:
+            records (List[PaperRecord]): The entries of the work, in order of appearance.
+            seed_ids (Optional[List[str]]): The seed papers, to order the united cited seed papers. They keep their
+                order of appearance if omitted.
+
+        Returns:
+            PaperRecord: The merged paper.
+        """
+        # Ties go to the entry that appears first
+        position = max(range(len(records)), key=lambda i: (Deduplicator._is_published(records[i]),
+                                                          records[i].citation_count or 0, -i))
+        main = records[position]
+        others = records[:position] + records[position + 1:]
+
+        def first(attribute: str):
+            for record in [main] + others:
+                value = getattr(record, attribute)
+                if value not in (None, "", (), {}):
+                    return value
+            return getattr(main, attribute)
+
+        external_ids = {}
+        for record in reversed([main] + others):
+            external_ids.update(record.external_ids)
+        cited_seeds = dict.fromkeys(seed_id for record in records for seed_id in record.cited_seeds)
+        if seed_ids is not None:
+            cited_seeds = [seed_id for seed_id in dict.fromkeys(seed_ids) if seed_id in cited_seeds]
+        extra = dict(main.extra or {})
+        extra["duplicateIds"] = [record.paper_id for record in others]
+
+        return PaperRecord(
+            paper_id=main.paper_id, title=first("title"), authors=first("authors"), abstract=first("abstract"),
+            year=first("year"), citation_count=max(record.citation_count or 0 for record in records),
+            reference_count=first("reference_count"), influential_citation_count=first("influential_citation_count"),
+            venue=next((record.venue for record in [main] + others
+                        if record.venue and "arxiv" not in record.venue.lower()), first("venue")),
+            fields_of_study=first("fields_of_study"), url=main.url, external_ids=external_ids,
+            cited_seeds=tuple(cited_seeds), extra=extra,
+        )
+
+    def deduplicate(self, records: Iterable[PaperRecord], seed_ids: Optional[List[str]] = None) -> List[PaperRecord]:
+        """
+        Merge the entries of the same work.
+
+        Args:
+            records (Iterable[PaperRecord]): The citing papers.
+            seed_ids (Optional[List[str]]): The seed papers, to order the cited seed papers of merged papers.
+
+        Returns:
+            List[PaperRecord]: The papers with every group of duplicates merged, at the position of its first entry.
+        """
+        records = list(records)
+        merged = {}
+        dropped = set()
+        for members in self.find_groups(records):
+            merged[members[0]] = self.merge_group([records[i] for i in members], seed_ids)
+            dropped.update(members[1:])
+        return [merged.get(i, record) for i, record in enumerate(records) if i not in dropped]
+
+
+def deduplicate(records: Iterable[PaperRecord], seed_ids: Optional[List[str]] = None, **kwargs: float) -> List[PaperRecord]:
+    """
+    Merge citing papers that are separate entries of the same work, with a `Deduplicator` configured by `kwargs`.
+    """
+    return Deduplicator(**kwargs).deduplicate(records, seed_ids)
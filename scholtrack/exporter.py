@@ -1,146 +1,432 @@
 import json
 import csv
-from typing import List, Dict, Any
+import heapq
+import os
+import sqlite3
+from operator import attrgetter
+from typing import List, Optional, Dict, Any, Iterable, Callable, Tuple, Union
+
+from scholtrack.metrics import MetricsHook
+from scholtrack.records import PaperRecord
+
+# A citation as returned by `CitationExplorerAPI`, or its normalized record
+Citation = Union[PaperRecord, Dict[str, Any]]
 
 class CitationExporter:
     """
     A class to handle exporting citations to different formats.
+
+    All methods accept raw API citations or `PaperRecord`s. Raw citations are normalized into records
+    once, so callers exporting the same results several times should pass records.
     """
 
+    VALID_SORT_OPTIONS = {"citations", "year", "arxiv", "overlap"}
+    OUTPUT_TYPES = ("stdout", "csv", "json", "jsonl", "txt", "parquet", "arrow", "sqlite")
+    # Output types written in sorted order; the others keep the order in which citations were fetched
+    SORTED_OUTPUT_TYPES = {"stdout", "csv", "txt", "parquet", "arrow"}
+
     @staticmethod
-    def save_to_json(data: List[Dict[str, Any]], filename: str = "citations.json") -> None:
+    def save_to_json(data: List[Citation], filename: str = "citations.json") -> None:
         """
         Save data to a JSON file.
 
         Args:
-            data (List[Dict[str, Any]]): The data to save.
+            data (List[Citation]): The data to save.
             filename (str): The name of the JSON file.
         """
+        data = [item.to_citation() if isinstance(item, PaperRecord) else item for item in data]
         with open(filename, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=4)
 
     @staticmethod
-    def save_to_csv(citations: List[Dict[str, Any]], filename: str = "citations.csv", sort_by: str = "citations") -> None:
+    def stream_to_jsonl(citations: Iterable[Citation], filename: str = "citations.jsonl") -> int:
+        """
+        Write citations to a JSON Lines file, one citation per line, in the order they are produced.
+
+        Args:
+            citations (Iterable[Citation]): The citations to save, e.g. a generator from
+                `CitationExplorerAPI.iter_citations_for_papers`.
+            filename (str): The name of the JSON Lines file.
+
+        Returns:
+            int: The number of citations written.
+        """
+        count = 0
+        with open(filename, "w", encoding="utf-8") as f:
+            for citation in citations:
+                if isinstance(citation, PaperRecord):
+                    citation = citation.to_citation()
+                f.write(json.dumps(citation))
+                f.write("\n")
+                count += 1
+        return count
+
+    @staticmethod
+    def save_to_csv(citations: List[Citation], filename: str = "citations.csv", sort_by: str = "citations") -> None:
         """
         Save citations to a CSV file.
 
         Args:
-            citations (List[Dict[str, Any]]): The list of citations to save.
+            citations (List[Citation]): The list of citations to save.
             filename (str): The name of the CSV file.
             sort_by (str): The field by which to sort the citations (citation_count, year, or arxiv).
         """
-        valid_sort_options = {"citations", "year", "arxiv"}
-        if sort_by not in valid_sort_options:
-            raise ValueError(f"Invalid sort option. Please use one of {valid_sort_options}")
+        if sort_by not in CitationExporter.VALID_SORT_OPTIONS:
+            raise ValueError(f"Invalid sort option. Please use one of {CitationExporter.VALID_SORT_OPTIONS}")
+
+        citations_sorted = CitationExporter.sort_citations(citations, sort_by)
+        CitationExporter.stream_to_csv(citations_sorted, filename=filename)
 
-        citations_sorted = sorted(citations, key=lambda x: CitationExporter.get_sort_value(x, sort_by), reverse=True)
+    @staticmethod
+    def stream_to_csv(citations: Iterable[Citation], filename: str = "citations.csv") -> int:
+        """
+        Write citations to a CSV file one row at a time, in the order they are produced.
 
+        Args:
+            citations (Iterable[Citation]): The citations to save, e.g. a generator from
+                `CitationExplorerAPI.iter_citations_for_papers`.
+            filename (str): The name of the CSV file.
+
+        Returns:
+            int: The number of citations written.
+        """
+        count = 0
         with open(filename, "w", newline='', encoding="utf-8") as csvfile:
             fieldnames = [
-                "title", "year", "citation_count", "arxiv_url", "authors", "abstract", "venue", "paper_id", "semantic_scholar_url"
+                "title", "year", "citation_count", "arxiv_url", "authors", "abstract", "venue", "paper_id", "semantic_scholar_url",
+                "seed_count", "cited_seeds", "seed_id"
             ]
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
 
             writer.writeheader()
-            for citation in citations_sorted:
-                citing_paper = citation.get("citingPaper", {})
-                external_ids = citing_paper.get("externalIds", {})
-                arxiv_url = f"https://arxiv.org/abs/{external_ids.get('ArXiv', '')}" if external_ids.get("ArXiv") else "N/A"
-
+            for record in PaperRecord.iter_records(citations):
                 row = {
-                    "title": citing_paper.get("title", "N/A"),
-                    "authors": ", ".join([author["name"] for author in citing_paper.get("authors", [])]),
-                    "abstract": citing_paper.get("abstract", "N/A"),
-                    "year": citing_paper.get("year", 0),
-                    "citation_count": citing_paper.get("citationCount", 0),
-                    "venue": citing_paper.get("venue", "N/A"),
-                    "paper_id": citing_paper.get("paperId", "N/A"),
-                    "arxiv_url": arxiv_url,
-                    "semantic_scholar_url": citing_paper.get("url", "N/A")
+                    "title": record.title,
+                    "authors": record.author_names,
+                    "abstract": record.abstract,
+                    "year": record.year,
+                    "citation_count": record.citation_count,
+                    "venue": record.venue,
+                    "paper_id": record.paper_id,
+                    "arxiv_url": record.arxiv_url,
+                    "semantic_scholar_url": record.url,
+                    # Unknown for streamed citations, which do not track the seed papers they cite
+                    "seed_count": record.overlap_count if record.cited_seeds else "",
+                    "cited_seeds": ";".join(record.cited_seeds),
+                    # The seed paper a streamed citation was found through
+                    "seed_id": (record.extra or {}).get("seedId", ""),
                 }
                 writer.writerow(row)
+                count += 1
+        return count
 
     @staticmethod
-    def get_sort_value(citation: Dict[str, Any], sort_by: str) -> Any:
+    def sort_key(sort_by: str) -> Callable[[PaperRecord], Any]:
         """
-        Extract the sort value from a citation based on the specified field.
+        Get the key function sorting records by the specified field.
 
         Args:
-            citation (Dict[str, Any]): The citation to extract the sort value from.
             sort_by (str): The field to sort by.
 
         Returns:
-            Any: The value to be used for sorting.
+            Callable[[PaperRecord], Any]: The key function.
         """
-        citing_paper = citation.get("citingPaper", {})
         if sort_by == "citations":
-            return citing_paper.get("citationCount", 0) or 0
+            return attrgetter("citation_count")
         elif sort_by == "year":
-            return citing_paper.get("year", 0) or 0
+            return lambda record: record.year or 0
         elif sort_by == "arxiv":
-            return citing_paper.get("externalIds", {}).get("ArXiv", "")
-        return 0
+            return attrgetter("arxiv_id")
+        elif sort_by == "overlap":
+            # Papers citing as many seeds are ranked by their own citation count
+            return attrgetter("overlap_count", "citation_count")
+        return lambda record: 0
+
+    @staticmethod
+    def sort_citations(citations: Iterable[Citation], sort_by: str = "citations", limit: Optional[int] = None) -> List[PaperRecord]:
+        """
+        Normalize citations into records and sort them by the specified field, in descending order.
+
+        Args:
+            citations (Iterable[Citation]): The citations to sort.
+            sort_by (str): The field to sort by.
+            limit (Optional[int]): If given, only the top `limit` records are selected, using a heap
+                instead of a full sort.
+
+        Returns:
+            List[PaperRecord]: The sorted records.
+        """
+        records = PaperRecord.from_citations(citations)
+        key = CitationExporter.sort_key(sort_by)
+        if limit is not None and limit < len(records):
+            # Equivalent to sorted(...)[:limit], ties included, in O(n log limit)
+            return heapq.nlargest(limit, records, key=key)
+        records.sort(key=key, reverse=True)
+        return records
+
+    @staticmethod
+    def get_sort_value(citation: Citation, sort_by: str) -> Any:
+        """
+        Extract the sort value from a citation based on the specified field.
+
+        Args:
+            citation (Citation): The citation to extract the sort value from.
+            sort_by (str): The field to sort by.
+
+        Returns:
+            Any: The value to be used for sorting.
+        """
+        return CitationExporter.sort_key(sort_by)(PaperRecord.coerce(citation))
+
+    @staticmethod
+    def columns(citations: Iterable[Citation]) -> Dict[str, List[Any]]:
+        """
+        Convert citations into columns, as used by the columnar export formats.
+
+        Args:
+            citations (Iterable[Citation]): The citations to convert.
+
+        Returns:
+            Dict[str, List[Any]]: One list of values per column, in the order of `citations`.
+        """
+        records = PaperRecord.from_citations(citations)
+        return {
+            "paper_id": [record.paper_id for record in records],
+            "title": [record.title for record in records],
+            "year": [record.year for record in records],
+            "citation_count": [record.citation_count for record in records],
+            "influential_citation_count": [record.influential_citation_count for record in records],
+            "reference_count": [record.reference_count for record in records],
+            "venue": [record.venue for record in records],
+            "authors": [[name for _, name in record.authors] for record in records],
+            "abstract": [record.abstract for record in records],
+            "fields_of_study": [list(record.fields_of_study or ()) for record in records],
+            "arxiv_id": [record.arxiv_id or None for record in records],
+            "doi": [record.external_ids.get("DOI") for record in records],
+            "arxiv_url": [record.arxiv_url for record in records],
+            "semantic_scholar_url": [record.url for record in records],
+            "seed_count": [record.overlap_count for record in records],
+            "cited_seeds": [list(record.cited_seeds) for record in records],
+        }
+
+    @staticmethod
+    def _arrow_table(citations: Iterable[Citation]):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("Parquet and Arrow export require pyarrow. Install it with: pip install scholtrack[arrow]")
+        return pa.table(CitationExporter.columns(citations))
 
     @staticmethod
-    def save_to_txt(citations: List[Dict[str, Any]], filename: str = "citations.txt", sort_by: str = "citations", show_abstract: bool = False) -> None:
+    def save_to_parquet(citations: List[Citation], filename: str = "citations.parquet", sort_by: str = "citations") -> None:
+        """
+        Save citations to a Parquet file, with one column per field. Requires the optional pyarrow dependency.
+
+        Args:
+            citations (List[Citation]): The list of citations to save.
+            filename (str): The name of the Parquet file.
+            sort_by (str): The field by which to sort the citations.
+        """
+        table = CitationExporter._arrow_table(CitationExporter.sort_citations(citations, sort_by))
+        import pyarrow.parquet as pq
+        pq.write_table(table, filename)
+
+    @staticmethod
+    def save_to_arrow(citations: List[Citation], filename: str = "citations.arrow", sort_by: str = "citations") -> None:
+        """
+        Save citations to an Arrow IPC (Feather v2) file. Requires the optional pyarrow dependency.
+
+        Args:
+            citations (List[Citation]): The list of citations to save.
+            filename (str): The name of the Arrow file.
+            sort_by (str): The field by which to sort the citations.
+        """
+        table = CitationExporter._arrow_table(CitationExporter.sort_citations(citations, sort_by))
+        import pyarrow.feather as feather
+        feather.write_feather(table, filename)
+
+    @staticmethod
+    def save_to_sqlite(citations: List[Citation], filename: str = "citations.sqlite") -> None:
+        """
+        Save citations to a SQLite database, replacing any existing file.
+
+        The database has a `papers` table with one row per citing paper, and a `seed_citation` table
+        with one row for every seed paper a citing paper cites. Papers are indexed by year, citation
+        count and number of cited seeds, so that queries such as "papers citing at least 3 seeds
+        published after 2022" do not scan the whole table.
+
+        Args:
+            citations (List[Citation]): The list of citations to save.
+            filename (str): The name of the SQLite database file.
+        """
+        records = PaperRecord.from_citations(citations)
+        if os.path.exists(filename):
+            os.remove(filename)
+
+        connection = sqlite3.connect(filename)
+        try:
+            with connection:
+                connection.executescript("""
+                    CREATE TABLE papers (
+                        paper_id TEXT PRIMARY KEY,
+                        title TEXT,
+                        year INTEGER,
+                        citation_count INTEGER,
+                        influential_citation_count INTEGER,
+                        reference_count INTEGER,
+                        venue TEXT,
+                        authors TEXT,
+                        abstract TEXT,
+                        fields_of_study TEXT,
+                        arxiv_id TEXT,
+                        doi TEXT,
+                        arxiv_url TEXT,
+                        semantic_scholar_url TEXT,
+                        seed_count INTEGER
+                    );
+                    CREATE TABLE seed_citation (
+                        seed_id TEXT NOT NULL,
+                        paper_id TEXT NOT NULL REFERENCES papers (paper_id),
+                        PRIMARY KEY (seed_id, paper_id)
+                    ) WITHOUT ROWID;
+                """)
+                connection.executemany(
+                    "INSERT OR IGNORE INTO papers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (
+                            record.paper_id, record.title, record.year, record.citation_count,
+                            record.influential_citation_count, record.reference_count, record.venue,
+                            record.author_names, record.abstract, ", ".join(record.fields_of_study or ()),
+                            record.arxiv_id or None, record.external_ids.get("DOI"), record.arxiv_url, record.url,
+                            record.overlap_count,
+                        )
+                        for record in records
+                    ),
+                )
+                connection.executemany(
+                    "INSERT OR IGNORE INTO seed_citation VALUES (?, ?)",
+                    ((seed_id, record.paper_id) for record in records for seed_id in record.cited_seeds),
+                )
+                # Build the indexes after loading, which is faster than maintaining them on every insert
+                connection.executescript("""
+                    CREATE INDEX idx_papers_year ON papers (year);
+                    CREATE INDEX idx_papers_citation_count ON papers (citation_count);
+                    CREATE INDEX idx_papers_seed_count ON papers (seed_count);
+                    CREATE INDEX idx_seed_citation_paper ON seed_citation (paper_id);
+                """)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def save_to_txt(citations: List[Citation], filename: str = "citations.txt", sort_by: str = "citations", show_abstract: bool = False) -> None:
         """
         Save citations to a human-readable text file, sorted by the specified field, with an option to skip abstracts.
         """
-        citations_sorted = sorted(citations, key=lambda x: CitationExporter.get_sort_value(x, sort_by), reverse=True)
+        citations_sorted = CitationExporter.sort_citations(citations, sort_by)
+        CitationExporter.stream_to_txt(citations_sorted, filename=filename, show_abstract=show_abstract)
+
+    @staticmethod
+    def stream_to_txt(citations: Iterable[Citation], filename: str = "citations.txt", show_abstract: bool = False) -> int:
+        """
+        Write citations to a human-readable text file one entry at a time, in the order they are produced.
+
+        Returns:
+            int: The number of citations written.
+        """
+        count = 0
         with open(filename, "w", encoding="utf-8") as txtfile:
-            for citation in citations_sorted:
-                citing_paper = citation.get("citingPaper", {})
-                title = citing_paper.get("title", "N/A")
-                authors = citing_paper.get("authors", [])
-                author_list = ", ".join([author["name"] for author in authors])
-                citation_count = citing_paper.get("citationCount", 0)
-                year = citing_paper.get("year", "N/A")
-                abstract = citing_paper.get("abstract", "N/A")
-                venue = citing_paper.get("venue", "N/A")
-                external_ids = citing_paper.get("externalIds", {})
-                arxiv_url = f"https://arxiv.org/abs/{external_ids.get('ArXiv', '')}" if external_ids.get("ArXiv") else "N/A"
-                semantic_scholar_url = citing_paper.get("url", "N/A")
-
-                txtfile.write(f"Title: {title}\n")
-                txtfile.write(f"Authors: {author_list}\n")
-                txtfile.write(f"Citation Count: {citation_count}\n")
-                txtfile.write(f"Year: {year}\n")
+            for record in PaperRecord.iter_records(citations):
+                txtfile.write(f"Title: {record.title}\n")
+                txtfile.write(f"Authors: {record.author_names}\n")
+                txtfile.write(f"Citation Count: {record.citation_count}\n")
+                txtfile.write(f"Year: {record.year}\n")
                 if show_abstract:
-                    txtfile.write(f"Abstract: {abstract}\n")
-                txtfile.write(f"Venue: {venue}\n")
-                txtfile.write(f"ArXiv URL: {arxiv_url}\n")
-                txtfile.write(f"Semantic Scholar URL: {semantic_scholar_url}\n\n")
+                    txtfile.write(f"Abstract: {record.abstract}\n")
+                txtfile.write(f"Venue: {record.venue}\n")
+                txtfile.write(f"ArXiv URL: {record.arxiv_url}\n")
+                txtfile.write(f"Semantic Scholar URL: {record.url}\n\n")
+                count += 1
+        return count
 
     @staticmethod
-    def display_citations(citations: List[Dict[str, Any]], sort_by: str = "citations", limit: int = 10, show_abstract: bool = False) -> None:
+    def display_citations(citations: List[Citation], sort_by: str = "citations", limit: int = 10, show_abstract: bool = False) -> None:
         """
         Display the top `limit` citations in a human-readable format, sorted by the specified field, with an option to skip abstracts.
         """
-        citations_sorted = sorted(citations, key=lambda x: CitationExporter.get_sort_value(x, sort_by), reverse=True)
+        citations_sorted = CitationExporter.sort_citations(citations, sort_by, limit=limit)
+        CitationExporter._print_citations(citations_sorted[:limit], len(citations), show_abstract=show_abstract)
 
+    @staticmethod
+    def _print_citations(records: List[PaperRecord], total: int, show_abstract: bool = False) -> None:
         # Display a header indicating how many results will be shown
-        print(f"\nShowing top {min(limit, len(citations))} out of {len(citations)} citations:\n")
-
-        for idx, citation in enumerate(citations_sorted[:limit], start=1):
-            citing_paper = citation.get("citingPaper", {})
-            title = citing_paper.get("title", "N/A")
-            authors = citing_paper.get("authors", [])
-            author_list = ", ".join([author["name"] for author in authors])
-            citation_count = citing_paper.get("citationCount", 0)
-            year = citing_paper.get("year", "N/A")
-            abstract = citing_paper.get("abstract", "N/A")
-            venue = citing_paper.get("venue", "N/A")
-            external_ids = citing_paper.get("externalIds", {})
-            arxiv_url = f"https://arxiv.org/abs/{external_ids.get('ArXiv', '')}" if external_ids.get("ArXiv") else "N/A"
-            semantic_scholar_url = citing_paper.get("url", "N/A")
+        print(f"\nShowing top {len(records)} out of {total} citations:\n")
 
+        for idx, record in enumerate(records, start=1):
             # Print the enumerated citation result
-            print(f"{idx}. Title: {title}")
-            print(f"   Authors: {author_list}")
-            print(f"   Citation Count: {citation_count}")
-            print(f"   Year: {year}")
+            print(f"{idx}. Title: {record.title}")
+            print(f"   Authors: {record.author_names}")
+            print(f"   Citation Count: {record.citation_count}")
+            print(f"   Year: {record.year}")
             if show_abstract:
-                print(f"   Abstract: {abstract}")
-            print(f"   Venue: {venue}")
-            print(f"   ArXiv URL: {arxiv_url}")
-            print(f"   Semantic Scholar URL: {semantic_scholar_url}\n")
+                print(f"   Abstract: {record.abstract}")
+            print(f"   Venue: {record.venue}")
+            print(f"   ArXiv URL: {record.arxiv_url}")
+            print(f"   Semantic Scholar URL: {record.url}\n")
+
+    @staticmethod
+    def export(citations: List[Citation], sinks: List[Tuple[str, Optional[str]]], sort_by: str = "citations",
+               display_limit: int = 10, show_abstract: bool = False, metrics: Optional[MetricsHook] = None) -> None:
+        """
+        Export citations to several outputs in one pass.
+
+        The citations are normalized into records and sorted once, and the sorted records are shared by
+        all outputs that need them. If the terminal display is the only sorted output, only the top
+        `display_limit` records are selected with a heap instead of sorting everything.
+
+        Args:
+            citations (List[Citation]): The citations to export.
+            sinks (List[Tuple[str, Optional[str]]]): Pairs of output type (one of `OUTPUT_TYPES`) and file name.
+                The file name is ignored for "stdout".
+            sort_by (str): The field by which to sort the citations.
+            display_limit (int): Maximum number of citations displayed for the "stdout" output.
+            show_abstract (bool): Whether to include abstracts in the txt and stdout outputs.
+            metrics (Optional[MetricsHook]): Hook receiving the durations of the sort and export stages.
+        """
+        metrics = metrics or MetricsHook()
+        if sort_by not in CitationExporter.VALID_SORT_OPTIONS:
+            raise ValueError(f"Invalid sort option. Please use one of {CitationExporter.VALID_SORT_OPTIONS}")
+        for output_type, _ in sinks:
+            if output_type not in CitationExporter.OUTPUT_TYPES:
+                raise ValueError(f"Invalid output type {output_type}. Please use one of {CitationExporter.OUTPUT_TYPES}")
+
+        records = PaperRecord.from_citations(citations)
+        sorted_types = {output_type for output_type, _ in sinks} & CitationExporter.SORTED_OUTPUT_TYPES
+        records_sorted = None
+        with metrics.stage("sort"):
+            if sorted_types == {"stdout"}:
+                records_sorted = CitationExporter.sort_citations(records, sort_by, limit=display_limit)
+            elif sorted_types:
+                records_sorted = CitationExporter.sort_citations(records, sort_by)
+
+        with metrics.stage("export"):
+            for output_type, filename in sinks:
+                if output_type == "stdout":
+                    CitationExporter._print_citations(records_sorted[:display_limit], len(records), show_abstract=show_abstract)
+                elif output_type == "csv":
+                    CitationExporter.stream_to_csv(records_sorted, filename=filename)
+                elif output_type == "txt":
+                    CitationExporter.stream_to_txt(records_sorted, filename=filename, show_abstract=show_abstract)
+                elif output_type == "json":
+                    CitationExporter.save_to_json(records, filename=filename)
+                elif output_type == "jsonl":
+                    CitationExporter.stream_to_jsonl(records, filename=filename)
+                elif output_type == "parquet":
+                    table = CitationExporter._arrow_table(records_sorted)
+                    import pyarrow.parquet as pq
+                    pq.write_table(table, filename)
+                elif output_type == "arrow":
+                    table = CitationExporter._arrow_table(records_sorted)
+                    import pyarrow.feather as feather
+                    feather.write_feather(table, filename)
+                elif output_type == "sqlite":
+                    CitationExporter.save_to_sqlite(records, filename=filename)
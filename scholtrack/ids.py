@@ -0,0 +1,41 @@
+import re
+from typing import List, Optional, Iterable
+
+# Semantic Scholar paper IDs are 40 hex characters. Papers can also be given by an external ID with its
+# prefix, e.g. DOI:10.1145/3592433, ARXIV:2308.04079 or CorpusId:259267917
+_PAPER_ID_PATTERN = re.compile(r"[a-f0-9]{40}|(?i:DOI|ARXIV|CORPUSID|MAG|ACL|PMID|PMCID|URL):\S+")
+
+
+def is_paper_id(paper_id: str) -> bool:
+    """
+    Check whether a string is a Semantic Scholar paper ID or a prefixed external ID accepted by the API.
+    """
+    return _PAPER_ID_PATTERN.fullmatch(paper_id) is not None
+
+
+def parse_paper_ids(lines: Iterable[str], source: Optional[str] = None) -> List[str]:
+    """
+    Parse paper IDs from lines of text, ignoring empty lines and comments after '#'.
+
+    Lines holding anything other than a paper ID (see `is_paper_id`) are skipped with a warning, so that
+    a malformed line is reported when the list is loaded rather than as a failed request.
+
+    Args:
+        lines (Iterable[str]): The lines to parse, e.g. an open file.
+        source (Optional[str]): The name of the file or collection, used in warnings.
+
+    Returns:
+        List[str]: A list of paper IDs.
+    """
+    paper_ids = []
+    for number, line in enumerate(lines, 1):
+        # Remove comments after '#' and strip leading/trailing whitespaces
+        paper_id = line.split('#')[0].strip()
+        if not paper_id:
+            continue
+        if is_paper_id(paper_id):
+            paper_ids.append(paper_id)
+        else:
+            location = f"line {number} of {source}" if source else f"line {number}"
+            print(f"Warning: Skipping {location}, which is not a Semantic Scholar paper ID: {paper_id}")
+    return paper_ids
@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+import time
+from typing import List, Optional, Dict, Any, Tuple
+
+
+class FetchJournal:
+    """
+    An append-only JSON Lines journal of the seed papers whose citations were fetched completely.
+
+    Every completed seed paper is appended as one line with its citations and flushed to disk with an
+    fsync, so that a crashed or interrupted run loses at most the seed papers in flight. A resumed run
+    reads the journal and only fetches the seed papers missing from it. A truncated last line, left by a
+    crash in the middle of a write, is ignored.
+
+    A finished run removes its journal, so an existing journal always belongs to a run that crashed or was
+    interrupted. It is never emptied implicitly while it is fresh: it must either be resumed or removed
+    first. Journals and entries older than `max_age` are stale; they are started over and not resumed.
+    """
+
+    def __init__(self, path: str, resume: bool = False, max_age: Optional[float] = None):
+        """
+        Opens the journal.
+
+        Args:
+            path (str): Path of the journal file. Its directory is created if it does not exist.
+            resume (bool): Whether to keep and load the seed papers of an existing journal.
+            max_age (Optional[float]): Age in seconds after which journaled seed papers are fetched again, and
+                after which an unused journal is started over. They never expire if omitted.
+
+        Raises:
+            FileExistsError: If a fresh non-empty journal exists at `path` and `resume` is False, as it holds the
+                seed papers of an interrupted run.
+        """
+        self.path = path
+        self.max_age = max_age
+        self.entries = {}  # (paper ID, fields, min year) -> citations
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if self.exists(path, max_age) and not resume:
+            raise FileExistsError(f"The journal {path} of an interrupted run already exists. "
+                                  f"Resume it, or remove it to start over.")
+        if resume and os.path.exists(path):
+            self._load()
+            self._file = open(path, "a", encoding="utf-8")
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+
+    @property
+    def report_path(self) -> str:
+        """
+        Path of the file listing the seed papers that the last finished run could not fetch completely.
+        """
+        return f"{os.path.splitext(self.path)[0]}.incomplete.json"
+
+    @staticmethod
+    def exists(path: str, max_age: Optional[float] = None) -> bool:
+        """
+        Whether a non-empty journal exists at `path`, written to within the last `max_age` seconds if given.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        return stat.st_size > 0 and (max_age is None or time.time() - stat.st_mtime <= max_age)
+
+    def _load(self) -> None:
+        with open(self.path, "rb+") as f:
+            complete_size = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                complete_size += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if self.max_age is not None and time.time() - entry.get("fetched", 0) > self.max_age:
+                    continue
+                self.entries[self._key(entry["paper_id"], entry["fields"], entry.get("min_year"))] = entry["citations"]
+            # Drop a line left incomplete by a crash, so that the next entry starts on a line of its own
+            f.truncate(complete_size)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def _key(paper_id: str, fields: str, min_year: Optional[int]) -> Tuple[str, str, Optional[int]]:
+        return paper_id, fields, min_year
+
+    def get(self, paper_id: str, fields: str, min_year: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the journaled citations of a seed paper, if they were fetched with the same fields and minimum year.
+
+        Args:
+            paper_id (str): The ID of the seed paper.
+            fields (str): Comma-separated list of fields fetched for each citing paper.
+            min_year (Optional[int]): The minimum publication year the citations were fetched with.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: The citations, or None if the seed paper must be fetched.
+        """
+        return self.entries.get(self._key(paper_id, fields, min_year))
+
+    def append(self, paper_id: str, fields: str, citations: List[Dict[str, Any]], min_year: Optional[int] = None) -> None:
+        """
+        Record the complete citations of a seed paper and flush them to disk.
+
+        Args:
+            paper_id (str): The ID of the seed paper.
+            fields (str): Comma-separated list of fields fetched for each citing paper.
+            citations (List[Dict[str, Any]]): The citations of the seed paper.
+            min_year (Optional[int]): The minimum publication year the citations were fetched with.
+        """
+        line = json.dumps({"paper_id": paper_id, "fields": fields, "min_year": min_year,
+                           "fetched": time.time(), "citations": citations})
+        with self._lock:
+            self.entries[self._key(paper_id, fields, min_year)] = citations
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self, remove: bool = False) -> None:
+        """
+        Close the journal file.
+
+        Args:
+            remove (bool): Whether to delete the journal, e.g. once the run it belongs to has completed.
+        """
+        with self._lock:
+            self._file.close()
+            if remove:
+                os.remove(self.path)
+
+    def finish(self, incomplete_seeds: Dict[str, str]) -> None:
+        """
+        Close and remove the journal of a finished run. The seed papers it could not fetch completely are saved
+        to `report_path` instead, with the reason, and the report of an earlier run is removed if there are none.
+
+        Args:
+            incomplete_seeds (Dict[str, str]): The reason why each incomplete seed paper could not be fetched.
+        """
+        self.close(remove=True)
+        if incomplete_seeds:
+            tmp_path = f"{self.report_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"finished": time.time(), "incomplete_seeds": incomplete_seeds}, f, indent=2)
+            os.replace(tmp_path, self.report_path)
+        elif os.path.exists(self.report_path):
+            os.remove(self.report_path)
@@ -0,0 +1,263 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Dict, Any, Iterator
+
+from tqdm import tqdm
+
+
+class MetricsHook:
+    """
+    Receives instrumentation events from the API client, the transport and the exporter.
+
+    All callbacks do nothing by default; subclass this hook and override the events you need. Callbacks
+    may be called concurrently from worker threads.
+    """
+
+    def on_request(self, method: str, url: str, status: Optional[int], elapsed: float, bytes_received: int) -> None:
+        """
+        Called after every HTTP request, including retried ones. `status` is None on connection errors.
+        """
+
+    def on_retry(self, method: str, url: str, attempt: int, status: Optional[int]) -> None:
+        """
+        Called before a failed request is retried.
+        """
+
+    def on_cache(self, hit: bool) -> None:
+        """
+        Called after every lookup in the response cache.
+        """
+
+    def on_page(self, paper_id: str, from_cache: bool) -> None:
+        """
+        Called for every citation page of a paper, whether fetched or read from the cache.
+        """
+
+    def on_seed_done(self, paper_id: str, citations: int) -> None:
+        """
+        Called when all citations of a seed paper have been fetched.
+        """
+
+    def on_stage(self, name: str, elapsed: float) -> None:
+        """
+        Called when a processing stage (e.g. fetch, dedup, filter, sort, export) ends.
+        """
+
+    def close(self) -> None:
+        """
+        Called when fetching is over, e.g. to close progress displays.
+        """
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time the enclosed block and report it as stage `name`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.on_stage(name, time.perf_counter() - start)
+
+
+class CompositeHook(MetricsHook):
+    """
+    Forwards every event to several hooks.
+    """
+
+    def __init__(self, hooks: List[MetricsHook]):
+        self.hooks = hooks
+
+    def on_request(self, *args: Any) -> None:
+        for hook in self.hooks:
+            hook.on_request(*args)
+
+    def on_retry(self, *args: Any) -> None:
+        for hook in self.hooks:
+            hook.on_retry(*args)
+
+    def on_cache(self, *args: Any) -> None:
+        for hook in self.hooks:
+            hook.on_cache(*args)
+
+    def on_page(self, *args: Any) -> None:
+        for hook in self.hooks:
+            hook.on_page(*args)
+
+    def on_seed_done(self, *args: Any) -> None:
+        for hook in self.hooks:
+            hook.on_seed_done(*args)
+
+    def on_stage(self, *args: Any) -> None:
+        for hook in self.hooks:
+            hook.on_stage(*args)
+
+    def close(self) -> None:
+        for hook in self.hooks:
+            hook.close()
+
+
+class RunMetrics(MetricsHook):
+    """
+    Collects the metrics of a run: request timings and sizes, retries, cache hits, pages per seed paper
+    and the duration of every stage.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.request_times = []
+        self.statuses = {}
+        self.bytes_received = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.pages = {}  # Paper ID -> number of citation pages
+        self.cached_pages = 0
+        self.seeds_done = 0
+        self.stages = {}  # Stage name -> total seconds, in order of first occurrence
+        self._lock = threading.Lock()
+
+    def on_request(self, method: str, url: str, status: Optional[int], elapsed: float, bytes_received: int) -> None:
+        with self._lock:
+            self.request_times.append(elapsed)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.bytes_received += bytes_received
+
+    def on_retry(self, method: str, url: str, attempt: int, status: Optional[int]) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def on_cache(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def on_page(self, paper_id: str, from_cache: bool) -> None:
+        with self._lock:
+            self.pages[paper_id] = self.pages.get(paper_id, 0) + 1
+            self.cached_pages += from_cache
+
+    def on_seed_done(self, paper_id: str, citations: int) -> None:
+        with self._lock:
+            self.seeds_done += 1
+
+    def on_stage(self, name: str, elapsed: float) -> None:
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    @staticmethod
+    def _percentile(sorted_values: List[float], fraction: float) -> float:
+        return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Get the collected metrics.
+
+        Returns:
+            Dict[str, Any]: The total wall time, the stage durations, request, cache and page statistics,
+            with all durations in seconds.
+        """
+        with self._lock:
+            times = sorted(self.request_times)
+            pages = dict(self.pages)
+            summary = {
+                "wall_time": time.perf_counter() - self.started,
+                "stages": dict(self.stages),
+                "requests": {
+                    "count": len(times),
+                    "retries": self.retries,
+                    "bytes_received": self.bytes_received,
+                    "statuses": {str(status): count for status, count in self.statuses.items()},
+                    "total_time": sum(times),
+                    "mean_time": sum(times) / len(times) if times else 0.0,
+                    "p50_time": self._percentile(times, 0.5) if times else 0.0,
+                    "p95_time": self._percentile(times, 0.95) if times else 0.0,
+                    "max_time": times[-1] if times else 0.0,
+                },
+                "cache": {"hits": self.cache_hits, "misses": self.cache_misses},
+                "pages": {
+                    "count": sum(pages.values()),
+                    "cached": self.cached_pages,
+                    "seeds": self.seeds_done,
+                    "max_per_paper": max(pages.values()) if pages else 0,
+                    "per_paper": pages,
+                },
+            }
+        return summary
+
+    def format_table(self) -> str:
+        """
+        Format the collected metrics as a table for the terminal.
+        """
+        summary = self.summary()
+        requests = summary["requests"]
+        pages = summary["pages"]
+        rows = [("Wall time", f"{summary['wall_time']:.2f}s")]
+        rows += [(f"  {name}", f"{elapsed:.2f}s") for name, elapsed in summary["stages"].items()]
+        rows += [
+            ("Requests", f"{requests['count']} ({requests['retries']} retries)"),
+            ("  statuses", ", ".join(f"{status}: {count}" for status, count in requests["statuses"].items()) or "-"),
+            ("  received", f"{requests['bytes_received'] / 2 ** 20:.2f} MB"),
+            ("  time mean / p50 / p95 / max", f"{requests['mean_time']:.3f}s / {requests['p50_time']:.3f}s / "
+                                              f"{requests['p95_time']:.3f}s / {requests['max_time']:.3f}s"),
+            ("Cache hits / misses", f"{summary['cache']['hits']} / {summary['cache']['misses']}"),
+            ("Citation pages", f"{pages['count']} ({pages['cached']} from cache)"),
+            ("  seed papers done", str(pages["seeds"])),
+            ("  max pages per paper", str(pages["max_per_paper"])),
+        ]
+        width = max(len(label) for label, _ in rows)
+        return "\n".join(f"{label:<{width}}  {value}" for label, value in rows)
+
+
+class ProgressHook(MetricsHook):
+    """
+    Shows a progress bar of the seed papers done, with the citation pages fetched and the request rate.
+    """
+
+    # Minimum seconds between two refreshes of the pages and request rate
+    REFRESH_INTERVAL = 0.5
+
+    def __init__(self, total: Optional[int] = None, description: str = "Fetching citations", disable: Optional[bool] = None):
+        """
+        Initializes the progress bar.
+
+        Args:
+            total (Optional[int]): Number of seed papers, if known.
+            description (str): Label shown in front of the bar.
+            disable (Optional[bool]): Whether to hide the bar. By default, it is hidden when stderr is not a terminal.
+        """
+        self.bar = tqdm(total=total, desc=description, unit="seed", disable=disable, leave=False)
+        self.started = time.perf_counter()
+        self.pages = 0
+        self.requests = 0
+        self._refreshed = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        now = time.perf_counter()
+        if now - self._refreshed < self.REFRESH_INTERVAL:
+            return
+        self._refreshed = now
+        rate = self.requests / (now - self.started) if now > self.started else 0.0
+        self.bar.set_postfix(pages=self.pages, requests=self.requests, req_per_s=f"{rate:.1f}")
+
+    def on_request(self, method: str, url: str, status: Optional[int], elapsed: float, bytes_received: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self._refresh()
+
+    def on_page(self, paper_id: str, from_cache: bool) -> None:
+        with self._lock:
+            self.pages += 1
+            self._refresh()
+
+    def on_seed_done(self, paper_id: str, citations: int) -> None:
+        with self._lock:
+            self.bar.update(1)
+
+    def close(self) -> None:
+        with self._lock:
+            self.bar.close()
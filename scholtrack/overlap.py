@@ -0,0 +1,141 @@
+from typing import List, Optional, Iterable
+
+from scholtrack.records import PaperRecord
+
+try:
+    _popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def _popcount(mask: int) -> int:
+        return bin(mask).count("1")
+
+
+class OverlapIndex:
+    """
+    Records which seed papers every citing paper cites.
+
+    Citing papers are mapped to dense integer IDs in the order they are first seen, and each one gets a
+    bitset over the seed papers, stored as a Python integer whose bit `i` is set if it cites seed `i`.
+    Overlap queries such as "cites at least n seeds" or "cites seeds A and B but not C" then reduce to
+    a few integer operations per citing paper, for any number of seeds.
+    """
+
+    def __init__(self, seed_ids: Iterable[str]):
+        """
+        Initializes an empty index.
+
+        Args:
+            seed_ids (Iterable[str]): The IDs of the seed papers. Duplicates are ignored.
+        """
+        self.seed_ids = list(dict.fromkeys(seed_ids))
+        self.seed_bits = {seed_id: 1 << i for i, seed_id in enumerate(self.seed_ids)}
+        self.paper_ids = []  # Dense ID -> citing paper ID
+        self.dense_ids = {}  # Citing paper ID -> dense ID
+        self.masks = []  # Dense ID -> bitset of the cited seeds
+
+    def __len__(self) -> int:
+        return len(self.paper_ids)
+
+    def __contains__(self, paper_id: str) -> bool:
+        return paper_id in self.dense_ids
+
+    def add(self, seed_id: str, paper_id: str) -> bool:
+        """
+        Record that `paper_id` cites the seed paper `seed_id`.
+
+        Args:
+            seed_id (str): The ID of the cited seed paper.
+            paper_id (str): The ID of the citing paper.
+
+        Returns:
+            bool: Whether the citing paper was seen for the first time.
+        """
+        dense_id = self.dense_ids.get(paper_id)
+        if dense_id is None:
+            self.dense_ids[paper_id] = len(self.paper_ids)
+            self.paper_ids.append(paper_id)
+            self.masks.append(self.seed_bits[seed_id])
+            return True
+        self.masks[dense_id] |= self.seed_bits[seed_id]
+        return False
+
+    def mask(self, seed_ids: Iterable[str]) -> int:
+        """
+        Get the bitset of the given seed papers.
+
+        Raises:
+            KeyError: If one of the IDs is not a seed paper of the index.
+        """
+        mask = 0
+        for seed_id in seed_ids:
+            if seed_id not in self.seed_bits:
+                raise KeyError(f"{seed_id} is not one of the seed papers.")
+            mask |= self.seed_bits[seed_id]
+        return mask
+
+    def overlap_count(self, paper_id: str) -> int:
+        """
+        Get the number of seed papers cited by a citing paper, or 0 if it is unknown.
+        """
+        dense_id = self.dense_ids.get(paper_id)
+        return _popcount(self.masks[dense_id]) if dense_id is not None else 0
+
+    def cited_seeds(self, paper_id: str) -> List[str]:
+        """
+        Get the IDs of the seed papers cited by a citing paper, in the order of the seed papers.
+        """
+        dense_id = self.dense_ids.get(paper_id)
+        if dense_id is None:
+            return []
+        mask = self.masks[dense_id]
+        return [seed_id for seed_id, bit in self.seed_bits.items() if mask & bit]
+
+    def counts(self) -> List[int]:
+        """
+        Get the number of cited seed papers of every citing paper, in dense ID order.
+        """
+        return [_popcount(mask) for mask in self.masks]
+
+    def select(self, at_least: int = 0, all_of: Optional[Iterable[str]] = None,
+               none_of: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Select the citing papers matching an overlap query.
+
+        Args:
+            at_least (int): Minimum number of seed papers cited.
+            all_of (Optional[Iterable[str]]): Seed papers that must all be cited.
+            none_of (Optional[Iterable[str]]): Seed papers that must not be cited.
+
+        Returns:
+            List[str]: The IDs of the matching citing papers, in the order they were first seen.
+        """
+        required = self.mask(all_of or ())
+        excluded = self.mask(none_of or ())
+        return [
+            paper_id for paper_id, mask in zip(self.paper_ids, self.masks)
+            if mask & required == required and not mask & excluded and (at_least <= 1 or _popcount(mask) >= at_least)
+        ]
+
+    @staticmethod
+    def filter(records: Iterable[PaperRecord], seed_ids: Iterable[str], at_least: int = 0,
+               all_of: Optional[Iterable[str]] = None, none_of: Optional[Iterable[str]] = None) -> List[PaperRecord]:
+        """
+        Index the cited seed papers of normalized citing papers and select the ones matching an overlap query,
+        e.g. after merging duplicates, whose cited seed papers are the union of those of their entries.
+
+        Args:
+            records (Iterable[PaperRecord]): The citing papers, with their `cited_seeds`.
+            seed_ids (Iterable[str]): The IDs of the seed papers.
+            at_least (int): Minimum number of seed papers cited.
+            all_of (Optional[Iterable[str]]): Seed papers that must all be cited.
+            none_of (Optional[Iterable[str]]): Seed papers that must not be cited.
+
+        Returns:
+            List[PaperRecord]: The matching citing papers, in their original order.
+        """
+        records = list(records)
+        index = OverlapIndex(seed_ids)
+        for record in records:
+            for seed_id in record.cited_seeds:
+                index.add(seed_id, record.paper_id)
+        selected_ids = set(index.select(at_least=at_least, all_of=all_of, none_of=none_of))
+        return [record for record in records if record.paper_id in selected_ids]
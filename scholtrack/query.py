@@ -0,0 +1,205 @@
+import re
+from bisect import bisect_left
+from functools import cached_property
+from typing import List, Optional, Dict, Any, Iterable, Set, Tuple
+
+from scholtrack.records import PaperRecord
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split a text into lowercase alphanumeric tokens.
+    """
+    return _TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+class CitationIndex:
+    """
+    Precomputed indexes over citing papers, answering year, citation count, venue, field of study and
+    keyword queries without scanning every paper.
+
+    Years and citation counts are kept as sorted arrays, so that a lower bound is a binary search. Venues
+    and title/abstract words are indexed by token, and fields of study by their lowercase name, in
+    inverted indexes mapping each key to the positions of the papers that have it. A query intersects
+    the candidate sets of its criteria, smallest first. Indexes are built lazily, on the first query that
+    needs them.
+    """
+
+    def __init__(self, records: Iterable[PaperRecord]):
+        """
+        Initializes the index. Each index is built on its first use, so that a query only pays for the
+        indexes of its criteria, e.g. the token index over every abstract is only built for keywords.
+
+        Args:
+            records (Iterable[PaperRecord]): The citing papers to index.
+        """
+        self.records = list(records)
+
+    @cached_property
+    def _by_year(self) -> Tuple[List[int], List[int]]:
+        # The years of the papers with a year, sorted, and the positions of these papers in the same order
+        dated = sorted((record.year, i) for i, record in enumerate(self.records) if record.year is not None)
+        return [year for year, _ in dated], [i for _, i in dated]
+
+    @cached_property
+    def _by_citations(self) -> Tuple[List[int], List[int]]:
+        counted = sorted((record.citation_count or 0, i) for i, record in enumerate(self.records))
+        return [count for count, _ in counted], [i for _, i in counted]
+
+    @property
+    def years(self) -> List[int]:
+        return self._by_year[0]
+
+    @property
+    def year_positions(self) -> List[int]:
+        return self._by_year[1]
+
+    @property
+    def citation_counts(self) -> List[int]:
+        return self._by_citations[0]
+
+    @property
+    def citation_positions(self) -> List[int]:
+        return self._by_citations[1]
+
+    @cached_property
+    def venue_index(self) -> Dict[str, List[int]]:
+        """
+        Venue token -> positions of the papers whose venue contains it.
+        """
+        index = {}
+        venue_tokens = {}  # Venues repeat across papers, so each one is tokenized once
+        for i, record in enumerate(self.records):
+            if record.venue:
+                if record.venue not in venue_tokens:
+                    venue_tokens[record.venue] = set(tokenize(record.venue))
+                for token in venue_tokens[record.venue]:
+                    index.setdefault(token, []).append(i)
+        return index
+
+    @cached_property
+    def field_index(self) -> Dict[str, List[int]]:
+        """
+        Lowercase field of study -> positions of the papers with it.
+        """
+        index = {}
+        for i, record in enumerate(self.records):
+            for field in record.fields_of_study or ():
+                index.setdefault(field.lower(), []).append(i)
+        return index
+
+    @cached_property
+    def token_index(self) -> Dict[str, List[int]]:
+        """
+        Title or abstract token -> positions of the papers containing it.
+        """
+        index = {}
+        for i, record in enumerate(self.records):
+            for token in set(tokenize(record.title)) | set(tokenize(record.abstract)):
+                index.setdefault(token, []).append(i)
+        return index
+
+    @cached_property
+    def vocabulary(self) -> List[str]:
+        """
+        The tokens of the token index, sorted for prefix searches.
+        """
+        return sorted(self.token_index)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def published_since(self, year: int) -> Set[int]:
+        """
+        Get the positions of the papers published in or after `year`. Papers without a year are left out.
+        """
+        return set(self.year_positions[bisect_left(self.years, year):])
+
+    def cited_at_least(self, count: int) -> Set[int]:
+        """
+        Get the positions of the papers with at least `count` citations.
+        """
+        return set(self.citation_positions[bisect_left(self.citation_counts, count):])
+
+    def in_venue(self, venue: str) -> Set[int]:
+        """
+        Get the positions of the papers whose venue contains all words of `venue`, ignoring case,
+        e.g. "CVPR" or "Computer Vision and Pattern Recognition".
+        """
+        positions = None
+        for token in tokenize(venue):
+            matches = set(self.venue_index.get(token, ()))
+            positions = matches if positions is None else positions & matches
+        return positions or set()
+
+    def in_field(self, field: str) -> Set[int]:
+        """
+        Get the positions of the papers with the field of study `field`, ignoring case.
+        """
+        return set(self.field_index.get(field.strip().lower(), ()))
+
+    def with_keyword(self, keyword: str) -> Set[int]:
+        """
+        Get the positions of the papers whose title or abstract contains all words of `keyword`, ignoring
+        case. A trailing `*` matches any word starting with the keyword, e.g. "gaussian*".
+        """
+        if keyword.endswith("*"):
+            prefix = keyword[:-1].strip().lower()
+            if not _TOKEN_PATTERN.fullmatch(prefix):
+                return set()
+            positions = set()
+            start = bisect_left(self.vocabulary, prefix)
+            for token in self.vocabulary[start:]:
+                if not token.startswith(prefix):
+                    break
+                positions.update(self.token_index[token])
+            return positions
+        positions = None
+        for token in tokenize(keyword):
+            matches = set(self.token_index.get(token, ()))
+            positions = matches if positions is None else positions & matches
+        return positions or set()
+
+    def select(self, min_year: Optional[int] = None, min_citations: Optional[int] = None,
+               venues: Optional[List[str]] = None, fields: Optional[List[str]] = None,
+               keywords: Optional[List[str]] = None) -> List[PaperRecord]:
+        """
+        Select the papers matching all given criteria.
+
+        Args:
+            min_year (Optional[int]): Minimum publication year.
+            min_citations (Optional[int]): Minimum citation count.
+            venues (Optional[List[str]]): Venues, of which the paper must match any (see `in_venue`).
+            fields (Optional[List[str]]): Fields of study, of which the paper must have any.
+            keywords (Optional[List[str]]): Keywords, which must all appear in the title or abstract (see `with_keyword`).
+
+        Returns:
+            List[PaperRecord]: The matching papers, in their original order.
+        """
+        candidates = []
+        if min_year is not None:
+            candidates.append(self.published_since(min_year))
+        if min_citations is not None:
+            candidates.append(self.cited_at_least(min_citations))
+        if venues:
+            candidates.append(set().union(*(self.in_venue(venue) for venue in venues)))
+        if fields:
+            candidates.append(set().union(*(self.in_field(field) for field in fields)))
+        for keyword in keywords or ():
+            candidates.append(self.with_keyword(keyword))
+        if not candidates:
+            return list(self.records)
+
+        candidates.sort(key=len)
+        positions = candidates[0].intersection(*candidates[1:])
+        return [self.records[i] for i in sorted(positions)]
+
+    @staticmethod
+    def filter(records: Iterable[PaperRecord], **criteria: Any) -> List[PaperRecord]:
+        """
+        Index the papers and select the ones matching the criteria of `select`, e.g.
+        `CitationIndex.filter(records, min_year=2023, venues=["CVPR"], keywords=["gaussian"])`.
+        """
+        return CitationIndex(records).select(**criteria)
@@ -0,0 +1,152 @@
+import sys
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Tuple, Union
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class PaperRecord:
+    """
+    A compact, normalized citing paper.
+
+    Records are built once from the raw API citations (`{"citingPaper": {...}}`), so exporters and sort
+    keys read plain attributes instead of re-parsing nested dicts. Venues, author names and fields of
+    study are interned, since the same strings repeat across thousands of papers.
+    """
+
+    __slots__ = (
+        "paper_id", "title", "authors", "abstract", "year", "citation_count", "reference_count",
+        "influential_citation_count", "venue", "fields_of_study", "url", "external_ids", "arxiv_id",
+        "arxiv_url", "cited_seeds", "extra",
+    )
+
+    def __init__(self, paper_id: Optional[str], title: Optional[str] = None,
+                 authors: Tuple[Tuple[Optional[str], str], ...] = (), abstract: Optional[str] = None,
+                 year: Optional[int] = None, citation_count: int = 0, reference_count: Optional[int] = None,
+                 influential_citation_count: Optional[int] = None, venue: Optional[str] = None,
+                 fields_of_study: Optional[Tuple[str, ...]] = None, url: Optional[str] = None,
+                 external_ids: Optional[Dict[str, Any]] = None, cited_seeds: Tuple[str, ...] = (),
+                 extra: Optional[Dict[str, Any]] = None):
+        self.paper_id = paper_id
+        self.title = title
+        self.authors = authors
+        self.abstract = abstract
+        self.year = year
+        self.citation_count = citation_count
+        self.reference_count = reference_count
+        self.influential_citation_count = influential_citation_count
+        self.venue = venue
+        self.fields_of_study = fields_of_study
+        self.url = url
+        self.external_ids = external_ids or {}
+        self.arxiv_id = self.external_ids.get("ArXiv") or ""
+        self.arxiv_url = f"https://arxiv.org/abs/{self.arxiv_id}" if self.arxiv_id else "N/A"
+        self.cited_seeds = cited_seeds
+        self.extra = extra
+
+    @classmethod
+    def from_citation(cls, citation: Dict[str, Any]) -> "PaperRecord":
+        """
+        Build a record from a raw API citation.
+
+        Args:
+            citation (Dict[str, Any]): A citation as returned by `CitationExplorerAPI`, with a `citingPaper` entry
+                and optionally the `citedSeeds`. Any other entries (e.g. the `hop` of a crawl) are kept in `extra`.
+
+        Returns:
+            PaperRecord: The normalized record.
+        """
+        paper = citation.get("citingPaper", {})
+        fields_of_study = paper.get("fieldsOfStudy")
+        extra = {key: value for key, value in citation.items() if key not in ("citingPaper", "citedSeeds")} or None
+        return cls(
+            paper_id=paper.get("paperId"),
+            title=paper.get("title"),
+            authors=tuple(
+                (author.get("authorId"), _intern(author.get("name")))
+                for author in paper.get("authors") or []
+            ),
+            abstract=paper.get("abstract"),
+            year=paper.get("year"),
+            citation_count=paper.get("citationCount") or 0,
+            reference_count=paper.get("referenceCount"),
+            influential_citation_count=paper.get("influentialCitationCount"),
+            venue=_intern(paper.get("venue")),
+            fields_of_study=tuple(_intern(field) for field in fields_of_study) if fields_of_study is not None else None,
+            url=paper.get("url"),
+            external_ids=paper.get("externalIds"),
+            cited_seeds=tuple(_intern(seed_id) for seed_id in citation.get("citedSeeds") or ()),
+            extra=extra,
+        )
+
+    @classmethod
+    def coerce(cls, citation: Union["PaperRecord", Dict[str, Any]]) -> "PaperRecord":
+        """
+        Return `citation` unchanged if it is already a record, or build a record from a raw API citation.
+        """
+        return citation if isinstance(citation, cls) else cls.from_citation(citation)
+
+    @classmethod
+    def from_citations(cls, citations: Iterable[Union["PaperRecord", Dict[str, Any]]]) -> List["PaperRecord"]:
+        """
+        Build records from raw API citations, keeping any that already are records.
+
+        Args:
+            citations (Iterable[Union[PaperRecord, Dict[str, Any]]]): The citations to normalize.
+
+        Returns:
+            List[PaperRecord]: The records, in the same order.
+        """
+        return [cls.coerce(citation) for citation in citations]
+
+    @classmethod
+    def iter_records(cls, citations: Iterable[Union["PaperRecord", Dict[str, Any]]]) -> Iterator["PaperRecord"]:
+        """
+        Lazily build records from raw API citations, e.g. while streaming.
+        """
+        for citation in citations:
+            yield cls.coerce(citation)
+
+    @property
+    def overlap_count(self) -> int:
+        """
+        The number of seed papers cited by this paper.
+        """
+        return len(self.cited_seeds)
+
+    @property
+    def author_names(self) -> str:
+        """
+        The comma-separated author names.
+        """
+        return ", ".join(name for _, name in self.authors if name)
+
+    def to_citation(self) -> Dict[str, Any]:
+        """
+        Convert the record back to the raw API citation format, e.g. for JSON export.
+
+        Returns:
+            Dict[str, Any]: A citation with a `citingPaper` entry, plus the `citedSeeds` and any `extra` entries.
+        """
+        citation = {
+            "citingPaper": {
+                "paperId": self.paper_id,
+                "title": self.title,
+                "authors": [{"authorId": author_id, "name": name} for author_id, name in self.authors],
+                "abstract": self.abstract,
+                "citationCount": self.citation_count,
+                "year": self.year,
+                "referenceCount": self.reference_count,
+                "influentialCitationCount": self.influential_citation_count,
+                "venue": self.venue,
+                "fieldsOfStudy": list(self.fields_of_study) if self.fields_of_study is not None else None,
+                "url": self.url,
+                "externalIds": self.external_ids,
+            }
+        }
+        if self.cited_seeds:
+            citation["citedSeeds"] = list(self.cited_seeds)
+        if self.extra:
+            citation.update(self.extra)
+        return citation
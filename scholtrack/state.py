@@ -0,0 +1,77 @@
+import json
+import os
+import time
+from typing import List, Optional, Dict, Any
+
+
+class SeedStateStore:
+    """
+    Stores the citations already seen for each seed paper, so that later runs only fetch what is new.
+
+    Every seed paper gets its own JSON file holding its last-seen citation count, the citations
+    collected so far and the fields they were fetched with.
+    """
+
+    def __init__(self, state_dir: str):
+        """
+        Initializes the state store.
+
+        Args:
+            state_dir (str): Directory where the per-seed state files are kept. Created if it does not exist.
+        """
+        self.state_dir = state_dir
+        os.makedirs(state_dir, exist_ok=True)
+
+    def _path(self, paper_id: str) -> str:
+        return os.path.join(self.state_dir, f"{paper_id}.json")
+
+    def load(self, paper_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the stored state of a seed paper.
+
+        Args:
+            paper_id (str): The ID of the seed paper.
+
+        Returns:
+            Optional[Dict[str, Any]]: A dict with the `citation_count`, the known `citations`, their `fields`
+            and the `updated` timestamp, or None if the seed paper has not been fetched before.
+        """
+        try:
+            with open(self._path(paper_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, paper_id: str, citation_count: Optional[int], citations: List[Dict[str, Any]],
+             fields: Optional[str] = None) -> None:
+        """
+        Store the state of a seed paper, replacing the previous one.
+
+        Args:
+            paper_id (str): The ID of the seed paper.
+            citation_count (Optional[int]): The citation count reported by Semantic Scholar for the seed paper.
+            citations (List[Dict[str, Any]]): All citations known for the seed paper.
+            fields (Optional[str]): The fields the citing papers were fetched with.
+        """
+        path = self._path(paper_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"citation_count": citation_count, "updated": time.time(), "fields": fields,
+                       "citations": citations}, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def citing_ids(state: Dict[str, Any]) -> set:
+        """
+        Get the IDs of the citing papers already known for a seed paper.
+
+        Args:
+            state (Dict[str, Any]): The state returned by `load`.
+
+        Returns:
+            set: The known citing paper IDs.
+        """
+        return {
+            citation.get("citingPaper", {}).get("paperId")
+            for citation in state.get("citations", [])
+        }
@@ -0,0 +1,256 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Dict, Any, Iterable
+
+from scholtrack.overlap import OverlapIndex
+
+
+class PaperStore:
+    """
+    A local SQLite store of paper metadata and citation edges, shared by all runs.
+
+    Papers are stored with the fields fetched so far, and every citation edge (seed paper -> citing
+    paper) with the time it was fetched. A seed paper whose complete citation list was fetched is
+    recorded as well, so that later runs, even for other collections, only fetch the seed papers that
+    are missing or older than `max_age`. Everything in the store can also be queried without network access.
+    """
+
+    # Maximum number of parameters bound in a single SQLite statement
+    CHUNK_SIZE = 500
+
+    def __init__(self, path: str, max_age: Optional[float] = None):
+        """
+        Initializes the store, creating the database if it does not exist.
+
+        Args:
+            path (str): Path of the SQLite database file.
+            max_age (Optional[float]): Age in seconds after which stored papers and citation lists are fetched
+                again. They never expire if omitted.
+        """
+        self.path = path
+        self.max_age = max_age
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # A single connection shared by the worker threads, serialized by a lock
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.executescript("""
+                PRAGMA journal_mode = WAL;
+                CREATE TABLE IF NOT EXISTS papers (
+                    paper_id TEXT PRIMARY KEY,
+                    title TEXT,
+                    year INTEGER,
+                    citation_count INTEGER,
+                    data TEXT NOT NULL,
+                    fetched REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS citations (
+                    seed_id TEXT NOT NULL,
+                    citer_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    fetched REAL NOT NULL,
+                    PRIMARY KEY (seed_id, citer_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS seeds (
+                    seed_id TEXT PRIMARY KEY,
+                    citation_count INTEGER NOT NULL,
+                    fetched REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_papers_year ON papers (year);
+                CREATE INDEX IF NOT EXISTS idx_papers_citation_count ON papers (citation_count);
+                CREATE INDEX IF NOT EXISTS idx_citations_citer ON citations (citer_id);
+                CREATE INDEX IF NOT EXISTS idx_citations_position ON citations (seed_id, position);
+            """)
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+    def _is_fresh(self, fetched: float) -> bool:
+        return self.max_age is None or time.time() - fetched <= self.max_age
+
+    @staticmethod
+    def _project(paper: Dict[str, Any], fields: Optional[str]) -> Optional[Dict[str, Any]]:
+        # The stored paper restricted to the requested fields, or None if one of them was never fetched
+        if not fields:
+            return paper
+        projected = {"paperId": paper.get("paperId")}
+        for field in fields.split(","):
+            if field == "paperId":
+                continue
+            if field not in paper:
+                return None
+            projected[field] = paper[field]
+        return projected
+
+    def add_papers(self, papers: Iterable[Dict[str, Any]]) -> None:
+        """
+        Store papers, merging their fields into the ones stored before.
+
+        Args:
+            papers (Iterable[Dict[str, Any]]): Papers as returned by the API, with a `paperId`.
+        """
+        papers = [paper for paper in papers if paper and paper.get("paperId") and len(paper) > 1]
+        if not papers:
+            return
+        now = time.time()
+        with self._lock, self._connection:
+            for start in range(0, len(papers), self.CHUNK_SIZE):
+                chunk = papers[start:start + self.CHUNK_SIZE]
+                stored = self._select_papers([paper["paperId"] for paper in chunk])
+                rows = []
+                for paper in chunk:
+                    merged = dict(stored[paper["paperId"]][0]) if paper["paperId"] in stored else {}
+                    merged.update(paper)
+                    rows.append((merged["paperId"], merged.get("title"), merged.get("year"),
+                                 merged.get("citationCount"), json.dumps(merged), now))
+                self._connection.executemany("INSERT OR REPLACE INTO papers VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def _select_papers(self, paper_ids: List[str]) -> Dict[str, Any]:
+        placeholders = ",".join("?" * len(paper_ids))
+        rows = self._connection.execute(
+            f"SELECT paper_id, data, fetched FROM papers WHERE paper_id IN ({placeholders})", paper_ids)
+        return {paper_id: (json.loads(data), fetched) for paper_id, data, fetched in rows}
+
+    def get_papers(self, paper_ids: List[str], fields: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up stored papers that are fresh and have all requested fields.
+
+        Args:
+            paper_ids (List[str]): The IDs of the papers.
+            fields (Optional[str]): Comma-separated list of required fields. All stored fields are returned if omitted.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: The papers found, by ID, restricted to the requested fields.
+        """
+        paper_ids = list(dict.fromkeys(paper_ids))
+        papers = {}
+        with self._lock:
+            for start in range(0, len(paper_ids), self.CHUNK_SIZE):
+                for paper_id, (paper, fetched) in self._select_papers(paper_ids[start:start + self.CHUNK_SIZE]).items():
+                    projected = self._project(paper, fields) if self._is_fresh(fetched) else None
+                    if projected is not None:
+                        papers[paper_id] = projected
+        return papers
+
+    def add_citations(self, seed_id: str, citations: List[Dict[str, Any]], position: Optional[int] = None) -> None:
+        """
+        Store the citing papers of a seed paper and the citation edges to them.
+
+        Args:
+            seed_id (str): The ID of the cited seed paper.
+            citations (List[Dict[str, Any]]): Citations as returned by the API, with a `citingPaper` entry.
+            position (Optional[int]): Position of the first citation in the citation list of the seed paper.
+                If omitted, the citations are placed before the known ones, as newly added citations are.
+        """
+        citing_ids = [citation.get("citingPaper", {}).get("paperId") for citation in citations]
+        self.add_papers(citation.get("citingPaper") for citation in citations)
+        now = time.time()
+        with self._lock, self._connection:
+            if position is None:
+                first = self._connection.execute(
+                    "SELECT COALESCE(MIN(position), 0) FROM citations WHERE seed_id = ?", (seed_id,)).fetchone()[0]
+                position = first - len(citing_ids)
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO citations VALUES (?, ?, ?, ?)",
+                [(seed_id, citing_id, position + i, now) for i, citing_id in enumerate(citing_ids) if citing_id],
+            )
+
+    def mark_complete(self, seed_id: str, since: float) -> None:
+        """
+        Record that the complete citation list of a seed paper was fetched, dropping edges not seen since then.
+
+        Args:
+            seed_id (str): The ID of the seed paper.
+            since (float): Time at which fetching the citation list started.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM citations WHERE seed_id = ? AND fetched < ?", (seed_id, since))
+            count = self._connection.execute(
+                "SELECT COUNT(*) FROM citations WHERE seed_id = ?", (seed_id,)).fetchone()[0]
+            self._connection.execute("INSERT OR REPLACE INTO seeds VALUES (?, ?, ?)", (seed_id, count, time.time()))
+
+    def citing_ids(self, seed_id: str, fresh_only: bool = True) -> Optional[List[str]]:
+        """
+        Get the IDs of the papers citing a seed paper, in the order the API listed them.
+
+        Args:
+            seed_id (str): The ID of the seed paper.
+            fresh_only (bool): Whether to ignore citation lists older than `max_age`.
+
+        Returns:
+            Optional[List[str]]: The citing paper IDs, or None if the complete citation list is not stored.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT fetched FROM seeds WHERE seed_id = ?", (seed_id,)).fetchone()
+            if row is None or (fresh_only and not self._is_fresh(row[0])):
+                return None
+            rows = self._connection.execute(
+                "SELECT citer_id FROM citations WHERE seed_id = ? ORDER BY position", (seed_id,))
+            return [citer_id for citer_id, in rows]
+
+    def get_citations(self, seed_id: str, fields: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the stored citations of a seed paper, if its complete citation list is fresh and all citing
+        papers have the requested fields.
+
+        Args:
+            seed_id (str): The ID of the seed paper.
+            fields (Optional[str]): Comma-separated list of fields required for each citing paper.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: The citations with a `citingPaper` entry, or None if they must be fetched.
+        """
+        citing_ids = self.citing_ids(seed_id)
+        if citing_ids is None:
+            return None
+        if fields in (None, "paperId"):
+            return [{"citingPaper": {"paperId": citing_id}} for citing_id in citing_ids]
+        papers = self.get_papers(citing_ids, fields)
+        if len(papers) < len(set(citing_ids)):
+            return None
+        return [{"citingPaper": papers[citing_id]} for citing_id in citing_ids]
+
+    def query_citations(self, seed_ids: List[str], cites_at_least_n: int = 0, cites_all: Optional[List[str]] = None,
+                        cites_none: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Answer a citation query from the store only, like `CitationExplorerAPI.get_citations_for_papers`.
+
+        Stored citation lists are used regardless of their age. Seed papers without a stored citation list
+        are reported and skipped.
+
+        Args:
+            seed_ids (List[str]): List of paper IDs to check citations for.
+            cites_at_least_n (int): Minimum number of papers from the list that a citing paper must reference.
+            cites_all (Optional[List[str]]): Papers from the list that a citing paper must all reference.
+            cites_none (Optional[List[str]]): Papers from the list that a citing paper must not reference.
+
+        Returns:
+            List[Dict[str, Any]]: The unique citing papers with all their stored fields, and the `citedSeeds`.
+        """
+        overlap = OverlapIndex(seed_ids)
+        for seed_id in overlap.seed_ids:
+            citing_ids = self.citing_ids(seed_id, fresh_only=False)
+            if citing_ids is None:
+                print(f"Warning: No citations of paper ID {seed_id} are stored. Fetch them once to include them.")
+                continue
+            for citing_id in citing_ids:
+                overlap.add(seed_id, citing_id)
+
+        selected_ids = overlap.select(at_least=cites_at_least_n, all_of=cites_all, none_of=cites_none)
+        papers = {}
+        with self._lock:
+            for start in range(0, len(selected_ids), self.CHUNK_SIZE):
+                for paper_id, (paper, _) in self._select_papers(selected_ids[start:start + self.CHUNK_SIZE]).items():
+                    papers[paper_id] = paper
+        return [
+            {"citingPaper": papers.get(citing_id, {"paperId": citing_id}), "citedSeeds": overlap.cited_seeds(citing_id)}
+            for citing_id in selected_ids
+        ]
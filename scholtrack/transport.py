@@ -0,0 +1,193 @@
+import random
+import threading
+import time
+from typing import Optional, Dict, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scholtrack.metrics import MetricsHook
+
+
+class RequestBudgetExceeded(RuntimeError):
+    """
+    Raised by `HttpTransport` when a request would exceed its `request_limit`.
+    """
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket limiting how many requests are sent per second.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initializes the rate limiter.
+
+        Args:
+            rate (float): Number of requests allowed per second. A non-positive rate disables the limiter.
+            burst (int): Maximum number of requests that may be sent at once after an idle period.
+        """
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Block until a request may be sent.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the token right away, so concurrent callers queue up behind each other
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HttpTransport:
+    """
+    A shared HTTP transport for the Semantic Scholar API.
+
+    Requests go through a pooled `requests.Session`, are spaced out by a token bucket rate limiter,
+    and are retried with exponential backoff and jitter when the API answers with 429 or a 5xx status.
+    """
+
+    # Default request rates in requests per second, with and without an API key
+    KEYED_RATE = 1.0
+    UNKEYED_RATE = 5.0
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, api_key: Optional[str] = None, rate: Optional[float] = None, max_retries: int = 6,
+                 backoff: float = 1.0, max_backoff: float = 60.0, pool_size: int = 16, timeout: float = 60.0,
+                 metrics: Optional[MetricsHook] = None):
+        """
+        Initializes the transport.
+
+        Args:
+            api_key (Optional[str]): Your Semantic Scholar API key, if available.
+            rate (Optional[float]): Requests per second. Defaults to `KEYED_RATE` or `UNKEYED_RATE`; 0 disables throttling.
+            max_retries (int): Maximum number of retries of a failed request.
+            backoff (float): Base delay of the exponential backoff, in seconds.
+            max_backoff (float): Maximum delay between two retries, in seconds.
+            pool_size (int): Number of connections kept alive in the pool.
+            timeout (float): Timeout of a single request, in seconds.
+            metrics (Optional[MetricsHook]): Hook receiving the timing and size of every request, and every retry.
+        """
+        if rate is None:
+            rate = self.KEYED_RATE if api_key else self.UNKEYED_RATE
+        self.limiter = RateLimiter(rate)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.metrics = metrics or MetricsHook()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if api_key:
+            self.session.headers["x-api-key"] = api_key
+
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0, "throttle_wait": 0.0}
+        # Total number of requests after which further requests raise RequestBudgetExceeded, e.g. set by a crawl
+        self.request_limit = None
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str, value: float = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += value
+
+    def _count_request(self, method: str, url: str) -> None:
+        # Checking and counting under one lock keeps concurrent requests from overshooting the limit
+        with self._stats_lock:
+            if self.request_limit is not None and self.stats["requests"] >= self.request_limit:
+                raise RequestBudgetExceeded(f"The budget of {self.request_limit} requests is spent, "
+                                            f"{method} {url} was not sent.")
+            self.stats["requests"] += 1
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        return delay
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Send a request, retrying on rate limiting, server errors and connection failures.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The request URL.
+            **kwargs: Additional arguments passed to `requests.Session.request`.
+
+        Returns:
+            requests.Response: The final response. Its status is not 200 if all retries failed.
+
+        Raises:
+            RequestBudgetExceeded: If the request, or one of its retries, would exceed `request_limit`.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            self._count_request(method, url)
+            self._count("throttle_wait", self.limiter.acquire())
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self.metrics.on_request(method, url, None, time.perf_counter() - start, 0)
+                if attempt >= self.max_retries:
+                    raise
+                response = None
+            else:
+                self.metrics.on_request(method, url, response.status_code, time.perf_counter() - start, len(response.content))
+                if response.status_code == 429:
+                    self._count("rate_limited")
+                if response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+
+            self.metrics.on_retry(method, url, attempt + 1, response.status_code if response is not None else None)
+            time.sleep(self._retry_delay(attempt, response))
+            self._count("retries")
+            attempt += 1
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Send a GET request. See `request`.
+        """
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Send a POST request. See `request`.
+        """
+        return self.request("POST", url, **kwargs)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Get the request statistics of the transport.
+
+        Returns:
+            Dict[str, Any]: The number of requests, retries and rate-limited responses, and the total
+            time spent waiting for the rate limiter.
+        """
+        with self._stats_lock:
+            return dict(self.stats)
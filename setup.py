@@ -16,6 +16,9 @@ setup(
         'requests',
         'tqdm',
     ],
+    extras_require={
+        'arrow': ['pyarrow'],
+    },
     entry_points={
         'console_scripts': [
         'scholtrack=scholtrack.cli:main',
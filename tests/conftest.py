@@ -0,0 +1,111 @@
+"""
+Shared fixtures of the ScholTrack tests, which run the client against the mock Semantic Scholar server
+of the benchmarks (benchmarks/mock_server.py) instead of the real API.
+"""
+import hashlib
+import os
+import sys
+from typing import List, Optional, Dict, Any
+
+import pytest
+import requests
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "benchmarks"))
+
+from mock_server import MockSemanticScholarServer, generate_dataset  # noqa: E402
+
+from scholtrack.api import CitationExplorerAPI  # noqa: E402
+from scholtrack.transport import HttpTransport  # noqa: E402
+
+
+def paper_id(name: str) -> str:
+    """
+    A Semantic Scholar-like paper ID, i.e. 40 hex characters, derived from a name.
+    """
+    return hashlib.sha1(name.encode("utf-8")).hexdigest()
+
+
+def make_paper(name: str, year: Optional[int] = 2020, publication_date: Optional[str] = "2020-06-15",
+               **fields: Any) -> Dict[str, Any]:
+    """
+    A citing paper of a hand-made dataset, with the fields the client asks for.
+    """
+    paper = {
+        "paperId": paper_id(name), "title": f"Paper {name}", "authors": [], "abstract": None,
+        "citationCount": 0, "year": year, "publicationDate": publication_date, "referenceCount": 0,
+        "influentialCitationCount": 0, "venue": "", "fieldsOfStudy": None, "url": None, "externalIds": {},
+    }
+    paper.update(fields)
+    return paper
+
+
+@pytest.fixture
+def mock_server():
+    """
+    Start mock servers for a dataset, given as a mapping of seed paper IDs to their citing papers, or
+    as a number of synthetic citing papers. The servers are stopped after the test.
+    """
+    servers = []
+
+    def start(dataset, **kwargs: Any) -> MockSemanticScholarServer:
+        if isinstance(dataset, int):
+            dataset = generate_dataset(dataset)
+        server = MockSemanticScholarServer(dataset, **kwargs).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+class FailingTransport(HttpTransport):
+    """
+    A transport answering the citation requests of the given offsets with a server error once, without retrying.
+    """
+
+    def __init__(self, fail_offsets: List[int], paper_ids: Optional[List[str]] = None):
+        super().__init__(rate=0, max_retries=0)
+        self.fail_offsets = set(fail_offsets)
+        self.paper_ids = paper_ids
+        self.failures = 0
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        offset = kwargs.get("params", {}).get("offset")
+        targeted = self.paper_ids is None or any(f"/{paper_id}/" in url for paper_id in self.paper_ids)
+        if url.endswith("/citations") and targeted and offset in self.fail_offsets:
+            self.fail_offsets.discard(offset)
+            self.failures += 1
+            response = requests.Response()
+            response.status_code = 500
+            response._content = b'{"message": "Internal Server Error"}'
+            return response
+        return super().request(method, url, **kwargs)
+
+
+def make_client(server: MockSemanticScholarServer, max_retries: int = 2, **kwargs: Any) -> CitationExplorerAPI:
+    """
+    A client of a mock server, without throttling and with short retry delays.
+    """
+    transport = kwargs.pop("transport", None) or HttpTransport(rate=0, max_retries=max_retries, backoff=0.01)
+    kwargs.setdefault("max_workers", 4)
+    return CitationExplorerAPI(base_url=server.base_url, transport=transport, **kwargs)
+
+
+def run_cli(monkeypatch, *argv: str) -> None:
+    """
+    Run the `scholtrack` command with the given arguments. Raises SystemExit if it exits early, e.g. on a usage error.
+    """
+    from scholtrack.cli import main
+
+    monkeypatch.setattr(sys, "argv", ["scholtrack", *argv])
+    main()
+
+
+def citing_ids(citations: List[Dict[str, Any]]) -> List[str]:
+    """
+    The IDs of the citing papers of a list of citations, in order.
+    """
+    return [citation["citingPaper"]["paperId"] for citation in citations]
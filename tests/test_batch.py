@@ -0,0 +1,46 @@
+import pytest
+
+from scholtrack.batch import BatchJob, BatchRunner
+from scholtrack.exporter import CitationExporter
+from scholtrack.query import CitationIndex
+from scholtrack.records import PaperRecord
+
+from conftest import make_client, make_paper, paper_id
+
+SEEDS = [paper_id(f"seed-{i}") for i in range(3)]
+
+
+def dataset():
+    papers = [make_paper(f"citer-{i}", year=2015 + i % 10, publication_date=f"{2015 + i % 10}-03-01",
+                         citationCount=i * 7 % 101, venue="CVPR" if i % 3 else "ICCV") for i in range(60)]
+    # Every seed paper is cited by an overlapping slice of the citing papers
+    return {SEEDS[0]: papers[:30], SEEDS[1]: papers[20:50], SEEDS[2]: papers[10:20] + papers[45:]}
+
+
+def job_settings():
+    return [
+        dict(name="overlap", paper_ids=SEEDS[:2], cites_at_least_n=2),
+        dict(name="excluding", paper_ids=SEEDS, cites_none=[SEEDS[2]], sort_by="year"),
+        dict(name="filtered", paper_ids=SEEDS[1:], filters={"min_year": 2020, "venues": ["CVPR"]}),
+    ]
+
+
+@pytest.mark.parametrize("hydrate", [True, False])
+def test_batch_output_matches_separate_runs(mock_server, tmp_path, hydrate):
+    server = mock_server(dataset())
+
+    jobs = [BatchJob(sinks=[("csv", str(tmp_path / f"batch-{settings['name']}.csv"))], **settings)
+            for settings in job_settings()]
+    counts = BatchRunner(make_client(server), hydrate=hydrate).run(jobs)
+
+    for settings in job_settings():
+        filters = settings.get("filters", {})
+        citations = make_client(server).get_citations_for_papers(
+            settings["paper_ids"], cites_at_least_n=settings.get("cites_at_least_n", 0),
+            cites_none=settings.get("cites_none"), hydrate=hydrate, min_year=filters.get("min_year"))
+        records = CitationIndex.filter(PaperRecord.from_citations(citations), **filters)
+        separate_file = tmp_path / f"separate-{settings['name']}.csv"
+        CitationExporter.export(records, [("csv", str(separate_file))], sort_by=settings.get("sort_by", "citations"))
+
+        assert counts[settings["name"]] == len(records) > 0
+        assert (tmp_path / f"batch-{settings['name']}.csv").read_text() == separate_file.read_text()
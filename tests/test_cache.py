@@ -0,0 +1,62 @@
+import os
+import time
+
+from scholtrack.cache import ResponseCache
+
+from conftest import make_client, make_paper, paper_id
+
+SEED_ID = paper_id("seed")
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=0.2)
+    key = ResponseCache.make_key("citations", SEED_ID, 0)
+    cache.set(key, {"data": []})
+    assert cache.get(key) == {"data": []}
+
+    time.sleep(0.3)
+    assert cache.get(key) is None
+    assert list(cache._iter_files()) == []
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path):
+    value = os.urandom(2000).hex()  # Random, so that every entry compresses to about the same size
+    probe = ResponseCache(str(tmp_path / "probe"))
+    probe.set("probe", value)
+    entry_size = probe._size
+
+    # Room for three entries, down to 3.15 entries after an eviction
+    cache = ResponseCache(str(tmp_path / "cache"), max_size_mb=3.5 * entry_size / 1024 / 1024)
+    keys = [ResponseCache.make_key(name) for name in "abcd"]
+    now = time.time()
+    for age, key in zip([30, 20, 10], keys):
+        cache.set(key, value)
+        os.utime(cache._path(key), (now - age, now - age))
+    assert cache.get(keys[0]) == value  # Now the most recently used
+
+    cache.set(keys[3], value)
+
+    assert [os.path.exists(cache._path(key)) for key in keys] == [True, False, True, True]
+
+
+def test_repeated_run_makes_no_requests(mock_server, tmp_path):
+    server = mock_server(2000)
+    seed_ids = list(server.dataset)
+
+    first = make_client(server, cache=ResponseCache(str(tmp_path)))
+    citations = first.get_citations_for_papers(seed_ids)
+    assert first.transport.summary()["requests"] > 0
+
+    repeated = make_client(server, cache=ResponseCache(str(tmp_path)))
+    assert repeated.get_citations_for_papers(seed_ids) == citations
+    assert repeated.transport.summary()["requests"] == 0
+
+
+def test_responses_of_different_api_urls_are_kept_apart(mock_server, tmp_path):
+    fixture = mock_server({SEED_ID: [make_paper("fixture citer")]})
+    other = mock_server({SEED_ID: [make_paper("other citer")]})
+
+    make_client(fixture, cache=ResponseCache(str(tmp_path))).get_citations(SEED_ID)
+    citations = make_client(other, cache=ResponseCache(str(tmp_path))).get_citations(SEED_ID)
+
+    assert [citation["citingPaper"]["paperId"] for citation in citations] == [paper_id("other citer")]
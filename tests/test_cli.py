@@ -0,0 +1,19 @@
+import pytest
+
+from scholtrack import cli
+from scholtrack.exporter import CitationExporter
+from scholtrack.transport import HttpTransport
+
+from conftest import run_cli
+
+
+def test_startup_constants_match_their_sources():
+    assert cli.OUTPUT_TYPES == CitationExporter.OUTPUT_TYPES
+    assert (cli.KEYED_RATE, cli.UNKEYED_RATE) == (HttpTransport.KEYED_RATE, HttpTransport.UNKEYED_RATE)
+
+
+def test_subcommands_are_listed_in_the_main_help(monkeypatch, capsys):
+    with pytest.raises(SystemExit):
+        run_cli(monkeypatch, "--help")
+    output = capsys.readouterr().out
+    assert "scholtrack query" in output and "scholtrack batch" in output
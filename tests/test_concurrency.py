@@ -0,0 +1,19 @@
+import pytest
+
+from scholtrack.records import PaperRecord
+
+from conftest import make_client
+
+
+@pytest.mark.parametrize("criteria", [{}, {"cites_at_least_n": 2}], ids=["all", "overlap"])
+def test_concurrent_fetch_matches_sequential_fetch(mock_server, criteria):
+    # Latency makes the seed papers finish out of order when fetched concurrently
+    server = mock_server(3000, latency=0.002)
+    seed_ids = list(server.dataset)
+
+    sequential = make_client(server, max_workers=1).get_citations_for_papers(seed_ids, **criteria)
+    concurrent = make_client(server, max_workers=4).get_citations_for_papers(seed_ids, **criteria)
+
+    assert len(sequential) > 0
+    assert [record.to_citation() for record in PaperRecord.from_citations(concurrent)] == \
+        [record.to_citation() for record in PaperRecord.from_citations(sequential)]
@@ -0,0 +1,40 @@
+from conftest import make_client, make_paper, paper_id
+
+from scholtrack.crawler import CitationCrawler
+
+
+def paper(name, citation_count):
+    return make_paper(name, citationCount=citation_count)
+
+
+def test_crawl_stops_within_the_request_budget(mock_server):
+    seed_id = paper_id("S")
+    server = mock_server({seed_id: [paper(f"citer-{i}", 0) for i in range(5000)]})
+    crawler = CitationCrawler(make_client(server), max_hops=2, max_requests=3, max_workers=1)
+
+    results = crawler.crawl([seed_id])
+
+    # A single paper needs 5 pages, but only 3 requests may be sent
+    assert crawler.requests_used == 3
+    assert len(results) == 3000
+    # The seed paper goes back to the frontier, ahead of its 3,000 citers found so far
+    assert len(crawler.frontier) == 3001
+    assert crawler.frontier[0][2] == seed_id
+
+
+def test_crawl_reexpands_papers_reached_over_shorter_paths(mock_server):
+    # S is cited by A and B; A leads to D in three hops (A -> C -> D), B in two (B -> D)
+    dataset = {
+        paper_id("S"): [paper("A", 100), paper("B", 1), paper("X", 0)],
+        paper_id("A"): [paper("C", 50), paper("X", 0)],
+        paper_id("B"): [paper("D", 10)],
+        paper_id("C"): [paper("D", 10)],
+        paper_id("D"): [paper("E", 0)],
+    }
+    crawler = CitationCrawler(make_client(mock_server(dataset)), max_hops=4, min_citation_count=[1, 0], max_workers=1)
+
+    results = crawler.crawl([paper_id("S")])
+
+    hops = {result["citingPaper"]["title"]: result["hop"] for result in results}
+    # X fails the citation threshold of hop 1, but passes the one of hop 2
+    assert hops == {"Paper A": 1, "Paper B": 1, "Paper C": 2, "Paper X": 2, "Paper D": 2, "Paper E": 3}
@@ -0,0 +1,59 @@
+from scholtrack.dedup import Deduplicator, deduplicate
+from scholtrack.overlap import OverlapIndex
+from scholtrack.records import PaperRecord
+
+from conftest import make_client, make_paper, paper_id
+
+SEEDS = [paper_id("first seed"), paper_id("second seed")]
+TITLE = "Fast Radiance Field Rendering with Gaussians"
+AUTHORS = [{"authorId": "1", "name": "Ada Lovelace"}, {"authorId": "2", "name": "Alan Turing"}]
+
+
+def record(name, seeds=(), **fields):
+    return PaperRecord.from_citation({"citingPaper": make_paper(name, **fields), "citedSeeds": list(seeds)})
+
+
+def test_preprint_and_published_version_are_merged():
+    preprint = record("preprint", [SEEDS[1]], title=TITLE.upper() + ".", authors=AUTHORS, venue="arXiv.org",
+                      citationCount=3, externalIds={"ArXiv": "2301.00001v2"})
+    other = record("other", [SEEDS[0]], title="Something Else Entirely Here")
+    published = record("published", [SEEDS[0]], title=TITLE, authors=AUTHORS[:1], venue="CVPR", citationCount=10,
+                       externalIds={"DOI": "10.1109/CVPR.2023.1"})
+
+    merged = deduplicate([preprint, other, published], seed_ids=SEEDS)
+
+    assert [paper.paper_id for paper in merged] == [published.paper_id, other.paper_id]
+    assert merged[0].venue == "CVPR"
+    assert merged[0].arxiv_id == "2301.00001v2"
+    assert merged[0].cited_seeds == tuple(SEEDS)
+    assert merged[0].extra["duplicateIds"] == [preprint.paper_id]
+
+
+def test_papers_are_merged_by_arxiv_doi_despite_different_titles():
+    preprint = record("preprint", title="A Draft Title", externalIds={"ArXiv": "2301.00001"})
+    published = record("published", title="The Final Title", externalIds={"DOI": "10.48550/arXiv.2301.00001"})
+
+    assert Deduplicator().find_groups([preprint, published]) == [[0, 1]]
+
+
+def test_same_title_by_other_authors_or_years_is_kept_apart():
+    first = record("first", title=TITLE, authors=AUTHORS[:1])
+    other_authors = record("other authors", title=TITLE, authors=[{"authorId": "3", "name": "Grace Hopper"}])
+    much_later = record("much later", title=TITLE, year=2030, publication_date="2030-01-01")
+    short = [record(name, title="Editorial") for name in ("editorial 1", "editorial 2")]
+
+    assert Deduplicator().find_groups([first, other_authors, much_later] + short) == []
+
+
+def test_merged_papers_count_toward_the_overlap(mock_server):
+    preprint = make_paper("preprint", title=TITLE, authors=AUTHORS, venue="arXiv.org")
+    published = make_paper("published", title=TITLE, authors=AUTHORS, venue="CVPR")
+    server = mock_server({SEEDS[0]: [preprint, make_paper("a")], SEEDS[1]: [published, make_paper("b")]})
+    client = make_client(server)
+
+    records = PaperRecord.from_citations(client.get_citations_for_papers(SEEDS, hydrate=False))
+    assert OverlapIndex.filter(records, SEEDS, at_least=2) == []
+
+    merged = OverlapIndex.filter(deduplicate(records, SEEDS), SEEDS, at_least=2)
+    assert [paper.paper_id for paper in merged] == [published["paperId"]]
+    assert merged[0].cited_seeds == tuple(SEEDS)
@@ -0,0 +1,46 @@
+import pytest
+
+from scholtrack.exporter import CitationExporter
+from scholtrack.metrics import MetricsHook
+from scholtrack.records import PaperRecord
+
+from conftest import make_paper
+
+CITATIONS = [{"citingPaper": make_paper(f"paper-{i}", year=2010 + i * 7 % 15, citationCount=i * 37 % 100,
+                                        abstract=f"Abstract {i}")}
+             for i in range(200)]
+
+
+class CountingSorts(MetricsHook):
+    def __init__(self):
+        self.sorts = 0
+
+    def on_stage(self, name, elapsed):
+        self.sorts += name == "sort"
+
+
+@pytest.mark.parametrize("sort_by", ["citations", "year"])
+def test_one_export_matches_separate_saves(tmp_path, sort_by):
+    sinks = [(output_type, str(tmp_path / f"export.{output_type}")) for output_type in ("csv", "txt", "json", "jsonl")]
+    metrics = CountingSorts()
+
+    CitationExporter.export(CITATIONS, sinks, sort_by=sort_by, show_abstract=True, metrics=metrics)
+
+    records = PaperRecord.from_citations(CITATIONS)
+    CitationExporter.save_to_csv(records, str(tmp_path / "separate.csv"), sort_by=sort_by)
+    CitationExporter.save_to_txt(records, str(tmp_path / "separate.txt"), sort_by=sort_by, show_abstract=True)
+    CitationExporter.save_to_json(records, str(tmp_path / "separate.json"))
+    CitationExporter.stream_to_jsonl(records, str(tmp_path / "separate.jsonl"))
+    for output_type in ("csv", "txt", "json", "jsonl"):
+        assert (tmp_path / f"export.{output_type}").read_text() == (tmp_path / f"separate.{output_type}").read_text()
+    assert metrics.sorts == 1
+
+
+def test_display_only_selects_the_top_papers(capsys):
+    CitationExporter.export(CITATIONS, [("stdout", None)], display_limit=5)
+    displayed = capsys.readouterr().out
+
+    CitationExporter._print_citations(CitationExporter.sort_citations(PaperRecord.from_citations(CITATIONS),
+                                                                      "citations")[:5], len(CITATIONS))
+    assert displayed == capsys.readouterr().out
+    assert "Showing top 5 out of 200 citations" in displayed
@@ -0,0 +1,52 @@
+import sqlite3
+
+import pytest
+
+from scholtrack.exporter import CitationExporter
+from scholtrack.records import PaperRecord
+
+from conftest import make_paper, paper_id
+
+SEEDS = [paper_id(f"seed-{i}") for i in range(3)]
+CITATIONS = [
+    {"citingPaper": make_paper(f"paper-{i}", year=2018 + i % 6, citationCount=i * 13 % 50,
+                               externalIds={"DOI": f"10.1/{i}"}, fieldsOfStudy=["Computer Science"]),
+     "citedSeeds": SEEDS[:1 + i % 3]}
+    for i in range(30)
+]
+
+
+def test_sqlite_export_links_papers_to_their_seeds(tmp_path):
+    filename = str(tmp_path / "citations.sqlite")
+    CitationExporter.save_to_sqlite(CITATIONS, filename)
+    CitationExporter.save_to_sqlite(CITATIONS[:5], filename)  # Replaces the previous database
+
+    connection = sqlite3.connect(filename)
+    try:
+        assert connection.execute("SELECT COUNT(*) FROM papers").fetchone() == (5,)
+        rows = connection.execute("SELECT paper_id, seed_count, doi FROM papers WHERE seed_count >= 2 "
+                                  "ORDER BY paper_id").fetchall()
+        assert rows == sorted((paper_id(f"paper-{i}"), 1 + i % 3, f"10.1/{i}") for i in range(5) if i % 3)
+        links = connection.execute("SELECT seed_id, paper_id FROM seed_citation").fetchall()
+        assert sorted(links) == sorted((seed_id, citation["citingPaper"]["paperId"])
+                                       for citation in CITATIONS[:5] for seed_id in citation["citedSeeds"])
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize("output_type", ["parquet", "arrow"])
+def test_columnar_exports_hold_the_sorted_columns(tmp_path, output_type):
+    pytest.importorskip("pyarrow")
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    filename = str(tmp_path / f"citations.{output_type}")
+    if output_type == "parquet":
+        CitationExporter.save_to_parquet(CITATIONS, filename, sort_by="year")
+        table = pq.read_table(filename)
+    else:
+        CitationExporter.save_to_arrow(CITATIONS, filename, sort_by="year")
+        table = feather.read_table(filename)
+
+    expected = CitationExporter.columns(CitationExporter.sort_citations(PaperRecord.from_citations(CITATIONS), "year"))
+    assert table.to_pydict() == expected
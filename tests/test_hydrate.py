@@ -0,0 +1,59 @@
+import glob
+import os
+
+import requests
+
+from scholtrack.cache import ResponseCache
+from scholtrack.transport import HttpTransport
+
+from conftest import make_client, make_paper, paper_id
+
+SEED_ID = paper_id("seed")
+
+
+class FailingBatchTransport(HttpTransport):
+    """
+    A transport answering every batch request with a server error, without retrying.
+    """
+
+    def __init__(self):
+        super().__init__(rate=0, max_retries=0)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        if url.endswith("/batch"):
+            response = requests.Response()
+            response.status_code = 500
+            response._content = b'{"message": "Internal Server Error"}'
+            return response
+        return super().request(method, url, **kwargs)
+
+
+def test_hydration_cache_survives_new_papers(mock_server, tmp_path):
+    citers = [make_paper(f"citer-{i}") for i in range(1201)]
+    server = mock_server({SEED_ID: citers})
+    ids = [paper["paperId"] for paper in citers]
+
+    client = make_client(server, cache=ResponseCache(str(tmp_path)))
+    assert [paper["paperId"] for paper in client.get_papers_batch(ids[1:])] == ids[1:]
+    assert len(glob.glob(os.path.join(str(tmp_path), "*", "*.json.gz"))) <= client.PAPER_CACHE_SHARDS
+
+    # A new citing paper only requests itself, the others are still served from the cache
+    warm = make_client(server, cache=ResponseCache(str(tmp_path)))
+    assert [paper["paperId"] for paper in warm.get_papers_batch(ids[::-1])] == ids[::-1]
+    assert warm.transport.summary()["requests"] == 1
+
+
+def test_failed_hydration_marks_the_seed_incomplete(mock_server, capsys):
+    other_seed = paper_id("other seed")
+    server = mock_server({SEED_ID: [make_paper("a"), make_paper("b")], other_seed: [make_paper("c")]})
+    client = make_client(server, transport=FailingBatchTransport())
+
+    citations = client.get_citations_for_papers([SEED_ID, other_seed])
+
+    assert [citation["citingPaper"] for citation in citations] == \
+        [{"paperId": paper_id(name)} for name in "abc"]
+    assert client.incomplete_seeds == {
+        SEED_ID: "the details of 2 of its citing papers could not be fetched",
+        other_seed: "the details of 1 of its citing papers could not be fetched",
+    }
+    assert "The details of 3 papers could not be fetched" in capsys.readouterr().out
@@ -0,0 +1,30 @@
+from importlib.resources import files
+
+from scholtrack.api import CitationExplorerAPI
+from scholtrack.cli import load_collection_file
+from scholtrack.ids import parse_paper_ids
+
+
+def test_collections_only_hold_paper_ids(capsys):
+    for collection_file in files("scholtrack").joinpath("collections").iterdir():
+        if collection_file.name.endswith(".txt"):
+            assert load_collection_file(collection_file.name[:-len(".txt")])
+    assert "Warning" not in capsys.readouterr().out
+
+
+def test_file_and_collection_paths_share_the_parser(tmp_path, capsys):
+    lines = [
+        "# Seed papers",
+        "2cc1d857e86d5152ba7fe6a8355c2a0150cc280a  # NeRF",
+        "",
+        "DOI:10.1145/3592433",
+        "arXiv:2308.04079",
+        "https://www.semanticscholar.org/paper/2cc1d857",
+    ]
+    path = tmp_path / "papers.txt"
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+    expected = ["2cc1d857e86d5152ba7fe6a8355c2a0150cc280a", "DOI:10.1145/3592433", "arXiv:2308.04079"]
+    assert parse_paper_ids(lines) == expected
+    assert CitationExplorerAPI.parse_paper_ids_from_file(str(path)) == expected
+    assert f"line 6 of {path}" in capsys.readouterr().out
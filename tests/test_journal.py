@@ -0,0 +1,109 @@
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import FailingTransport, citing_ids, make_client, make_paper, paper_id, run_cli
+
+from scholtrack import journal as journal_module
+from scholtrack.journal import FetchJournal
+
+SEED_IDS = [paper_id(f"seed-{i}") for i in range(3)]
+
+
+@pytest.fixture
+def server(mock_server):
+    return mock_server({seed_id: [make_paper(f"{seed_id}-{i}") for i in range(2500)] for seed_id in SEED_IDS})
+
+
+def test_resume_fetches_only_the_missing_seed_papers(server, tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    expected = make_client(server).get_citations_for_papers(SEED_IDS, hydrate=False)
+
+    # The second seed paper fails halfway, so it is reported and left out of the journal
+    failing = make_client(server, transport=FailingTransport([1000], paper_ids=[SEED_IDS[1]]),
+                          journal=FetchJournal(path))
+    partial = failing.get_citations_for_papers(SEED_IDS, hydrate=False)
+    failing.journal.close()
+    assert list(failing.incomplete_seeds) == [SEED_IDS[1]]
+    assert len(partial) == 5000 + 1000
+
+    journal = FetchJournal(path, resume=True)
+    assert len(journal) == 2
+    resumed = make_client(server, journal=journal)
+    citations = resumed.get_citations_for_papers(SEED_IDS, hydrate=False)
+    assert resumed.incomplete_seeds == {}
+    # Only the citation pages of the failed seed paper are fetched again
+    assert resumed.transport.summary()["requests"] == 3
+    assert citing_ids(citations) == citing_ids(expected)
+
+
+def test_journal_ignores_a_truncated_last_line(server, tmp_path):
+    path = tmp_path / "journal.jsonl"
+    client = make_client(server, journal=FetchJournal(str(path)))
+    client.get_citations(SEED_IDS[0], limit=1000, fields="paperId")
+    client.journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"paper_id": "')
+
+    journal = FetchJournal(str(path), resume=True)
+    assert len(journal) == 1
+    journal.append(SEED_IDS[1], "paperId", [])
+    journal.close()
+    assert len(FetchJournal(str(path), resume=True)) == 2
+
+
+def test_existing_journal_is_not_emptied_without_resume(server, tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    client = make_client(server, journal=FetchJournal(path))
+    client.get_citations(SEED_IDS[0], limit=1000, fields="paperId")
+    client.journal.close()
+
+    with pytest.raises(FileExistsError):
+        FetchJournal(path)
+    assert len(FetchJournal(path, resume=True)) == 1
+
+
+def test_seed_paper_with_unreachable_citations_is_not_journaled(mock_server, tmp_path):
+    # Papers without an exact date cannot be reached once their year has to be fetched month by month
+    seed_id = paper_id("mega-cited seed")
+    citers = [make_paper(f"citer-{i}", publication_date=None if i % 10 == 0 else "2020-03-15") for i in range(12000)]
+    client = make_client(mock_server({seed_id: citers}), journal=FetchJournal(str(tmp_path / "journal.jsonl")))
+
+    client.get_citations(seed_id, limit=1000, fields="paperId")
+
+    assert seed_id in client.incomplete_seeds
+    assert len(client.journal) == 0
+
+
+def test_stale_journal_is_started_over_and_its_entries_are_not_resumed(server, tmp_path, monkeypatch):
+    path = str(tmp_path / "journal.jsonl")
+    client = make_client(server, journal=FetchJournal(path))
+    client.get_citations(SEED_IDS[0], limit=1000, fields="paperId")
+    client.journal.close()
+    an_hour_later = time.time() + 3600
+    monkeypatch.setattr(journal_module, "time", SimpleNamespace(time=lambda: an_hour_later))
+
+    assert len(FetchJournal(path, resume=True, max_age=60)) == 0
+    assert len(FetchJournal(path, resume=True)) == 1
+    FetchJournal(path, max_age=60).close()
+    assert os.path.getsize(path) == 0
+
+
+def test_finished_run_with_an_incomplete_seed_removes_its_journal(server, tmp_path, monkeypatch, capsys):
+    # The unknown paper ID stays incomplete on every run, so it must not keep the journal alive
+    journal = str(tmp_path / "journal.jsonl")
+    argv = ["--api-url", server.base_url, "-p", SEED_IDS[0], paper_id("unknown"), "-o", str(tmp_path / "out.csv"),
+            "--no-cache", "--journal", journal, "-q"]
+
+    run_cli(monkeypatch, *argv)
+    assert not os.path.exists(journal)
+    with open(str(tmp_path / "journal.incomplete.json"), encoding="utf-8") as f:
+        assert list(json.load(f)["incomplete_seeds"]) == [paper_id("unknown")]
+
+    # A plain rerun neither stops on the journal nor serves the seed papers from it
+    run_cli(monkeypatch, *argv)
+    assert not os.path.exists(journal)
+    assert "Resuming" not in capsys.readouterr().out
@@ -0,0 +1,45 @@
+import json
+import pstats
+
+from scholtrack.cache import ResponseCache
+from scholtrack.metrics import RunMetrics
+
+from conftest import make_client, make_paper, paper_id, run_cli
+
+SEED_ID = paper_id("seed")
+
+
+def test_run_metrics_count_requests_pages_and_cache_hits(mock_server, tmp_path):
+    server = mock_server({SEED_ID: [make_paper(f"citer-{i}") for i in range(250)]}, error_rate=0.45)
+    summaries = []
+    for _ in range(2):  # The second run reads every page from the cache
+        metrics = RunMetrics()
+        client = make_client(server, max_retries=10, metrics=metrics, cache=ResponseCache(str(tmp_path)))
+        client.transport.metrics = metrics
+        with metrics.stage("fetch"):
+            assert len(client.get_citations(SEED_ID, limit=100)) == 250
+        summaries.append(metrics.summary())
+    fetched, cached = summaries
+
+    assert fetched["requests"]["count"] == fetched["requests"]["statuses"]["200"] + fetched["requests"]["retries"]
+    assert fetched["requests"]["statuses"]["429"] == fetched["requests"]["retries"] > 0
+    assert fetched["pages"] == {"count": 3, "cached": 0, "seeds": 0, "max_per_paper": 3, "per_paper": {SEED_ID: 3}}
+    assert fetched["cache"] == {"hits": 0, "misses": 3}
+    assert cached["pages"]["count"] == cached["pages"]["cached"] == 3
+    assert cached["cache"] == {"hits": 3, "misses": 0}
+    assert cached["requests"]["count"] == 0
+    assert list(cached["stages"]) == ["fetch"]
+
+def test_cli_prints_stats_and_saves_a_profile(mock_server, tmp_path, monkeypatch, capsys):
+    server = mock_server({SEED_ID: [make_paper(f"citer-{i}") for i in range(250)]})
+    profile = str(tmp_path / "run.prof")
+
+    run_cli(monkeypatch, "--api-url", server.base_url, "-p", SEED_ID, "-o", str(tmp_path / "out.csv"),
+            "--no-cache", "--no-journal", "--stats", "json", "--profile", profile)
+
+    output = capsys.readouterr().out
+    summary = json.loads(output[output.rindex("\n{\n") + 1:])
+    assert summary["pages"]["seeds"] == 1
+    assert summary["requests"]["count"] == summary["requests"]["statuses"]["200"] > 0
+    assert {"fetch", "export"} <= set(summary["stages"])
+    assert pstats.Stats(profile).total_calls > 0
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from scholtrack.exporter import CitationExporter
+from scholtrack.overlap import OverlapIndex
+
+from conftest import make_client, make_paper, paper_id
+
+# More seed papers than bits in a machine word
+SEEDS = [paper_id(f"seed-{i}") for i in range(70)]
+
+
+def random_citations(rng):
+    return {f"citer-{i}": set(rng.sample(SEEDS, rng.randint(1, 5))) for i in range(500)}
+
+
+def test_select_matches_set_queries():
+    rng = random.Random(0)
+    cited = random_citations(rng)
+    index = OverlapIndex(SEEDS + SEEDS[:3])  # Duplicate seed papers are ignored
+    for citer, seeds in cited.items():
+        for seed_id in rng.sample(sorted(seeds), len(seeds)):
+            index.add(seed_id, citer)
+
+    all_of, none_of = {SEEDS[0], SEEDS[69]}, {SEEDS[5]}
+    for at_least in (0, 2, 4):
+        assert index.select(at_least=at_least) == [citer for citer, seeds in cited.items() if len(seeds) >= at_least]
+    assert index.select(all_of=[SEEDS[69]], none_of=none_of) == \
+        [citer for citer, seeds in cited.items() if SEEDS[69] in seeds and not seeds & none_of]
+    assert index.select(at_least=3, all_of=all_of) == \
+        [citer for citer, seeds in cited.items() if len(seeds) >= 3 and all_of <= seeds]
+    assert all(index.cited_seeds(citer) == [seed_id for seed_id in SEEDS if seed_id in seeds]
+               for citer, seeds in cited.items())
+    with pytest.raises(KeyError):
+        index.select(all_of=[paper_id("not a seed")])
+
+
+def test_overlap_queries_against_the_mock_server(mock_server):
+    seeds = SEEDS[:3]
+    papers = {name: make_paper(name, citationCount=count) for name, count in
+              [("ab", 5), ("abc", 1), ("a", 9), ("bc", 7), ("c", 3)]}
+    server = mock_server({seed_id: [paper for name, paper in papers.items() if letter in name]
+                          for seed_id, letter in zip(seeds, "abc")})
+    client = make_client(server)
+
+    def names(citations):
+        return [citation["citingPaper"]["title"][len("Paper "):] for citation in citations]
+
+    assert names(client.get_citations_for_papers(seeds, cites_at_least_n=2)) == ["ab", "abc", "bc"]
+    assert names(client.get_citations_for_papers(seeds, cites_all=[seeds[1]], cites_none=[seeds[0]])) == ["bc"]
+    ranked = CitationExporter.sort_citations(client.get_citations_for_papers(seeds), "overlap")
+    assert [record.title[len("Paper "):] for record in ranked] == ["abc", "bc", "ab", "a", "c"]
@@ -0,0 +1,40 @@
+from conftest import citing_ids, make_client, make_paper, paper_id
+
+SEED_ID = paper_id("mega-cited seed")
+N_CITERS = 12000
+
+
+def test_partitioned_fetch_finds_every_dated_citation(mock_server):
+    citers = [make_paper(f"citer-{i}", publication_date=f"2020-{i % 12 + 1:02d}-{i % 28 + 1:02d}")
+              for i in range(N_CITERS)]
+    client = make_client(mock_server({SEED_ID: citers}))
+
+    citations = client.get_citations(SEED_ID, limit=1000, fields="paperId")
+
+    assert sorted(citing_ids(citations)) == sorted(paper["paperId"] for paper in citers)
+    assert client.incomplete_seeds == {}
+
+
+def test_partitioned_fetch_reports_papers_lost_to_month_slices(mock_server):
+    # Every tenth paper only has a year; once 2020 is split into months, those past the first 9,999 are unreachable
+    citers = [make_paper(f"citer-{i}", publication_date=None if i % 10 == 0 else f"2020-{i % 12 + 1:02d}-15")
+              for i in range(N_CITERS)]
+    client = make_client(mock_server({SEED_ID: citers}))
+
+    citations = client.get_citations(SEED_ID, limit=1000, fields="paperId")
+
+    unreachable = {paper["paperId"] for paper in citers[client.MAX_CITATIONS:] if paper["publicationDate"] is None}
+    assert set(citing_ids(citations)) == {paper["paperId"] for paper in citers} - unreachable
+    assert SEED_ID in client.incomplete_seeds
+    assert f"{len(unreachable)} of its {N_CITERS} citations" in client.incomplete_seeds[SEED_ID]
+    assert "2020" in client.incomplete_seeds[SEED_ID]
+
+
+def test_partitioned_fetch_with_min_year_reports_split_years(mock_server):
+    citers = [make_paper(f"citer-{i}", publication_date=None if i % 10 == 0 else f"2020-{i % 12 + 1:02d}-15")
+              for i in range(N_CITERS)]
+    client = make_client(mock_server({SEED_ID: citers}))
+
+    client.get_citations(SEED_ID, limit=1000, fields="paperId", min_year=2019)
+
+    assert "unknown number" in client.incomplete_seeds[SEED_ID]
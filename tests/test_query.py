@@ -0,0 +1,24 @@
+from scholtrack.query import CitationIndex
+from scholtrack.records import PaperRecord
+
+from conftest import make_paper
+
+RECORDS = [
+    PaperRecord.from_citation({"citingPaper": make_paper("a", year=2019, citationCount=5, venue="CVPR",
+                                                    abstract="Gaussian splatting")}),
+    PaperRecord.from_citation({"citingPaper": make_paper("b", year=2023, citationCount=50, venue="ICCV",
+                                                    abstract="Neural radiance fields")}),
+    PaperRecord.from_citation({"citingPaper": make_paper("c", year=2024, citationCount=1, venue="CVPR",
+                                                    abstract="Gaussians everywhere")}),
+]
+
+
+def test_select_only_builds_the_indexes_of_its_criteria():
+    index = CitationIndex(RECORDS)
+
+    assert [record.paper_id for record in index.select(min_year=2020, min_citations=2)] == [RECORDS[1].paper_id]
+    assert "token_index" not in vars(index) and "venue_index" not in vars(index)
+
+    assert [record.paper_id for record in index.select(venues=["cvpr"], keywords=["gaussian*"])] == \
+        [RECORDS[0].paper_id, RECORDS[2].paper_id]
+    assert "token_index" in vars(index) and "field_index" not in vars(index)
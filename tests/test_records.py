@@ -0,0 +1,41 @@
+from scholtrack.exporter import CitationExporter
+from scholtrack.records import PaperRecord
+
+from conftest import make_paper, paper_id
+
+SEED_ID = paper_id("seed")
+
+
+def citation(name, **fields):
+    paper = make_paper(name, **fields)
+    del paper["publicationDate"]  # Not one of the fields the client asks for
+    return {"citingPaper": paper, "citedSeeds": [SEED_ID], "hop": 2}
+
+
+def test_records_convert_back_to_the_api_format():
+    original = citation("a", authors=[{"authorId": "1", "name": "Ada Lovelace"}], venue="CVPR",
+                        fieldsOfStudy=["Computer Science"], externalIds={"ArXiv": "2301.00001"})
+
+    record = PaperRecord.from_citation(original)
+
+    assert record.to_citation() == original
+    assert record.extra == {"hop": 2}
+    assert record.arxiv_url == "https://arxiv.org/abs/2301.00001"
+    assert record.author_names == "Ada Lovelace"
+
+
+def test_repeated_strings_are_shared():
+    first, second = PaperRecord.from_citations([citation("a", venue="".join(["CV", "PR"])),
+                                                citation("b", venue="".join(["CVP", "R"]))])
+
+    assert first.venue is second.venue
+    assert first.cited_seeds[0] is second.cited_seeds[0]
+
+
+def test_exporter_writes_records_like_raw_citations(tmp_path):
+    citations = [citation(f"paper-{i}", citationCount=i % 7, year=2015 + i % 9) for i in range(50)]
+
+    CitationExporter.save_to_csv(citations, str(tmp_path / "raw.csv"), sort_by="year")
+    CitationExporter.save_to_csv(PaperRecord.from_citations(citations), str(tmp_path / "records.csv"), sort_by="year")
+
+    assert (tmp_path / "raw.csv").read_text() == (tmp_path / "records.csv").read_text()
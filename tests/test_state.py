@@ -0,0 +1,58 @@
+from conftest import FailingTransport, citing_ids, make_client, make_paper, paper_id
+
+from scholtrack.state import SeedStateStore
+
+SEED_ID = paper_id("tracked seed")
+
+
+def test_failed_first_run_does_not_save_state(mock_server, tmp_path):
+    citers = [make_paper(f"citer-{i}") for i in range(5000)]
+    server = mock_server({SEED_ID: citers})
+    state_store = SeedStateStore(str(tmp_path))
+
+    failing = make_client(server, transport=FailingTransport([1000]))
+    citations, _ = failing.get_new_citations(SEED_ID, state_store, limit=1000, fields="paperId")
+    assert len(citations) == 1000
+    assert SEED_ID in failing.incomplete_seeds
+    assert state_store.load(SEED_ID) is None
+
+    citations, new_citations = make_client(server).get_new_citations(SEED_ID, state_store, limit=1000, fields="paperId")
+    assert sorted(citing_ids(new_citations)) == sorted(paper["paperId"] for paper in citers)
+    assert state_store.load(SEED_ID)["citation_count"] == 5000
+
+
+def test_failed_incremental_run_keeps_previous_state(mock_server, tmp_path):
+    old_citers = [make_paper(f"old-{i}") for i in range(2000)]
+    new_citers = [make_paper(f"new-{i}") for i in range(3000)]
+    state_store = SeedStateStore(str(tmp_path))
+    make_client(mock_server({SEED_ID: old_citers})).get_new_citations(SEED_ID, state_store, limit=1000, fields="paperId")
+
+    # Semantic Scholar lists the most recently added citations first
+    server = mock_server({SEED_ID: new_citers + old_citers})
+    failing = make_client(server, transport=FailingTransport([1000]))
+    _, new_citations = failing.get_new_citations(SEED_ID, state_store, limit=1000, fields="paperId")
+    assert len(new_citations) == 1000
+    assert SEED_ID in failing.incomplete_seeds
+    assert state_store.load(SEED_ID)["citation_count"] == 2000
+
+    citations, new_citations = make_client(server).get_new_citations(SEED_ID, state_store, limit=1000, fields="paperId")
+    assert sorted(citing_ids(new_citations)) == sorted(paper["paperId"] for paper in new_citers)
+    assert len(citations) == 5000
+    assert state_store.load(SEED_ID)["citation_count"] == 5000
+
+
+def test_state_of_other_fields_is_fetched_again(mock_server, tmp_path):
+    other_seed = paper_id("other seed")
+    shared, old = make_paper("shared"), make_paper("old")
+    state_store = SeedStateStore(str(tmp_path))
+    # A hydrated run only stores the citing paper IDs
+    make_client(mock_server({SEED_ID: [shared], other_seed: [old]})).get_citations_for_papers(
+        [SEED_ID, other_seed], state_store=state_store)
+
+    server = mock_server({SEED_ID: [shared], other_seed: [shared, old]})
+    citations = make_client(server).get_citations_for_papers([SEED_ID, other_seed], state_store=state_store,
+                                                             hydrate=False)
+
+    assert [citation["citingPaper"].get("title") for citation in citations] == ["Paper shared"]
+    assert citations[0]["citedSeeds"] == [SEED_ID, other_seed]
+    assert state_store.load(SEED_ID)["fields"] == make_client(server).CITATION_FIELDS
@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import pytest
+
+from scholtrack import store as store_module
+from scholtrack.store import PaperStore
+
+from conftest import make_client, make_paper, paper_id, run_cli
+
+SEED_ID = paper_id("seed")
+HOUR = 3600
+
+
+def citations(*names):
+    return [{"citingPaper": make_paper(name)} for name in names]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    The time seen by the store, in seconds, to be moved forward by the test.
+    """
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(store_module, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def test_stale_papers_and_citation_lists_are_fetched_again(tmp_path, clock):
+    store = PaperStore(str(tmp_path / "papers.db"), max_age=24 * HOUR)
+    store.add_citations(SEED_ID, citations("a", "b"), position=0)
+    store.mark_complete(SEED_ID, since=clock.value)
+    assert [citation["citingPaper"]["title"] for citation in store.get_citations(SEED_ID, "title")] == \
+        ["Paper a", "Paper b"]
+
+    clock.value += 25 * HOUR
+    assert store.get_citations(SEED_ID, "title") is None
+    assert store.get_papers([paper_id("a")], "title") == {}
+    assert store.citing_ids(SEED_ID, fresh_only=False) == [paper_id("a"), paper_id("b")]
+    store.close()
+
+
+def test_completed_fetch_drops_citations_no_longer_listed(tmp_path, clock):
+    store = PaperStore(str(tmp_path / "papers.db"))
+    store.add_citations(SEED_ID, citations("a", "b", "c"), position=0)
+    store.mark_complete(SEED_ID, since=clock.value)
+
+    clock.value += HOUR
+    refetch_started = clock.value
+    store.add_citations(SEED_ID, citations("a", "c"), position=0)
+    store.mark_complete(SEED_ID, since=refetch_started)
+
+    assert store.citing_ids(SEED_ID) == [paper_id("a"), paper_id("c")]
+    store.close()
+
+
+def test_citations_keep_the_order_of_the_api(tmp_path):
+    store = PaperStore(str(tmp_path / "papers.db"))
+    store.add_citations(SEED_ID, citations("c", "d"), position=2)  # Pages may finish out of order
+    store.add_citations(SEED_ID, citations("a", "b"), position=0)
+    store.add_citations(SEED_ID, citations("new"))  # Newly added citations are listed first
+    store.mark_complete(SEED_ID, since=0)
+
+    assert store.citing_ids(SEED_ID) == [paper_id(name) for name in ("new", "a", "b", "c", "d")]
+    store.close()
+
+
+def test_stored_citations_are_not_fetched_again(mock_server, tmp_path):
+    server = mock_server({SEED_ID: [make_paper(f"citer-{i}") for i in range(300)]})
+    path = str(tmp_path / "papers.db")
+
+    expected = make_client(server, store=PaperStore(path)).get_citations_for_papers([SEED_ID])
+    client = make_client(server, store=PaperStore(path))
+    assert client.get_citations_for_papers([SEED_ID]) == expected
+    assert client.transport.summary()["requests"] == 0
+
+
+def test_query_command_is_listed_in_the_main_help(monkeypatch, capsys):
+    with pytest.raises(SystemExit):
+        run_cli(monkeypatch, "--help")
+    assert "scholtrack query" in capsys.readouterr().out
@@ -0,0 +1,29 @@
+import csv
+
+import pytest
+
+from scholtrack.exporter import CitationExporter
+
+from conftest import make_client, make_paper, paper_id
+
+SEEDS = [paper_id("first seed"), paper_id("second seed")]
+
+
+@pytest.mark.parametrize("max_workers, hydrate", [(1, True), (1, False), (2, True), (2, False)])
+def test_streamed_rows_do_not_claim_an_overlap(mock_server, tmp_path, max_workers, hydrate):
+    shared = make_paper("shared")
+    server = mock_server({SEEDS[0]: [make_paper("a"), shared], SEEDS[1]: [shared, make_paper("b")]})
+    client = make_client(server, max_workers=max_workers)
+    filename = str(tmp_path / "citations.csv")
+
+    citations = client.iter_citations_for_papers(SEEDS, hydrate=hydrate)
+    assert CitationExporter.stream_to_csv(citations, filename) == 3
+
+    with open(filename, newline="", encoding="utf-8") as f:
+        rows = {row["paper_id"]: row for row in csv.DictReader(f)}
+    # The shared paper cites both seed papers, which is unknown when it is written
+    assert {paper_id: (row["seed_count"], row["cited_seeds"]) for paper_id, row in rows.items()} == \
+        dict.fromkeys(rows, ("", ""))
+    assert {paper_id: row["seed_id"] for paper_id, row in rows.items()} == \
+        {paper_id("a"): SEEDS[0], shared["paperId"]: SEEDS[0], paper_id("b"): SEEDS[1]}
+    assert rows[shared["paperId"]]["title"] == "Paper shared"
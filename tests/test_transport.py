@@ -0,0 +1,35 @@
+from scholtrack.transport import HttpTransport
+
+from conftest import make_client
+
+N_CITERS = 3000
+
+
+def test_rate_limited_requests_are_retried(mock_server):
+    clean_server = mock_server(N_CITERS)
+    seed_ids = list(clean_server.dataset)
+    expected = make_client(clean_server).get_citations_for_papers(seed_ids)
+
+    server = mock_server(N_CITERS, error_rate=0.3)
+    client = make_client(server, transport=HttpTransport(rate=0, max_retries=20, backoff=0.001, max_backoff=0.01))
+    citations = client.get_citations_for_papers(seed_ids)
+
+    assert citations == expected
+    assert client.incomplete_seeds == {}
+    stats = client.transport.summary()
+    assert stats["rate_limited"] == stats["retries"] > 0
+
+
+def test_exhausted_retries_mark_the_seed_incomplete(mock_server):
+    clean_server = mock_server(N_CITERS)
+    seed_ids = list(clean_server.dataset)
+    expected = {seed_id: make_client(clean_server).get_citations(seed_id, limit=500, fields="paperId")
+                for seed_id in seed_ids}
+
+    server = mock_server(N_CITERS, error_rate=0.3)
+    client = make_client(server, max_retries=0)
+    cut_short = [seed_id for seed_id in seed_ids
+                 if client.get_citations(seed_id, limit=500, fields="paperId") != expected[seed_id]]
+
+    assert cut_short
+    assert sorted(client.incomplete_seeds) == sorted(cut_short)